@@ -58,6 +58,7 @@ VENDOR_APPS = [
 LOCAL_APPS = [
     'infra.apps.users',
     'infra.apps.catalog',
+    'infra.apps.api',
 ]
 
 INSTALLED_APPS += VENDOR_APPS + LOCAL_APPS
@@ -135,6 +136,33 @@ STATIC_ROOT = BASE_DIR('static')
 STATIC_URL = '/static/'
 CATALOG_MEDIA_DIR = 'catalog'
 
+# Descargas de archivos: '' (streaming desde Django), 'nginx' (X-Accel-Redirect a
+# MEDIA_ACCEL_REDIRECT_LOCATION, que debe ser una location internal con alias a MEDIA_ROOT)
+# o 'apache' (X-Sendfile, requiere mod_xsendfile)
+MEDIA_SENDFILE_BACKEND = env('MEDIA_SENDFILE_BACKEND', default='')
+MEDIA_ACCEL_REDIRECT_LOCATION = env('MEDIA_ACCEL_REDIRECT_LOCATION', default='/protected-media/')
+
+# Cache de catálogos parseados, compartida entre los workers. Fuera de MEDIA_ROOT: los pickles
+# no deben quedar publicados junto a los archivos
+CATALOG_CACHE_DIR = env('CATALOG_CACHE_DIR', default=BASE_DIR('cache', 'catalogs'))
+CATALOG_CACHE_MEMORY_BYTES = env.int('CATALOG_CACHE_MEMORY_BYTES', default=64 * 1024 * 1024)
+CATALOG_CACHE_DISK_BYTES = env.int('CATALOG_CACHE_DISK_BYTES', default=1024 * 1024 * 1024)
+
+# Conversión XLSX <-> JSON de catálogos en background (./manage.py process_catalog_conversions)
+CATALOG_CONVERSIONS_ASYNC = env.bool('CATALOG_CONVERSIONS_ASYNC', default=True)
+CATALOG_CONVERSION_MAX_ATTEMPTS = env.int('CATALOG_CONVERSION_MAX_ATTEMPTS', default=3)
+CATALOG_CONVERSION_RETRY_DELAY = env.int('CATALOG_CONVERSION_RETRY_DELAY', default=60)
+CATALOG_CONVERSION_TIMEOUT = env.int('CATALOG_CONVERSION_TIMEOUT', default=30 * 60)
+
+# Variantes comprimidas de las copias "latest" en background (./manage.py process_compressions)
+COMPRESSIONS_ASYNC = env.bool('COMPRESSIONS_ASYNC', default=True)
+COMPRESSION_MAX_ATTEMPTS = env.int('COMPRESSION_MAX_ATTEMPTS', default=3)
+COMPRESSION_RETRY_DELAY = env.int('COMPRESSION_RETRY_DELAY', default=60)
+COMPRESSION_TIMEOUT = env.int('COMPRESSION_TIMEOUT', default=30 * 60)
+
+# Procesos en paralelo de ./manage.py sync_nodes
+SYNC_NODES_CONCURRENCY = env.int('SYNC_NODES_CONCURRENCY', default=4)
+
 SITE_ID = 1
 
 LOGIN_REDIRECT_URL = 'home'
@@ -147,6 +175,43 @@ AUTH_USER_MODEL = 'users.User'
 
 FILE_UPLOAD_PERMISSIONS = 0o664
 
+# Descargas de catálogos y distribuciones desde URLs
+DOWNLOAD_MAX_BYTES = env.int('DOWNLOAD_MAX_BYTES', default=10 * 1024 ** 3)
+# Espera máxima de cada lectura y duración máxima de la descarga completa (segundos)
+DOWNLOAD_TIMEOUT = env.float('DOWNLOAD_TIMEOUT', default=30)
+DOWNLOAD_MAX_DURATION = env.float('DOWNLOAD_MAX_DURATION', default=30 * 60)
+
+# Espejado de las distribuciones de un catálogo: descargas en paralelo en total y por host
+MIRROR_MAX_WORKERS = env.int('MIRROR_MAX_WORKERS', default=8)
+MIRROR_PER_HOST = env.int('MIRROR_PER_HOST', default=2)
+# Espejados pedidos desde la web, en background (./manage.py process_mirrors)
+MIRROR_MAX_ATTEMPTS = env.int('MIRROR_MAX_ATTEMPTS', default=3)
+MIRROR_RETRY_DELAY = env.int('MIRROR_RETRY_DELAY', default=60)
+MIRROR_TIMEOUT = env.int('MIRROR_TIMEOUT', default=60 * 60)
+
+# Actualización periódica de las distribuciones cargadas desde una URL (./manage.py
+# harvest_distributions). Los tiempos están en segundos
+HARVEST_INTERVAL = env.int('HARVEST_INTERVAL', default=24 * 60 * 60)
+HARVEST_RETRY_DELAY = env.int('HARVEST_RETRY_DELAY', default=15 * 60)
+HARVEST_LEASE = env.int('HARVEST_LEASE', default=60 * 60)
+HARVEST_MAX_WORKERS = env.int('HARVEST_MAX_WORKERS', default=8)
+HARVEST_PER_NODE = env.int('HARVEST_PER_NODE', default=2)
+HARVEST_HOST_MAX_FAILURES = env.int('HARVEST_HOST_MAX_FAILURES', default=3)
+
+# Versiones históricas de catálogos y distribuciones que conserva ./manage.py prune_versions:
+# todas las de los últimos RETENTION_DAILY_DAYS días, una por semana hasta
+# RETENTION_WEEKLY_MONTHS meses atrás y una por mes después. Cada nodo puede sobrescribirlos
+RETENTION_DAILY_DAYS = env.int('RETENTION_DAILY_DAYS', default=30)
+RETENTION_WEEKLY_MONTHS = env.int('RETENTION_WEEKLY_MONTHS', default=12)
+RETENTION_BATCH_SIZE = env.int('RETENTION_BATCH_SIZE', default=500)
+RETENTION_IO_WORKERS = env.int('RETENTION_IO_WORKERS', default=4)
+
+# ./manage.py reconcile_media: threads que recorren MEDIA_ROOT/catalog, rutas que se ordenan
+# en memoria antes de pasar a un archivo temporal y filas por consulta o lote de correcciones
+RECONCILE_SCAN_WORKERS = env.int('RECONCILE_SCAN_WORKERS', default=8)
+RECONCILE_RUN_SIZE = env.int('RECONCILE_RUN_SIZE', default=500000)
+RECONCILE_BATCH_SIZE = env.int('RECONCILE_BATCH_SIZE', default=2000)
+
 FILE_UPLOAD_HANDLERS = [
     'django.core.files.uploadhandler.TemporaryFileUploadHandler',
 ]
\ No newline at end of file
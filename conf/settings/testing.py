@@ -24,6 +24,9 @@ TEMPLATE_DEBUG = DEBUG
 TESTS_IN_PROGRESS = True
 
 MEDIA_ROOT = 'tests_media/'
+CATALOG_CACHE_DIR = 'tests_cache/catalogs/'
+CATALOG_CONVERSIONS_ASYNC = False
+COMPRESSIONS_ASYNC = False
 
 class PytestTestRunner(object):
     """Runs pytest to discover and run tests."""
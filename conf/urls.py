@@ -30,6 +30,7 @@ urlpatterns = [
     path('admin/', admin.site.urls),
     path('', user_views.home, name='home'),
     path('nodes/', include('infra.apps.catalog.urls')),
+    path('api/', include('infra.apps.api.urls')),
     path('django-des/', include(des_urls)),
     path('ingresar/', InfraLoginView.as_view(), name='login'),
     path('logout/', auth_views.logout_then_login, name='logout')
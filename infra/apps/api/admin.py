@@ -0,0 +1,24 @@
+from django.contrib import admin, messages
+
+from infra.apps.api.models import ApiToken
+
+
+@admin.register(ApiToken)
+class ApiTokenAdmin(admin.ModelAdmin):
+    list_display = ('node', 'name', 'created_by', 'created_at', 'last_used_at')
+    list_filter = ('node',)
+    fields = ('node', 'name')
+
+    def get_readonly_fields(self, request, obj=None):
+        # Un token existente no se puede pasar a otro nodo: se revoca y se crea otro
+        return ('node',) if obj is not None else ()
+
+    def save_model(self, request, obj, form, change):
+        if change:
+            super().save_model(request, obj, form, change)
+            return
+
+        token, key = ApiToken.objects.create_token(obj.node, obj.name, request.user)
+        obj.pk = token.pk
+        messages.warning(request, f'Token generado: {key} (no se vuelve a mostrar, '
+                                  f'guardalo en un lugar seguro)')
@@ -0,0 +1,27 @@
+from django.utils.decorators import method_decorator
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+
+from infra.apps.api.models import ApiToken
+from infra.apps.api.responses import FORBIDDEN, error_response
+
+
+def bearer_token(request):
+    scheme, _, key = request.META.get('HTTP_AUTHORIZATION', '').partition(' ')
+    return key.strip() if scheme.lower() == 'bearer' else None
+
+
+@method_decorator(csrf_exempt, name='dispatch')
+class TokenAuthenticatedView(View):
+    """Vista de la API: el nodo sale del token del header Authorization, sin sesión ni CSRF."""
+    permission_error_message = 'No se cuenta con los permisos necesarios.'
+
+    def dispatch(self, request, *args, **kwargs):
+        token = ApiToken.objects.authenticate(bearer_token(request))
+        if token is None:
+            return self.permission_error()
+        self.node = token.node  # pylint: disable=W0201
+        return super().dispatch(request, *args, **kwargs)
+
+    def permission_error(self):
+        return error_response(FORBIDDEN, self.permission_error_message, status=403)
@@ -0,0 +1,18 @@
+from django.core.management import BaseCommand
+
+from infra.apps.api.models import ApiToken
+from infra.apps.catalog.helpers.command_node import get_command_node
+
+
+class Command(BaseCommand):
+    help = 'Crea un token de la API para un nodo e imprime la clave (no se vuelve a mostrar)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('node', help='Identificador del nodo')
+        parser.add_argument('--name', default='', help='Nombre descriptivo del token')
+
+    def handle(self, *args, **options):
+        node = get_command_node(options['node'])
+
+        _token, key = ApiToken.objects.create_token(node, options['name'])
+        self.stdout.write(key)
@@ -0,0 +1,56 @@
+import hashlib
+import secrets
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import models
+from django.utils import timezone
+
+from infra.apps.catalog.models import Node
+
+# Evita escribir en la base en cada pedido solo para registrar el último uso
+LAST_USED_RESOLUTION = timedelta(minutes=5)
+
+
+def key_digest(key):
+    return hashlib.sha256(key.encode()).hexdigest()
+
+
+class ApiTokenManager(models.Manager):
+
+    def create_token(self, node, name='', created_by=None):
+        """Crea un token para el nodo. La clave solo se devuelve acá: en la base se
+        guarda su SHA-256."""
+        key = secrets.token_urlsafe(32)
+        token = self.create(node=node, name=name, created_by=created_by,
+                            key_digest=key_digest(key))
+        return token, key
+
+    def authenticate(self, key):
+        if not key:
+            return None
+        token = self.select_related('node').filter(key_digest=key_digest(key)).first()
+        if token is not None:
+            token.touch()
+        return token
+
+
+class ApiToken(models.Model):
+    node = models.ForeignKey(to=Node, on_delete=models.CASCADE, related_name='api_tokens')
+    name = models.CharField(max_length=100, blank=True)
+    key_digest = models.CharField(max_length=64, unique=True, editable=False)
+    created_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL,
+                                   null=True, blank=True, editable=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_used_at = models.DateTimeField(null=True, blank=True, editable=False)
+
+    objects = ApiTokenManager()
+
+    def __str__(self):
+        return f'{self.node.identifier} ({self.name or self.pk})'
+
+    def touch(self):
+        now = timezone.now()
+        if self.last_used_at is None or now - self.last_used_at > LAST_USED_RESOLUTION:
+            self.last_used_at = now
+            ApiToken.objects.filter(pk=self.pk).update(last_used_at=now)
@@ -0,0 +1,15 @@
+from django.http import JsonResponse
+
+# Códigos de error de la API: cada error tiene su propio código en todos los recursos
+INVALID_CATALOG = 1000
+FORBIDDEN = 1001
+INVALID_PARAMETERS = 1002
+UNKNOWN_DATASET = 1003
+TOO_LARGE = 1004
+FILE_RENAMED = 1005
+UNREADABLE_CATALOG = 1006
+SYNC_ERROR = 1007
+
+
+def error_response(code, message, status=400, **extra):
+    return JsonResponse({'error': dict(code=code, message=message, **extra)}, status=status)
@@ -0,0 +1,37 @@
+import pytest
+from django.core.files import File
+
+from infra.apps.api.models import ApiToken
+from infra.apps.catalog.models import CatalogUpload, Node
+from infra.apps.catalog.tests.helpers.open_catalog import open_catalog
+
+
+@pytest.fixture(autouse=True)
+def enable_db_access(db):
+    # pylint: disable=W0613,C0103
+    pass
+
+
+@pytest.fixture(name='node')
+def fixture_node():
+    return Node.objects.get_or_create(identifier='test_id')[0]
+
+
+@pytest.fixture
+def catalog(node):
+    with open_catalog('data.json') as catalog_fd:
+        model = CatalogUpload(format=CatalogUpload.FORMAT_JSON, json_file=File(catalog_fd),
+                              node=node)
+        model.save()
+    return model
+
+
+@pytest.fixture(name='token_key')
+def fixture_token_key(node):
+    _token, key = ApiToken.objects.create_token(node, 'tests')
+    return key
+
+
+@pytest.fixture
+def auth(token_key):
+    return {'HTTP_AUTHORIZATION': f'Bearer {token_key}'}
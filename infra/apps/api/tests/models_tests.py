@@ -0,0 +1,46 @@
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+
+from infra.apps.api.models import ApiToken, key_digest
+
+pytestmark = pytest.mark.django_db
+
+
+def test_only_the_key_digest_is_stored(node):
+    token, key = ApiToken.objects.create_token(node, 'pipeline')
+
+    assert token.key_digest == key_digest(key)
+    assert key not in token.key_digest
+
+
+def test_authenticate(node):
+    token, key = ApiToken.objects.create_token(node)
+
+    authenticated = ApiToken.objects.authenticate(key)
+
+    assert authenticated == token
+    assert authenticated.node == node
+    assert authenticated.last_used_at is not None
+
+
+def test_authenticate_unknown_key(node):
+    ApiToken.objects.create_token(node)
+
+    assert ApiToken.objects.authenticate('otra-clave') is None
+    assert ApiToken.objects.authenticate('') is None
+
+
+def test_last_used_is_updated_at_most_every_few_minutes(node, django_assert_num_queries):
+    token, key = ApiToken.objects.create_token(node)
+    ApiToken.objects.authenticate(key)
+
+    with django_assert_num_queries(1):
+        ApiToken.objects.authenticate(key)
+
+    old = timezone.now() - timedelta(hours=1)
+    ApiToken.objects.filter(pk=token.pk).update(last_used_at=old)
+    ApiToken.objects.authenticate(key)
+    token.refresh_from_db()
+    assert token.last_used_at > old
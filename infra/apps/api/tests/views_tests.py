@@ -0,0 +1,273 @@
+import json
+import os
+
+import pytest
+from django.core.management import call_command
+from django.test import override_settings
+from django.urls import reverse
+
+from infra.apps.api.models import ApiToken
+from infra.apps.catalog.models import CatalogUpload, Distribution, Node
+from infra.apps.catalog.tests.helpers.open_catalog import open_catalog
+
+pytestmark = pytest.mark.django_db
+
+
+def _read_sample(name):
+    with open_catalog(name) as sample:
+        return sample.read()
+
+
+def _upload_file_url(**params):
+    query = '&'.join(f'{name}={value}' for name, value in params.items())
+    return f"{reverse('api:upload_file')}?{query}"
+
+
+def _upload_file(client, auth, content=b'a,b\n1,2', **params):
+    params = {'dataset': '125', 'distribution': '125.1', 'name': 'datos.csv', **params}
+    return client.post(_upload_file_url(**params), data=content,
+                       content_type='application/octet-stream', **auth)
+
+
+@pytest.mark.usefixtures('catalog')
+def test_requests_without_token_are_forbidden(client):
+    response = client.post(_upload_file_url(dataset='125', distribution='125.1', name='a.csv'),
+                           data=b'a', content_type='application/octet-stream')
+
+    assert response.status_code == 403
+    assert response.json()['error']['code'] == 1001
+    assert not Distribution.objects.exists()
+
+
+@pytest.mark.usefixtures('catalog')
+def test_requests_with_invalid_token_are_forbidden(client):
+    response = client.get(reverse('api:catalogs'), HTTP_AUTHORIZATION='Bearer invalido')
+    assert response.status_code == 403
+
+
+def test_upload_file(client, auth, catalog):
+    response = _upload_file(client, auth)
+
+    assert response.status_code == 200
+    assert response.json() == {
+        'url': 'http://testserver/media/catalog/test_id/dataset/125/distribution/125.1/'
+               'download/datos.csv',
+        'replaced': False,
+    }
+    distribution = Distribution.objects.get(catalog=catalog.node, identifier='125.1')
+    with open(distribution.get_latest_upload().file.path, 'rb') as file:
+        assert file.read() == b'a,b\n1,2'
+
+
+@pytest.mark.usefixtures('catalog')
+def test_upload_file_replaces_same_name(client, auth):
+    _upload_file(client, auth)
+    response = _upload_file(client, auth, content=b'a,b\n3,4')
+
+    assert response.status_code == 200
+    assert response.json()['replaced'] is True
+    upload = Distribution.objects.get(identifier='125.1').get_latest_upload()
+    with open(upload.file.path, 'rb') as file:
+        assert file.read() == b'a,b\n3,4'
+
+
+@pytest.mark.usefixtures('catalog')
+def test_upload_file_rename_requires_force(client, auth):
+    _upload_file(client, auth)
+
+    response = _upload_file(client, auth, name='otro.csv')
+    assert response.status_code == 400
+    assert response.json()['error']['code'] == 1005
+
+    response = _upload_file(client, auth, name='otro.csv', force='')
+    assert response.status_code == 200
+    assert Distribution.objects.get(identifier='125.1').file_name == 'otro.csv'
+
+
+@pytest.mark.usefixtures('catalog')
+def test_upload_file_missing_parameters(client, auth):
+    response = client.post(_upload_file_url(dataset='125'), data=b'a',
+                           content_type='application/octet-stream', **auth)
+
+    assert response.status_code == 400
+    assert response.json()['error']['code'] == 1002
+    assert 'distribution, name' in response.json()['error']['message']
+
+
+@pytest.mark.parametrize('name', ['../../datos.csv', 'dir/datos.csv', '..', '.'])
+@pytest.mark.usefixtures('catalog')
+def test_upload_file_rejects_paths_in_name(client, auth, name):
+    response = _upload_file(client, auth, name=name)
+
+    assert response.status_code == 400
+    assert response.json()['error']['code'] == 1002
+    assert not Distribution.objects.exists()
+
+
+@pytest.mark.usefixtures('catalog')
+def test_upload_file_to_another_catalog_is_forbidden(client, auth):
+    Node.objects.create(identifier='otro')
+    response = _upload_file(client, auth, catalog='otro')
+    assert response.status_code == 403
+
+
+@pytest.mark.usefixtures('catalog')
+def test_upload_file_unknown_dataset(client, auth):
+    response = _upload_file(client, auth, dataset='999')
+
+    assert response.status_code == 400
+    assert response.json()['error']['code'] == 1003
+
+
+@override_settings(DOWNLOAD_MAX_BYTES=4)
+@pytest.mark.usefixtures('catalog')
+def test_upload_file_too_large(client, auth):
+    response = _upload_file(client, auth, content=b'a,b\n1,2')
+
+    assert response.status_code == 413
+    assert not Distribution.objects.exists()
+
+
+def test_upload_catalog(client, auth, node):
+    response = client.post(f"{reverse('api:upload_catalog')}?format=json",
+                           data=_read_sample('valid_data.json'),
+                           content_type='application/octet-stream', **auth)
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body['urls'] == {'json': 'http://testserver/media/catalog/test_id/data.json',
+                            'xlsx': 'http://testserver/media/catalog/test_id/catalog.xlsx'}
+    assert body['replaced'] is False
+    assert body['unchanged'] is False
+    assert body['failed_validations'] == []
+    catalog = CatalogUpload.objects.get(node=node)
+    assert os.path.isfile(catalog.json_file.path)
+    assert os.path.isfile(catalog.xlsx_file.path)
+
+
+def test_upload_xlsx_catalog(client, auth, node):
+    response = client.post(f"{reverse('api:upload_catalog')}?format=xlsx",
+                           data=_read_sample('xlsx_catalog.xlsx'),
+                           content_type='application/octet-stream', **auth)
+
+    assert response.status_code == 200
+    assert CatalogUpload.objects.get(node=node).format == CatalogUpload.FORMAT_XLSX
+
+
+def test_upload_invalid_catalog_is_rejected(client, auth):
+    response = client.post(f"{reverse('api:upload_catalog')}?format=json",
+                           data=_read_sample('data.json'),
+                           content_type='application/octet-stream', **auth)
+
+    assert response.status_code == 400
+    error = response.json()['error']
+    assert error['code'] == 1000
+    assert "'title' is a required property" in error['failed_validations']
+    assert not CatalogUpload.objects.exists()
+
+
+def test_upload_invalid_catalog_can_be_stored(client, auth):
+    response = client.post(f"{reverse('api:upload_catalog')}?format=json&store_invalid",
+                           data=_read_sample('data.json'),
+                           content_type='application/octet-stream', **auth)
+
+    assert response.status_code == 200
+    assert "'title' is a required property" in response.json()['failed_validations']
+    assert CatalogUpload.objects.exists()
+
+
+@pytest.mark.usefixtures('catalog')
+def test_upload_same_catalog_is_unchanged(client, auth):
+    response = client.post(f"{reverse('api:upload_catalog')}?format=json",
+                           data=_read_sample('data.json'),
+                           content_type='application/octet-stream', **auth)
+
+    assert response.status_code == 200
+    assert response.json()['unchanged'] is True
+    assert response.json()['replaced'] is True
+    assert CatalogUpload.objects.count() == 1
+
+
+def test_upload_unreadable_catalog(client, auth):
+    response = client.post(f"{reverse('api:upload_catalog')}?format=json", data=b'{no es json',
+                           content_type='application/octet-stream', **auth)
+
+    assert response.status_code == 400
+    assert response.json()['error']['code'] == 1006
+    assert not CatalogUpload.objects.exists()
+
+
+def test_upload_catalog_invalid_format(client, auth):
+    response = client.post(f"{reverse('api:upload_catalog')}?format=csv", data=b'a',
+                           content_type='application/octet-stream', **auth)
+
+    assert response.status_code == 400
+    assert response.json()['error']['code'] == 1002
+
+
+def test_sync_catalog_without_file(client):
+    _token, key = ApiToken.objects.create_token(Node.objects.create(identifier='sin_catalogo'))
+    response = client.post(reverse('api:sync_catalog'), HTTP_AUTHORIZATION=f'Bearer {key}')
+
+    assert response.status_code == 400
+    assert response.json()['error']['code'] == 1007
+
+
+@pytest.mark.usefixtures('catalog')
+def test_sync_unchanged_catalog(client, auth):
+    response = client.post(reverse('api:sync_catalog'), **auth)
+
+    assert response.status_code == 200
+    assert response.json() == {'unchanged': True, 'failed_validations': []}
+
+
+def test_list_catalogs(client, auth, catalog):
+    response = client.get(reverse('api:catalogs'), **auth)
+
+    assert response.status_code == 200
+    [listed] = response.json()['catalogs']
+    assert listed['id'] == catalog.id
+    assert listed['latest'] is True
+    assert listed['content_hash'] == catalog.content_hash
+    assert set(listed['urls']) == {'json', 'xlsx'}
+
+
+@pytest.mark.usefixtures('catalog')
+def test_list_distributions(client, auth):
+    _upload_file(client, auth)
+
+    response = client.get(reverse('api:distributions'), **auth)
+
+    assert response.status_code == 200
+    [listed] = response.json()['distributions']
+    assert listed['identifier'] == '125.1'
+    assert listed['file_name'] == 'datos.csv'
+    assert listed['url'].endswith('/distribution/125.1/download/datos.csv')
+    assert listed['file_hash'] == \
+        Distribution.objects.get(identifier='125.1').get_latest_upload().file_hash
+
+
+@pytest.mark.usefixtures('catalog')
+def test_list_distributions_only_of_token_node(client, auth):
+    _upload_file(client, auth)
+    other = Node.objects.create(identifier='otro')
+    _token, other_key = ApiToken.objects.create_token(other)
+
+    response = client.get(reverse('api:distributions'),
+                          HTTP_AUTHORIZATION=f'Bearer {other_key}')
+
+    assert response.json() == {'distributions': []}
+
+
+def test_create_api_token_command(node, capsys):
+    call_command('create_api_token', node.identifier, name='pipeline')
+
+    key = capsys.readouterr().out.strip()
+    assert ApiToken.objects.authenticate(key).name == 'pipeline'
+
+
+@pytest.mark.usefixtures('catalog')
+def test_responses_are_json(client, auth):
+    response = client.get(reverse('api:catalogs'), **auth)
+    assert response['Content-Type'] == 'application/json'
+    json.loads(response.content)
@@ -0,0 +1,23 @@
+from django.urls import path
+
+from infra.apps.api import views as api_views
+
+app_name = 'api'
+
+urlpatterns = [
+    path('upload-file',
+         api_views.UploadFile.as_view(),
+         name='upload_file'),
+    path('upload-catalog',
+         api_views.UploadCatalog.as_view(),
+         name='upload_catalog'),
+    path('sync-catalog',
+         api_views.SyncCatalog.as_view(),
+         name='sync_catalog'),
+    path('catalogs',
+         api_views.ListCatalogs.as_view(),
+         name='catalogs'),
+    path('distributions',
+         api_views.ListDistributions.as_view(),
+         name='distributions'),
+]
@@ -0,0 +1,209 @@
+import os
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.files import File
+from django.db.models import OuterRef, Subquery
+from django.http import JsonResponse
+from django.urls import reverse
+
+from infra.apps.api.authentication import TokenAuthenticatedView
+from infra.apps.api.responses import FILE_RENAMED, INVALID_CATALOG, INVALID_PARAMETERS, \
+    SYNC_ERROR, TOO_LARGE, UNKNOWN_DATASET, UNREADABLE_CATALOG, error_response
+from infra.apps.catalog.exceptions.catalog_sync_error import CatalogSyncError
+from infra.apps.catalog.exceptions.catalog_unchanged_error import CatalogUnchangedError
+from infra.apps.catalog.exceptions.download_too_large_error import DownloadTooLargeError
+from infra.apps.catalog.exceptions.invalid_catalog_error import InvalidCatalogError
+from infra.apps.catalog.helpers.safe_file_name import is_safe_file_name
+from infra.apps.catalog.helpers.temp_file_from_url import CHUNK_SIZE, write_temp_file
+from infra.apps.catalog.ingestion import CatalogIngestion
+from infra.apps.catalog.models import CatalogUpload, DistributionUpload
+from infra.apps.catalog.models.distribution import Distribution
+from infra.apps.catalog.storage.distribution_storage import distribution_directory
+from infra.apps.catalog.storage.paths import catalog_path
+from infra.apps.catalog.sync import sync_catalog
+
+
+def request_body_file(request):
+    # El cuerpo se copia en chunks a un archivo temporal, sin cargarlo completo en memoria
+    return write_temp_file(iter(lambda: request.read(CHUNK_SIZE), b''), 'El archivo enviado')
+
+
+def media_url(request, path):
+    return request.build_absolute_uri(f'{settings.MEDIA_URL}{path}')
+
+
+def catalog_urls(request, node):
+    return {'json': media_url(request, catalog_path(node.identifier, 'data.json')),
+            'xlsx': media_url(request, catalog_path(node.identifier, 'catalog.xlsx'))}
+
+
+def distribution_url(request, distribution):
+    return media_url(request, os.path.join(distribution_directory(distribution),
+                                           distribution.file_name))
+
+
+class UploadFile(TokenAuthenticatedView):
+    http_method_names = ['post']
+    permission_error_message = 'No se cuenta con los permisos necesarios para crear el archivo.'
+
+    def post(self, request):
+        params = {name: request.GET.get(name, '').strip()
+                  for name in ('dataset', 'distribution', 'name')}
+        error = self.parameters_error(request, params)
+        if error is not None:
+            return error
+
+        distribution = Distribution.objects \
+            .filter(catalog=self.node, identifier=params['distribution']).first()
+        if distribution is not None and distribution.file_name != params['name'] \
+                and 'force' not in request.GET:
+            return error_response(FILE_RENAMED,
+                                  'La distribución ya cuenta con un archivo con nombre distinto.')
+
+        try:
+            body = request_body_file(request)
+        except DownloadTooLargeError as e:
+            return error_response(TOO_LARGE, str(e), status=413)
+
+        with body.file:
+            upload = Distribution.objects.upsert_upload(self.node, {
+                'dataset_identifier': params['dataset'],
+                'distribution_identifier': params['distribution'],
+                'file_name': params['name'],
+                'file': File(body.file, name=params['name']),
+            })
+
+        return JsonResponse({'url': distribution_url(request, upload.distribution),
+                             'replaced': distribution is not None})
+
+    def parameters_error(self, request, params):
+        missing = [name for name, value in params.items() if not value]
+        if missing:
+            return error_response(INVALID_PARAMETERS,
+                                  f'Faltan los parámetros requeridos: {", ".join(missing)}.')
+        if not is_safe_file_name(params['name']):
+            return error_response(INVALID_PARAMETERS,
+                                  "El parámetro 'name' no puede contener rutas.")
+        catalog = request.GET.get('catalog')
+        if catalog and catalog != self.node.identifier:
+            return self.permission_error()
+        if not self.node.has_catalog_upload() or \
+                not self.node.latest_datasets().filter(identifier=params['dataset']).exists():
+            return error_response(UNKNOWN_DATASET,
+                                  f"El dataset {params['dataset']} no está en el último "
+                                  f"catálogo del nodo.")
+        return None
+
+
+class UploadCatalog(TokenAuthenticatedView):
+    http_method_names = ['post']
+    permission_error_message = \
+        'No se cuenta con los permisos necesarios para crear o modificar el catálogo.'
+
+    def post(self, request):
+        file_format = request.GET.get('format')
+        if file_format not in (CatalogUpload.FORMAT_JSON, CatalogUpload.FORMAT_XLSX):
+            return error_response(INVALID_PARAMETERS,
+                                  "El parámetro 'format' debe ser 'json' o 'xlsx'.")
+
+        replaced = self.node.has_catalog_upload()
+        try:
+            body = request_body_file(request)
+        except DownloadTooLargeError as e:
+            return error_response(TOO_LARGE, str(e), status=413)
+
+        # Un catálogo que no supera la validación no se guarda, salvo con 'store_invalid'
+        store_invalid = 'store_invalid' in request.GET
+        with body.file:
+            ingestion = CatalogIngestion({'node': self.node, 'format': file_format,
+                                          'file': body.file}, reject_invalid=not store_invalid)
+            try:
+                ingestion.run()
+            except ValidationError:
+                return error_response(UNREADABLE_CATALOG,
+                                      'No se pudo leer los contenidos del archivo.')
+            except InvalidCatalogError as e:
+                return error_response(INVALID_CATALOG, str(e),
+                                      failed_validations=e.error_messages)
+
+        return JsonResponse({
+            'urls': catalog_urls(request, self.node),
+            'replaced': replaced,
+            'unchanged': ingestion.unchanged,
+            'failed_validations': [] if ingestion.unchanged else ingestion.error_messages,
+        })
+
+
+class SyncCatalog(TokenAuthenticatedView):
+    http_method_names = ['post']
+
+    def post(self, request):
+        try:
+            errors = sync_catalog(self.node.id)
+        except CatalogUnchangedError:
+            return JsonResponse({'unchanged': True, 'failed_validations': []})
+        except CatalogSyncError as e:
+            return error_response(SYNC_ERROR, str(e))
+
+        return JsonResponse({'unchanged': False, 'failed_validations': errors})
+
+
+class ListCatalogs(TokenAuthenticatedView):
+    http_method_names = ['get']
+
+    def get(self, request):
+        uploads = CatalogUpload.objects.filter(node=self.node).order_by('-uploaded_at') \
+            .values('id', 'uploaded_at', 'format', 'content_hash', 'conversion_status',
+                    'json_file', 'xlsx_file')
+        return JsonResponse({'catalogs': [self.serialize(request, upload) for upload in uploads]})
+
+    def serialize(self, request, upload):
+        urls = {}
+        for file_format in (CatalogUpload.FORMAT_JSON, CatalogUpload.FORMAT_XLSX):
+            if upload[f'{file_format}_file']:
+                urls[file_format] = request.build_absolute_uri(reverse(
+                    'catalog:catalog_upload_download',
+                    kwargs={'node_id': self.node.id, 'pk': upload['id'],
+                            'file_format': file_format}))
+        return {
+            'id': upload['id'],
+            'uploaded_at': upload['uploaded_at'].isoformat(),
+            'format': upload['format'],
+            'content_hash': upload['content_hash'],
+            'conversion_status': upload['conversion_status'],
+            'latest': upload['id'] == self.node.latest_catalog_upload_id,
+            'urls': urls,
+        }
+
+
+class ListDistributions(TokenAuthenticatedView):
+    http_method_names = ['get']
+
+    def get(self, request):
+        latest_uploads = DistributionUpload.objects \
+            .filter(distribution=OuterRef('pk')) \
+            .order_by('-uploaded_at', '-id')
+        distributions = Distribution.objects.filter(catalog=self.node) \
+            .annotate(latest_uploaded_at=Subquery(latest_uploads.values('uploaded_at')[:1]),
+                      latest_file_hash=Subquery(latest_uploads.values('file_hash')[:1])) \
+            .filter(latest_uploaded_at__isnull=False) \
+            .order_by('identifier')
+        dataset_identifier = request.GET.get('dataset')
+        if dataset_identifier:
+            distributions = distributions.filter(dataset_identifier=dataset_identifier)
+
+        return JsonResponse({'distributions': [self.serialize(request, distribution)
+                                               for distribution in distributions]})
+
+    def serialize(self, request, distribution):
+        distribution.catalog = self.node
+        return {
+            'identifier': distribution.identifier,
+            'dataset_identifier': distribution.dataset_identifier,
+            'file_name': distribution.file_name,
+            'url': distribution_url(request, distribution),
+            'source_url': distribution.source_url,
+            'uploaded_at': distribution.latest_uploaded_at.isoformat(),
+            'file_hash': distribution.latest_file_hash,
+        }
@@ -19,9 +19,21 @@ class DistributionAdmin(admin.ModelAdmin):
     pass
 
 
+@admin.register(models.Dataset)
+class DatasetAdmin(admin.ModelAdmin):
+    list_display = ('identifier', 'title', 'node', 'catalog_upload')
+    list_filter = ('node',)
+
+
 @admin.register(models.DistributionUpload)
 class DistributionUploadAdmin(admin.ModelAdmin):
     pass
 
 
 admin.site.register(models.CatalogUpload, CatalogAdmin)
+
+
+@admin.register(models.StoredFile)
+class StoredFileAdmin(admin.ModelAdmin):
+    list_display = ('path', 'size', 'checksum')
+    search_fields = ('path',)
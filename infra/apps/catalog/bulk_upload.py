@@ -0,0 +1,282 @@
+import copy
+import csv
+import io
+import os
+import tarfile
+import zipfile
+from collections import namedtuple
+from urllib.parse import urlparse
+
+from django.core.exceptions import ValidationError
+from django.core.files import File
+from django.db import transaction
+from django.db.models import OuterRef, Subquery
+from django.utils import timezone
+from requests import RequestException
+
+from infra.apps.catalog.exceptions.catalog_not_uploaded_error import CatalogNotUploadedError
+from infra.apps.catalog.helpers.safe_file_name import is_safe_file_name
+from infra.apps.catalog.helpers.temp_file_from_url import CHUNK_SIZE, download_to_temp_file, \
+    write_temp_file
+from infra.apps.catalog.models import Distribution, DistributionUpload
+from infra.apps.catalog.storage.blob_store import release_blob
+
+CREATED = 'created'
+UPDATED = 'updated'
+UNCHANGED = 'unchanged'
+ERROR = 'error'
+
+BulkResult = namedtuple('BulkResult', ['entry', 'distribution_identifier', 'status', 'message'])
+
+# Una entrada de la carga: 'open' devuelve un stream del archivo (archivos comprimidos),
+# 'url' es la URL a descargar (manifiestos)
+BulkEntry = namedtuple('BulkEntry', ['name', 'distribution_identifier', 'file_name', 'open', 'url'])
+
+# Distribución resuelta para una entrada, con su última versión (None si es nueva)
+UploadTarget = namedtuple('UploadTarget', ['entry', 'identifier', 'distribution', 'created',
+                                           'latest_upload'])
+
+# Errores de una entrada que no impiden procesar las demás
+ENTRY_ERRORS = (ValidationError, RequestException, OSError, zipfile.BadZipFile, tarfile.TarError)
+
+
+def archive_entries(archive_file):
+    """Entradas de un zip o tar. Un archivo dentro de un directorio con el identificador de una
+    distribución se asigna a esa distribución; si no, se busca por el nombre del archivo."""
+    if zipfile.is_zipfile(archive_file):
+        archive_file.seek(0)
+        with zipfile.ZipFile(archive_file) as archive:
+            for info in archive.infolist():
+                if not info.is_dir():
+                    yield _archive_entry(info.filename,
+                                         lambda info=info: archive.open(info))
+        return
+
+    archive_file.seek(0)
+    try:
+        archive = tarfile.open(fileobj=archive_file, mode='r:*')
+    except tarfile.TarError:
+        raise ValidationError('El archivo no es un zip o tar válido')
+    with archive:
+        for member in archive:
+            if member.isfile():
+                yield _archive_entry(member.name,
+                                     lambda member=member: archive.extractfile(member))
+
+
+def _archive_entry(name, open_member):
+    parts = [part for part in name.split('/') if part and part != '.']
+    identifier = parts[-2] if len(parts) > 1 else None
+    return BulkEntry(name, identifier, parts[-1], open_member, None)
+
+
+def manifest_entries(manifest_file):
+    """Entradas de un manifiesto CSV con columnas 'url' y, opcionalmente,
+    'distribution_identifier' y 'file_name'."""
+    text = io.TextIOWrapper(manifest_file, encoding='utf-8-sig')
+    try:
+        reader = csv.DictReader(text)
+        if 'url' not in (reader.fieldnames or []):
+            raise ValidationError("El manifiesto debe tener una columna 'url'")
+        for row in reader:
+            url = (row.get('url') or '').strip()
+            file_name = (row.get('file_name') or '').strip() or \
+                os.path.basename(urlparse(url).path)
+            yield BulkEntry(url, (row.get('distribution_identifier') or '').strip() or None,
+                            file_name, None, url)
+    finally:
+        text.detach()
+
+
+def format_result(result):
+    line = f'{result.entry}: {result.status}'
+    if result.distribution_identifier:
+        line += f' ({result.distribution_identifier})'
+    if result.message:
+        line += f' - {result.message}'
+    return line
+
+
+def is_ignored(entry):
+    # Metadatos que agregan los compresores de macOS
+    return entry.name.startswith('__MACOSX/') or entry.file_name.startswith('._')
+
+
+class BulkDistributionUpload:  # pylint: disable=R0902
+    """Sube muchas distribuciones de un nodo a la vez. Los archivos se escriben en streaming
+    al blob store y las filas se crean con operaciones bulk dentro de una única transacción.
+    El catálogo se parsea una sola vez para resolver las distribuciones de cada entrada.
+    """
+
+    def __init__(self, node):
+        if not node.has_catalog_upload():
+            raise CatalogNotUploadedError
+        self.node = node
+        self.today = timezone.now().date()
+        self.catalog_distributions = {}
+        self.by_file_name = {}
+        for dataset in node.get_latest_catalog_upload().get_datasets():
+            for distribution in dataset.get('distribution') or []:
+                identifier = distribution.get('identifier')
+                if not identifier:
+                    continue
+                file_name = distribution.get('fileName')
+                self.catalog_distributions[identifier] = (dataset.get('identifier'), file_name)
+                if file_name:
+                    self.by_file_name.setdefault(file_name, []).append(identifier)
+
+        latest_upload_ids = DistributionUpload.objects \
+            .filter(distribution=OuterRef('pk')) \
+            .order_by('-uploaded_at', '-id') \
+            .values('id')[:1]
+        distributions = Distribution.objects.filter(catalog=node) \
+            .annotate(latest_upload_id=Subquery(latest_upload_ids))
+        self.distributions = {distribution.identifier: distribution
+                              for distribution in distributions}
+        self.latest_uploads = DistributionUpload.objects.in_bulk(
+            [distribution.latest_upload_id for distribution in self.distributions.values()
+             if distribution.latest_upload_id is not None])
+        self.results = []
+        self.resolved = set()
+        self.uploads = {}
+        self.previous_versions = []
+
+    def run(self, entries):
+        for entry in entries:
+            if is_ignored(entry):
+                continue
+            try:
+                self.add_entry(entry)
+            except ENTRY_ERRORS as e:
+                self.add_error(entry, e)
+        self.save()
+        return self.results
+
+    def add_error(self, entry, error):
+        message = error.messages[0] if isinstance(error, ValidationError) else str(error)
+        self.results.append(BulkResult(entry.name, entry.distribution_identifier, ERROR, message))
+
+    def resolve(self, entry):
+        identifier = entry.distribution_identifier
+        if entry.url is None and identifier not in self.catalog_distributions:
+            # En los archivos comprimidos el directorio puede no ser un identificador
+            identifier = None
+        if identifier is None:
+            candidates = self.by_file_name.get(entry.file_name, [])
+            if len(candidates) != 1:
+                raise ValidationError(f'No se encontró una única distribución del catálogo '
+                                      f'con el archivo {entry.file_name}')
+            identifier = candidates[0]
+        if identifier not in self.catalog_distributions:
+            raise ValidationError(f'La distribución {identifier} no está en el último catálogo')
+        if identifier in self.resolved:
+            raise ValidationError(f'La distribución {identifier} está repetida en la carga')
+        self.resolved.add(identifier)
+        return identifier
+
+    def add_entry(self, entry):
+        target = self.prepare(entry)
+        self.add_download(target, self.fetch(target))
+
+    def prepare(self, entry):
+        identifier = self.resolve(entry)
+        file_name = self.file_name(entry, identifier)
+        if not is_safe_file_name(file_name):
+            raise ValidationError(f'El nombre de archivo {file_name!r} no es válido')
+        distribution = self.distributions.get(identifier)
+        if distribution is None:
+            return UploadTarget(entry, identifier,
+                                Distribution(catalog=self.node, identifier=identifier), True, None)
+        latest_upload = self.latest_uploads.get(distribution.latest_upload_id)
+        return UploadTarget(entry, identifier, distribution, False, latest_upload)
+
+    def file_name(self, entry, identifier):
+        # El del manifiesto o el archivo comprimido, si no el 'fileName' del catálogo
+        return entry.file_name or self.catalog_distributions[identifier][1]
+
+    def fetch(self, target):
+        entry = target.entry
+        if entry.url:
+            return download_to_temp_file(entry.url, headers=self.conditional_headers(target))
+
+        with entry.open() as stream:
+            return write_temp_file(iter(lambda: stream.read(CHUNK_SIZE), b''), entry.name)
+
+    def conditional_headers(self, target):
+        if target.latest_upload is None:
+            return None
+        return target.distribution.conditional_headers(target.entry.url)
+
+    def add_download(self, target, download):
+        entry, identifier, distribution = target.entry, target.identifier, target.distribution
+        dataset_identifier = self.catalog_distributions[identifier][0]
+        file_name = self.file_name(entry, identifier)
+        latest_upload = target.latest_upload
+        if download is None or (latest_upload is not None and
+                                latest_upload.file_hash == download.sha256 and
+                                distribution.file_name == file_name):
+            if download is not None:
+                download.file.close()
+            self.results.append(BulkResult(entry.name, identifier, UNCHANGED, ''))
+            return
+
+        distribution.dataset_identifier = dataset_identifier
+        distribution.file_name = file_name
+        if entry.url:
+            distribution.source_url = entry.url
+            distribution.etag = download.headers.get('ETag', '')
+            distribution.last_modified = download.headers.get('Last-Modified', '')
+        else:
+            distribution.source_url = distribution.etag = distribution.last_modified = ''
+        distribution.schedule_harvest()
+
+        upload = DistributionUpload(distribution=distribution)
+        with download.file:
+            upload.file = File(download.file, name=file_name)
+            upload.store_file(download.sha256)
+
+        self.distributions[identifier] = distribution
+        self.uploads[identifier] = upload
+        self.results.append(BulkResult(entry.name, identifier,
+                                       CREATED if target.created else UPDATED, ''))
+
+    def save(self):
+        if not self.uploads:
+            return
+
+        distributions = [self.distributions[identifier] for identifier in self.uploads]
+        with transaction.atomic():
+            # Se leen antes de actualizar las distribuciones: sus rutas usan el nombre anterior
+            same_day_versions = {
+                version.distribution_id: version for version in
+                DistributionUpload.objects.select_related('distribution').filter(
+                    distribution__in=[d for d in distributions if d.pk is not None],
+                    uploaded_at=self.today)
+            }
+            Distribution.objects.bulk_upsert(self.node, distributions)
+
+            new_uploads, replaced_uploads = [], []
+            for upload in self.uploads.values():
+                upload.distribution = upload.distribution  # asigna distribution_id
+                version = same_day_versions.get(upload.distribution_id)
+                if version is None:
+                    new_uploads.append(upload)
+                    continue
+                # Con el mismo nombre la nueva versión ya reemplazó los archivos en disco
+                same_name = version.file.name == upload.file.name
+                self.previous_versions.append((copy.copy(version), same_name))
+                version.file, version.file_hash = upload.file.name, upload.file_hash
+                replaced_uploads.append(version)
+            DistributionUpload.objects.bulk_create(new_uploads)
+            DistributionUpload.objects.bulk_update(replaced_uploads, ['file', 'file_hash'])
+
+        self.remove_previous_versions()
+        for upload in self.uploads.values():
+            upload.file.storage.save_as_latest(upload)
+
+    def remove_previous_versions(self):
+        for version, same_name in self.previous_versions:
+            if same_name:
+                release_blob(version.file_hash)
+            else:
+                version.remove_files()
@@ -0,0 +1,119 @@
+import os
+import pickle
+import tempfile
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+
+
+class ParsedCatalogCache:
+    """Cache de catálogos parseados, indexada por el hash del contenido del archivo.
+
+    Tiene dos niveles: uno en memoria, propio de cada proceso, y uno en disco compartido
+    entre todos los workers. Ambos desalojan las entradas menos usadas recientemente
+    cuando se supera su presupuesto en bytes.
+    """
+
+    def __init__(self):
+        self._memory = OrderedDict()
+        self._memory_size = 0
+        self._lock = threading.Lock()
+
+    def get_or_set(self, content_hash, default):
+        value = self.get(content_hash)
+        if value is None:
+            value = default()
+            self.set(content_hash, value)
+        return value
+
+    def get(self, content_hash):
+        with self._lock:
+            entry = self._memory.get(content_hash)
+            if entry is not None:
+                self._memory.move_to_end(content_hash)
+                return entry[0]
+
+        path = self._disk_path(content_hash)
+        try:
+            with open(path, 'rb') as cached:
+                data = cached.read()
+            os.utime(path)
+        except OSError:
+            return None
+
+        value = pickle.loads(data)
+        self._set_in_memory(content_hash, value, len(data))
+        return value
+
+    def set(self, content_hash, value):
+        data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        self._set_in_memory(content_hash, value, len(data))
+        self._set_in_disk(content_hash, data)
+
+    def invalidate(self, content_hash):
+        with self._lock:
+            entry = self._memory.pop(content_hash, None)
+            if entry is not None:
+                self._memory_size -= entry[1]
+        try:
+            os.remove(self._disk_path(content_hash))
+        except FileNotFoundError:
+            pass
+
+    def clear_memory(self):
+        with self._lock:
+            self._memory.clear()
+            self._memory_size = 0
+
+    def _set_in_memory(self, content_hash, value, size):
+        budget = settings.CATALOG_CACHE_MEMORY_BYTES
+        if size > budget:
+            return
+        with self._lock:
+            previous = self._memory.pop(content_hash, None)
+            if previous is not None:
+                self._memory_size -= previous[1]
+            self._memory[content_hash] = (value, size)
+            self._memory_size += size
+            while self._memory_size > budget:
+                _, (_, evicted_size) = self._memory.popitem(last=False)
+                self._memory_size -= evicted_size
+
+    def _set_in_disk(self, content_hash, data):
+        if len(data) > settings.CATALOG_CACHE_DISK_BYTES:
+            return
+        directory = self._cache_dir()
+        os.makedirs(directory, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        with os.fdopen(fd, 'wb') as temp:
+            temp.write(data)
+        os.replace(temp_path, self._disk_path(content_hash))
+        self._evict_from_disk(directory)
+
+    def _evict_from_disk(self, directory):
+        entries = []
+        with os.scandir(directory) as directory_entries:
+            for entry in directory_entries:
+                if entry.name.endswith('.pickle'):
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+        total_size = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total_size <= settings.CATALOG_CACHE_DISK_BYTES:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total_size -= size
+
+    def _disk_path(self, content_hash):
+        return os.path.join(self._cache_dir(), f'{content_hash}.pickle')
+
+    def _cache_dir(self):
+        return settings.CATALOG_CACHE_DIR
+
+
+PARSED_CATALOG_CACHE = ParsedCatalogCache()
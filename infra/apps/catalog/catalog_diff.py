@@ -0,0 +1,51 @@
+import json
+
+
+def diff_hashes(previous, current):
+    previous_keys, current_keys = previous.keys(), current.keys()
+    return {
+        'added': sorted(current_keys - previous_keys),
+        'removed': sorted(previous_keys - current_keys),
+        'modified': sorted(key for key in current_keys & previous_keys
+                           if current[key] != previous[key]),
+    }
+
+
+def dataset_hashes(catalog_upload):
+    rows = catalog_upload.dataset_set.values_list('identifier', 'metadata_hash',
+                                                  'distribution_hashes')
+    return {identifier: (dataset_hash, distribution_hashes)
+            for identifier, dataset_hash, distribution_hashes in rows}
+
+
+def changed_distribution_hashes(datasets, identifiers):
+    hashes = {}
+    for identifier in identifiers:
+        _dataset_hash, distribution_hashes = datasets.get(identifier, ('', ''))
+        if distribution_hashes:
+            hashes.update(json.loads(distribution_hashes))
+    return hashes
+
+
+def catalog_diff(catalog_upload, previous_upload):
+    """Datasets y distribuciones agregados, eliminados y modificados respecto de la subida
+    anterior. Se comparan los hashes calculados al ingestar, sin volver a parsear los catálogos.
+    """
+    current = dataset_hashes(catalog_upload)
+    previous = dataset_hashes(previous_upload)
+    datasets = diff_hashes({identifier: hashes[0] for identifier, hashes in previous.items()},
+                           {identifier: hashes[0] for identifier, hashes in current.items()})
+
+    # Solo las distribuciones de datasets con cambios pueden haber cambiado
+    changed = datasets['added'] + datasets['removed'] + datasets['modified']
+    distributions = diff_hashes(changed_distribution_hashes(previous, changed),
+                                changed_distribution_hashes(current, changed))
+
+    return {
+        'previous_upload': {
+            'id': previous_upload.id,
+            'uploaded_at': previous_upload.uploaded_at.isoformat(),
+        },
+        'datasets': datasets,
+        'distributions': distributions,
+    }
@@ -0,0 +1,28 @@
+from infra.apps.catalog.models import PendingCompression
+from infra.apps.catalog.storage.infra_storage import InfraStorage
+from infra.apps.catalog.work_queue import WorkQueue
+
+
+class CompressionQueue(WorkQueue):
+    """Copias "latest" con variantes comprimidas pendientes. Los trabajos terminados, o que
+    agotaron sus intentos, se borran de la tabla."""
+    model = PendingCompression
+    settings_prefix = 'COMPRESSION'
+
+    def __init__(self, storage=None):
+        self.storage = storage or InfraStorage()
+
+    def run(self, job):
+        try:
+            self.storage.save_compressed_variants(job.path)
+        except FileNotFoundError:
+            # La copia se borró mientras tanto: no hay nada que comprimir
+            pass
+
+    def claimed(self, job):
+        # Si la ruta se volvió a encolar durante la compresión (una versión más nueva), la
+        # reserva cambió y la fila queda para comprimir esa versión
+        return PendingCompression.objects.filter(pk=job.pk, available_at=job.available_at)
+
+    def complete(self, job, values):
+        self.claimed(job).delete()
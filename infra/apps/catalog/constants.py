@@ -1,2 +1,3 @@
 
 CATALOG_ROOT = 'catalog'
+BLOBS_ROOT = 'blobs'
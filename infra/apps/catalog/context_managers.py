@@ -1,19 +1,19 @@
-import os
 from contextlib import contextmanager
 
-from django.conf import settings
+from infra.apps.catalog.storage.blob_store import release_blob
 
 
 @contextmanager
 def distribution_file_handler(same_day_version, new_file_name):
     try:
-        file_path_without_date = os.path.join(settings.MEDIA_ROOT, same_day_version.file_path())
-        file_path_with_date = \
-            os.path.join(settings.MEDIA_ROOT, same_day_version.file_path(with_date=True))
+        file_path_without_date = str(same_day_version.file_path())
+        file_path_with_date = str(same_day_version.file_path(with_date=True))
         yield
         if new_file_name != same_day_version.distribution.file_name:
-            os.remove(file_path_without_date)
-            os.remove(file_path_with_date)
+            storage = same_day_version.file.storage
+            storage.delete(file_path_without_date)
+            storage.delete(file_path_with_date)
+            release_blob(same_day_version.file_hash)
     except AttributeError:
         # No hay versión anterior, por lo que 'same_day_version' es None y 'file_path()' tira error
         yield
@@ -0,0 +1,31 @@
+from infra.apps.catalog.models import CatalogUpload
+from infra.apps.catalog.work_queue import WorkQueue
+
+
+class ConversionQueue(WorkQueue):
+    """Conversiones pendientes entre XLSX y JSON de los catálogos subidos."""
+    model = CatalogUpload
+    settings_prefix = 'CATALOG_CONVERSION'
+    available_field = 'conversion_available_at'
+    attempts_field = 'conversion_attempts'
+
+    def claimable(self):
+        return CatalogUpload.objects.filter(conversion_status__in=[
+            CatalogUpload.CONVERSION_PENDING, CatalogUpload.CONVERSION_CONVERTING])
+
+    def run(self, job):
+        job.create_new_file()
+
+    def claim_values(self, job):
+        return {'conversion_status': CatalogUpload.CONVERSION_CONVERTING}
+
+    def done_values(self, job, result):
+        return {'conversion_status': CatalogUpload.CONVERSION_DONE, 'conversion_error': ''}
+
+    def retry_values(self, job, error):
+        return {'conversion_status': CatalogUpload.CONVERSION_PENDING,
+                'conversion_error': str(error)}
+
+    def failed_values(self, job, error):
+        return {'conversion_status': CatalogUpload.CONVERSION_FAILED,
+                'conversion_error': str(error)}
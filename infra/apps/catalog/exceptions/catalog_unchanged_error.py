@@ -0,0 +1,5 @@
+class CatalogUnchangedError(RuntimeError):
+    def __init__(self, catalog):
+        super(CatalogUnchangedError, self).__init__(
+            'El catálogo no tiene cambios respecto de la última versión subida')
+        self.catalog = catalog
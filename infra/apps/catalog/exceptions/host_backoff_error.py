@@ -0,0 +1,5 @@
+from requests import RequestException
+
+
+class HostBackoffError(RequestException):
+    pass
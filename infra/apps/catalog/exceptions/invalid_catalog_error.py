@@ -0,0 +1,4 @@
+class InvalidCatalogError(RuntimeError):
+    def __init__(self, error_messages):
+        super(InvalidCatalogError, self).__init__('El catálogo no es válido.')
+        self.error_messages = error_messages
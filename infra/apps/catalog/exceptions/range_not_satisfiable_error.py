@@ -0,0 +1,2 @@
+class RangeNotSatisfiableError(Exception):
+    pass
@@ -44,9 +44,8 @@ class DistributionForm(forms.ModelForm):
     def __init__(self, *args, **kwargs):
         node = kwargs.pop('node')
         super(DistributionForm, self).__init__(*args, **kwargs)
-        latest = node.get_latest_catalog_upload()
-        datasets = [(dataset['identifier'], dataset['title'] + " - " + dataset['identifier'])
-                    for dataset in latest.get_datasets()]
+        datasets = [(dataset.identifier, dataset.choice_label())
+                    for dataset in node.latest_datasets().order_by('id')]
         initial_choice = self.instance.dataset_identifier if self.instance.pk else None
         self.fields['dataset_identifier'] = \
             forms.ChoiceField(choices=datasets, initial=initial_choice,
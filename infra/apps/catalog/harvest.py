@@ -0,0 +1,116 @@
+from collections import namedtuple
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import OuterRef, Subquery
+from django.utils import timezone
+from requests import RequestException
+
+from infra.apps.catalog.exceptions.host_backoff_error import HostBackoffError
+from infra.apps.catalog.helpers.parallel_downloads import DownloadJob, HostBackoff, \
+    parallel_downloads
+from infra.apps.catalog.models import DistributionUpload
+from infra.apps.catalog.models.distribution import Distribution
+
+UPDATED = 'updated'
+UNCHANGED = 'unchanged'
+POSTPONED = 'postponed'
+ERROR = 'error'
+
+HarvestResult = namedtuple('HarvestResult', ['node', 'distribution_identifier', 'status',
+                                             'message'])
+
+
+def due_distributions(now, nodes=None):
+    distributions = Distribution.objects \
+        .filter(next_harvest_at__lte=now) \
+        .exclude(source_url='')
+    if nodes:
+        distributions = distributions.filter(catalog__identifier__in=nodes)
+    return distributions
+
+
+def claim_due_distributions(now, limit=None, nodes=None):
+    """Toma las distribuciones a actualizar y corre su próxima actualización HARVEST_LEASE
+    segundos, para que otra ejecución en paralelo no las vuelva a tomar."""
+    with transaction.atomic():
+        ids = list(due_distributions(now, nodes)
+                   .order_by('next_harvest_at')
+                   .select_for_update(skip_locked=True)
+                   .values_list('pk', flat=True)[:limit])
+        Distribution.objects.filter(pk__in=ids) \
+            .update(next_harvest_at=now + timedelta(seconds=settings.HARVEST_LEASE))
+
+    latest_upload_ids = DistributionUpload.objects \
+        .filter(distribution=OuterRef('pk')) \
+        .order_by('-uploaded_at', '-id') \
+        .values('id')[:1]
+    return list(Distribution.objects.filter(pk__in=ids)
+                .select_related('catalog')
+                .annotate(latest_upload_id=Subquery(latest_upload_ids)))
+
+
+class Harvester:
+    """Actualiza las distribuciones cargadas desde una URL creando la versión del día igual que
+    la carga manual. Las descargas corren en paralelo, con a lo sumo 'per_node' simultáneas por
+    nodo; un host que falla repetidamente deja de recibir pedidos y sus distribuciones se
+    posponen.
+    """
+
+    def __init__(self, max_workers=None, per_node=None):
+        self.max_workers = max_workers or settings.HARVEST_MAX_WORKERS
+        self.per_node = per_node or settings.HARVEST_PER_NODE
+
+    def run(self, distributions):
+        latest_uploads = DistributionUpload.objects.in_bulk(
+            [distribution.latest_upload_id for distribution in distributions
+             if distribution.latest_upload_id is not None])
+
+        jobs = []
+        for distribution in distributions:
+            latest_upload = latest_uploads.get(distribution.latest_upload_id)
+            headers = distribution.conditional_headers(distribution.source_url) \
+                if latest_upload else None
+            jobs.append(DownloadJob((distribution, latest_upload), distribution.catalog_id,
+                                    distribution.source_url, headers))
+
+        backoff = HostBackoff(settings.HARVEST_HOST_MAX_FAILURES)
+        for job, download in parallel_downloads(jobs, self.max_workers, self.per_node, backoff):
+            distribution, latest_upload = job.item
+            yield self.harvest(distribution, latest_upload, download)
+
+    def harvest(self, distribution, latest_upload, download):
+        now = timezone.now()
+        if isinstance(download, HostBackoffError):
+            # No se intentó la descarga: no cuenta como un fallo de la distribución
+            distribution.postpone_harvest(str(download), now, failed=False)
+            status, message = POSTPONED, str(download)
+        elif isinstance(download, (RequestException, OSError)):
+            distribution.postpone_harvest(str(download), now)
+            status, message = ERROR, str(download)
+        elif isinstance(download, Exception):
+            raise download
+        else:
+            try:
+                Distribution.objects.upsert_download(distribution, distribution.source_url,
+                                                     download, latest_upload)
+            except OSError as e:
+                distribution.postpone_harvest(str(e), now)
+                status, message = ERROR, str(e)
+            else:
+                distribution.schedule_harvest(now)
+                status, message = (UNCHANGED if download is None else UPDATED), ''
+
+        distribution.save(update_fields=Distribution.HARVEST_FIELDS)
+        return HarvestResult(distribution.catalog.identifier, distribution.identifier, status,
+                             message)
+
+
+def next_due_at(nodes=None):
+    distributions = Distribution.objects.exclude(source_url='') \
+        .filter(next_harvest_at__isnull=False)
+    if nodes:
+        distributions = distributions.filter(catalog__identifier__in=nodes)
+    return distributions.order_by('next_harvest_at') \
+        .values_list('next_harvest_at', flat=True).first()
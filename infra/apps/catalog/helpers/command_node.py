@@ -0,0 +1,10 @@
+from django.core.management import CommandError
+
+from infra.apps.catalog.models import Node
+
+
+def get_command_node(identifier):
+    try:
+        return Node.objects.get(identifier=identifier)
+    except Node.DoesNotExist:
+        raise CommandError(f'No existe el nodo {identifier}')
@@ -0,0 +1,42 @@
+import heapq
+import itertools
+import tempfile
+
+
+def external_sort(lines, run_size, key=None):
+    """Ordena 'lines' (strings sin saltos de línea) con a lo sumo 'run_size' en memoria:
+    se ordenan tramos de 'run_size' que se escriben en archivos temporales y se combinan
+    con un merge. Genera las líneas ordenadas.
+    """
+    lines = iter(lines)
+    runs = []
+    try:
+        while True:
+            run = list(itertools.islice(lines, run_size))
+            run.sort(key=key)
+            if not runs and len(run) < run_size:
+                # Entra en memoria: no hace falta escribir nada
+                yield from run
+                return
+            if run:
+                runs.append(_write_run(run))
+            if len(run) < run_size:
+                break
+        yield from heapq.merge(*[_read_run(run_file) for run_file in runs], key=key)
+    finally:
+        for run_file in runs:
+            run_file.close()
+
+
+def _write_run(run):
+    # surrogateescape: los nombres de archivo no siempre son UTF-8 válido
+    run_file = tempfile.TemporaryFile('w+', encoding='utf-8', errors='surrogateescape',
+                                      newline='\n')
+    run_file.writelines(f'{line}\n' for line in run)
+    run_file.seek(0)
+    return run_file
+
+
+def _read_run(run_file):
+    for line in run_file:
+        yield line[:-1]
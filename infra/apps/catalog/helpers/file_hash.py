@@ -0,0 +1,9 @@
+import hashlib
+
+
+def file_sha256(file):
+    sha256 = hashlib.sha256()
+    for chunk in file.chunks():
+        sha256.update(chunk)
+    file.seek(0)
+    return sha256.hexdigest()
@@ -0,0 +1,182 @@
+import mimetypes
+import os
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.http import FileResponse, Http404, HttpResponse, HttpResponseNotModified, \
+    StreamingHttpResponse
+from django.utils.http import http_date, parse_etags, quote_etag
+
+from infra.apps.catalog.exceptions.range_not_satisfiable_error import RangeNotSatisfiableError
+from infra.apps.catalog.models import StoredFile
+from infra.apps.catalog.storage.compressed_variants import accepted_variants, is_compressible
+
+CHUNK_SIZE = 64 * 1024
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+COMPRESSED_CONTENT_TYPES = {
+    'bzip2': 'application/x-bzip',
+    'gzip': 'application/gzip',
+    'xz': 'application/x-xz',
+}
+
+
+def serve_media_file(request, name, download_name=None):
+    """Responde con el archivo 'name' (relativo a MEDIA_ROOT). Si MEDIA_SENDFILE_BACKEND
+    está configurado, la transferencia la hace el servidor web; si no, se envía en
+    streaming desde Django, soportando Range e If-None-Match.
+    """
+    name = str(name)
+    download_name = download_name or os.path.basename(name)
+    backend = settings.MEDIA_SENDFILE_BACKEND
+    compressible = is_compressible(name)
+
+    name, content_encoding, stored_file = select_variant(request, name, compressible, backend)
+    size, mtime, etag = file_metadata(name, stored_file)
+
+    if etag_matches(request.META.get('HTTP_IF_NONE_MATCH', ''), etag):
+        response = HttpResponseNotModified()
+        response['ETag'] = etag
+        if compressible:
+            response['Vary'] = 'Accept-Encoding'
+        return response
+
+    response = backend_response(request, backend, name, size, etag)
+    set_download_headers(response, download_name)
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(mtime)
+    response['Accept-Ranges'] = 'bytes'
+    if content_encoding:
+        response['Content-Encoding'] = content_encoding
+    if compressible:
+        response['Vary'] = 'Accept-Encoding'
+    return response
+
+
+def select_variant(request, name, compressible, backend):
+    """Elige la variante comprimida aceptada por el cliente, si existe. Devuelve la ruta a
+    servir, su Content-Encoding y su StoredFile (None si no está registrado)."""
+    variants = []
+    if compressible and backend != 'nginx':
+        # Con nginx la variante precomprimida la elige gzip_static
+        variants = accepted_variants(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+    stored_files = StoredFile.objects.for_paths(
+        [name] + [f'{name}{suffix}' for _encoding, suffix in variants])
+
+    for encoding, suffix in variants:
+        if f'{name}{suffix}' in stored_files:
+            return f'{name}{suffix}', encoding, stored_files[f'{name}{suffix}']
+    return name, None, stored_files.get(name)
+
+
+def backend_response(request, backend, name, size, etag):
+    if backend == 'nginx':
+        response = HttpResponse()
+        response['X-Accel-Redirect'] = \
+            quote(os.path.join(settings.MEDIA_ACCEL_REDIRECT_LOCATION, name))
+    elif backend == 'apache':
+        response = HttpResponse()
+        response['X-Sendfile'] = os.path.abspath(os.path.join(settings.MEDIA_ROOT, name))
+    elif not backend:
+        response = file_response(request, name, size, etag)
+    else:
+        raise ImproperlyConfigured(f'MEDIA_SENDFILE_BACKEND inválido: {backend}')
+    return response
+
+
+def set_download_headers(response, download_name):
+    content_type, file_encoding = mimetypes.guess_type(download_name)
+    # Un archivo comprimido se descarga tal cual, no como el contenido descomprimido
+    content_type = COMPRESSED_CONTENT_TYPES.get(file_encoding, content_type)
+    response['Content-Type'] = content_type or 'application/octet-stream'
+    response['Content-Disposition'] = f"attachment; filename*=UTF-8''{quote(download_name)}"
+
+
+def file_metadata(name, stored_file):
+    # Los metadatos guardados evitan acceder al disco antes de responder
+    if stored_file is not None:
+        size, mtime, checksum = stored_file.size, stored_file.mtime, stored_file.checksum
+    else:
+        try:
+            stat = os.stat(os.path.join(settings.MEDIA_ROOT, name))
+        except FileNotFoundError:
+            raise Http404
+        size, mtime, checksum = stat.st_size, stat.st_mtime, ''
+
+    etag = checksum or f'{size:x}-{int(mtime * 1000000):x}'
+    return size, mtime, quote_etag(etag)
+
+
+def etag_matches(header, etag):
+    etags = parse_etags(header)
+    if '*' in etags:
+        return True
+    # Comparación débil: se ignora el prefijo W/
+    return any(candidate.replace('W/', '', 1) == etag for candidate in etags)
+
+
+def file_response(request, name, size, etag):
+    path = os.path.join(settings.MEDIA_ROOT, name)
+    try:
+        byte_range = requested_range(request, size, etag)
+    except RangeNotSatisfiableError:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{size}'
+        return response
+
+    try:
+        file = open(path, 'rb')
+    except FileNotFoundError:
+        raise Http404
+
+    if byte_range is None:
+        # FileResponse usa wsgi.file_wrapper (sendfile) si el servidor lo soporta
+        return FileResponse(file)
+
+    start, end = byte_range
+    response = StreamingHttpResponse(read_range(file, start, end), status=206)
+    response['Content-Range'] = f'bytes {start}-{end}/{size}'
+    response['Content-Length'] = str(end - start + 1)
+    return response
+
+
+def requested_range(request, size, etag):
+    header = request.META.get('HTTP_RANGE')
+    if not header:
+        return None
+    if_range = request.META.get('HTTP_IF_RANGE')
+    if if_range and if_range != etag:
+        return None
+
+    match = RANGE_RE.match(header.strip())
+    if not match:
+        # Rangos múltiples o inválidos: se responde el archivo completo
+        return None
+
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        start, end = max(size - int(last), 0), size - 1
+    else:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+
+    if start >= size or start > end:
+        raise RangeNotSatisfiableError
+    return start, end
+
+
+def read_range(file, start, end):
+    with file:
+        file.seek(start)
+        remaining = end - start + 1
+        while remaining > 0:
+            chunk = file.read(min(CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
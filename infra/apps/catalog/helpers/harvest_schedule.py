@@ -0,0 +1,23 @@
+import hashlib
+from datetime import datetime
+
+from django.utils import timezone
+
+
+def slot_offset(key, interval):
+    digest = hashlib.sha256(key.encode()).hexdigest()
+    return int(digest[:12], 16) % interval
+
+
+def next_harvest_time(key, after, interval):
+    """Primer horario posterior a 'after' en el slot fijo de 'key' dentro de cada intervalo
+    (en segundos): las actualizaciones se reparten a lo largo del día en vez de hacerse
+    todas juntas, y cada una mantiene su horario entre ejecuciones."""
+    offset = slot_offset(key, interval)
+    start = (int(after.timestamp()) - offset) // interval * interval + offset + interval
+    return datetime.fromtimestamp(start, tz=timezone.utc)
+
+
+def retry_delay(failures, base, maximum):
+    # Backoff exponencial: base, 2 * base, 4 * base... hasta 'maximum' segundos
+    return min(base * 2 ** (max(failures, 1) - 1), maximum)
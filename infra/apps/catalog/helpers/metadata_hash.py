@@ -0,0 +1,7 @@
+import hashlib
+import json
+
+
+def metadata_hash(metadata):
+    serialized = json.dumps(metadata, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(serialized.encode('utf-8')).hexdigest()
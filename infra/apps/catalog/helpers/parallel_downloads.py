@@ -0,0 +1,131 @@
+import queue
+import threading
+from collections import deque, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+from infra.apps.catalog.exceptions.host_backoff_error import HostBackoffError
+from infra.apps.catalog.helpers.temp_file_from_url import download_to_temp_file, \
+    new_download_session
+
+# 'lane' agrupa las descargas que comparten el límite de concurrencia (p. ej. host o nodo);
+# 'item' es lo que el llamador necesita para procesar el resultado
+DownloadJob = namedtuple('DownloadJob', ['item', 'lane', 'url', 'headers'])
+
+
+def url_host(url):
+    return urlparse(url).netloc.lower()
+
+
+class HostBackoff:
+    """Cuenta los errores consecutivos de cada host: a partir de 'max_failures' no se le
+    hacen más pedidos hasta que termine la ejecución."""
+
+    def __init__(self, max_failures):
+        self.max_failures = max_failures
+        self.failures = {}
+        self.lock = threading.Lock()
+
+    def blocked(self, host):
+        with self.lock:
+            return self.failures.get(host, 0) >= self.max_failures
+
+    def record(self, host, failed):
+        with self.lock:
+            self.failures[host] = self.failures.get(host, 0) + 1 if failed else 0
+
+
+def parallel_downloads(jobs, max_workers, per_lane, backoff=None):
+    """Descarga las URLs de 'jobs' en un pool de 'max_workers' threads, con a lo sumo
+    'per_lane' descargas simultáneas por lane y una sesión (con conexiones reutilizables)
+    por host. Genera (job, resultado) a medida que terminan; el resultado es el Download,
+    None si la respuesta fue 304, o la excepción de la descarga.
+    """
+    lanes = {}
+    for job in jobs:
+        lanes.setdefault(job.lane, deque()).append(job)
+    sessions = _Sessions(max_workers)
+
+    # Acotada: cada descarga terminada mantiene abierto un archivo temporal
+    completed = queue.Queue(maxsize=max_workers)
+    cancelled = threading.Event()
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            try:
+                for pending in lanes.values():
+                    for _ in range(min(per_lane, len(pending))):
+                        executor.submit(_download_lane, pending, sessions, backoff, completed,
+                                        cancelled)
+                for _ in range(len(jobs)):
+                    yield completed.get()
+            finally:
+                # Libera a los threads que esperan lugar en la cola para que terminen
+                cancelled.set()
+                _discard(completed)
+    finally:
+        _discard(completed)
+
+
+class _Sessions:
+
+    def __init__(self, pool_maxsize):
+        self.pool_maxsize = pool_maxsize
+        self.sessions = {}
+        self.lock = threading.Lock()
+
+    def get(self, host):
+        with self.lock:
+            if host not in self.sessions:
+                self.sessions[host] = new_download_session(pool_connections=1,
+                                                           pool_maxsize=self.pool_maxsize)
+            return self.sessions[host]
+
+
+def _download_lane(pending, sessions, backoff, completed, cancelled):
+    # Los threads de una lane toman URLs de la misma cola: ningún thread del pool queda
+    # bloqueado esperando a una lane ocupada
+    while not cancelled.is_set():
+        try:
+            job = pending.popleft()
+        except IndexError:
+            return
+        result = _download(job, sessions, backoff)
+        if not _put(completed, (job, result), cancelled):
+            _close(result)
+
+
+def _download(job, sessions, backoff):
+    host = url_host(job.url)
+    if backoff is not None and backoff.blocked(host):
+        return HostBackoffError(f'Se pospuso la descarga: {host} falló repetidamente')
+    try:
+        result = download_to_temp_file(job.url, headers=job.headers, session=sessions.get(host))
+    except Exception as e:  # pylint: disable=W0703
+        result = e
+    if backoff is not None:
+        backoff.record(host, isinstance(result, Exception))
+    return result
+
+
+def _put(completed, item, cancelled):
+    while not cancelled.is_set():
+        try:
+            completed.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def _discard(completed):
+    while True:
+        try:
+            _job, result = completed.get_nowait()
+        except queue.Empty:
+            return
+        _close(result)
+
+
+def _close(result):
+    if result is not None and not isinstance(result, Exception):
+        result.file.close()
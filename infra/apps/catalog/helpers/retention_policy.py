@@ -0,0 +1,41 @@
+import calendar
+from collections import namedtuple
+from datetime import timedelta
+
+# Se conservan todas las versiones de los últimos 'daily_days' días, la última de cada semana
+# hasta 'weekly_months' meses atrás y la última de cada mes después de eso
+RetentionPolicy = namedtuple('RetentionPolicy', ['daily_days', 'weekly_months'])
+
+
+def months_before(date, months):
+    month_index = date.year * 12 + date.month - 1 - months
+    year, month = divmod(month_index, 12)
+    day = min(date.day, calendar.monthrange(year, month + 1)[1])
+    return date.replace(year=year, month=month + 1, day=day)
+
+
+def retention_bucket(date, policy, today):
+    """Período del que se conserva una sola versión, o None si se conservan todas."""
+    if date > today - timedelta(days=policy.daily_days):
+        return None
+    if date > months_before(today, policy.weekly_months):
+        year, week, _weekday = date.isocalendar()
+        return 'week', year, week
+    return 'month', date.year, date.month
+
+
+def versions_to_prune(versions, policy, today):
+    """Recibe (clave, fecha) de las versiones de un mismo archivo y devuelve las claves de
+    las que no conserva la política. La versión más reciente nunca se descarta.
+    """
+    kept_buckets = set()
+    pruned = []
+    # Entre versiones del mismo día se considera más reciente la de mayor clave (id)
+    newest_first = sorted(versions, key=lambda version: (version[1], version[0]), reverse=True)
+    for index, (key, date) in enumerate(newest_first):
+        bucket = retention_bucket(date, policy, today)
+        if index == 0 or bucket is None or bucket not in kept_buckets:
+            kept_buckets.add(bucket)
+            continue
+        pruned.append(key)
+    return pruned
@@ -0,0 +1,7 @@
+import os
+
+
+def is_safe_file_name(name):
+    # Un nombre con separadores o '..' permitiría escribir fuera del directorio de destino
+    return bool(name) and name not in ('.', '..') and os.path.basename(name) == name \
+        and '\0' not in name
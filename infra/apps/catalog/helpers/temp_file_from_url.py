@@ -1,14 +1,89 @@
+import hashlib
 import tempfile
+import time
+from collections import namedtuple
+from functools import lru_cache
 
-import requests
+from django.conf import settings
+from requests import Session, Timeout
+from requests.adapters import HTTPAdapter
 
+from infra.apps.catalog.exceptions.download_too_large_error import DownloadTooLargeError
 
-def temp_file_from_url(url):
-    response = requests.get(url)
-    response.raise_for_status()
+CHUNK_SIZE = 64 * 1024
+
+Download = namedtuple('Download', ['file', 'sha256', 'size', 'headers'])
+
+
+@lru_cache(maxsize=None)
+def download_session():
+    return new_download_session(pool_connections=10, pool_maxsize=10)
+
+
+def new_download_session(pool_connections, pool_maxsize):
+    session = Session()
+    adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+def download_to_temp_file(url, headers=None, session=None):
+    """Descarga la URL a un archivo temporal en chunks, calculando su SHA-256 a medida
+    que se escribe. Falla con DownloadTooLargeError si se supera DOWNLOAD_MAX_BYTES, y con
+    Timeout si la descarga completa demora más de DOWNLOAD_MAX_DURATION segundos
+    (DOWNLOAD_TIMEOUT solo limita la espera de cada lectura).
+
+    Devuelve None si el servidor responde 304 a un pedido condicional.
+    """
+    max_bytes = settings.DOWNLOAD_MAX_BYTES
+    deadline = time.monotonic() + settings.DOWNLOAD_MAX_DURATION
+    session = session or download_session()
+    with session.get(url, headers=headers, stream=True,
+                     timeout=settings.DOWNLOAD_TIMEOUT) as response:
+        response.raise_for_status()
+        if response.status_code == 304:
+            return None
+        content_length = response.headers.get('Content-Length')
+        if content_length and content_length.isdigit() and int(content_length) > max_bytes:
+            raise DownloadTooLargeError(f'{url} supera el tamaño máximo de {max_bytes} bytes')
+
+        chunks = _until_deadline(response.iter_content(chunk_size=CHUNK_SIZE), deadline, url)
+        return write_temp_file(chunks, url, response.headers)
+
+
+def _until_deadline(chunks, deadline, url):
+    # Un servidor que envía pocos bytes por vez nunca dispara el timeout de lectura
+    for chunk in chunks:
+        if time.monotonic() > deadline:
+            raise Timeout(f'{url} superó el tiempo máximo de descarga de '
+                          f'{settings.DOWNLOAD_MAX_DURATION} segundos')
+        yield chunk
+
+
+def write_temp_file(chunks, source_name, headers=None):
+    """Copia los chunks a un archivo temporal calculando su SHA-256, sin cargar el contenido
+    completo en memoria. Falla con DownloadTooLargeError si se supera DOWNLOAD_MAX_BYTES.
+    """
+    max_bytes = settings.DOWNLOAD_MAX_BYTES
+    fd = tempfile.NamedTemporaryFile(dir=settings.FILE_UPLOAD_TEMP_DIR)
+    sha256 = hashlib.sha256()
+    size = 0
+    try:
+        for chunk in chunks:
+            size += len(chunk)
+            if size > max_bytes:
+                raise DownloadTooLargeError(
+                    f'{source_name} supera el tamaño máximo de {max_bytes} bytes')
+            sha256.update(chunk)
+            fd.write(chunk)
+    except BaseException:
+        fd.close()
+        raise
 
-    file_content = response.content
-    fd = tempfile.TemporaryFile()
-    fd.write(file_content)
     fd.seek(0)
-    return fd
+    return Download(fd, sha256.hexdigest(), size, headers or {})
+
+
+def temp_file_from_url(url):
+    return download_to_temp_file(url).file
@@ -0,0 +1,81 @@
+import os
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+def scan_tree(root, directory, max_workers):
+    """Genera las rutas (relativas a 'root') de los archivos bajo 'directory', recorriendo los
+    directorios con os.scandir en un pool de 'max_workers' threads. El orden es arbitrario.
+    Los archivos y directorios que empiezan con '.' (temporales de escritura atómica) se
+    ignoran; los errores de lectura de un directorio se generan como excepciones.
+    """
+    results = queue.Queue(maxsize=max_workers * 4)
+    cancelled = threading.Event()
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        scan = _TreeScan(root, executor, results, cancelled)
+        scan.submit(directory)
+        try:
+            while True:
+                result = results.get()
+                if result is None:
+                    return
+                if isinstance(result, OSError):
+                    yield result
+                else:
+                    yield from result
+        finally:
+            # Libera a los threads que esperan lugar en la cola para que terminen
+            cancelled.set()
+
+
+class _TreeScan:
+
+    def __init__(self, root, executor, results, cancelled):
+        self.root = root
+        self.executor = executor
+        self.results = results
+        self.cancelled = cancelled
+        self.pending = 0
+        self.lock = threading.Lock()
+
+    def submit(self, directory):
+        with self.lock:
+            self.pending += 1
+        self.executor.submit(self.scan, directory)
+
+    def scan(self, directory):
+        if not self.cancelled.is_set():
+            self.put(self.scan_directory(directory))
+        with self.lock:
+            self.pending -= 1
+            finished = self.pending == 0
+        if finished:
+            self.put(None)
+
+    def scan_directory(self, directory):
+        files = []
+        try:
+            with os.scandir(os.path.join(self.root, directory)) as entries:
+                for entry in entries:
+                    if entry.name.startswith('.'):
+                        continue
+                    path = os.path.join(directory, entry.name)
+                    if entry.is_dir(follow_symlinks=False):
+                        self.submit(path)
+                    elif entry.is_file(follow_symlinks=False):
+                        files.append(path)
+        except FileNotFoundError:
+            # Directorio borrado durante el recorrido
+            return files
+        except OSError as e:
+            return e
+        return files
+
+    def put(self, item):
+        while not self.cancelled.is_set():
+            try:
+                self.results.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
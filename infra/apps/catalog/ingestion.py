@@ -0,0 +1,34 @@
+from infra.apps.catalog.exceptions.catalog_unchanged_error import CatalogUnchangedError
+from infra.apps.catalog.models import CatalogUpload
+
+
+class CatalogIngestion:
+    """Procesa la subida de un catálogo parseando el archivo una sola vez.
+
+    El DataJson obtenido al validar el formato del archivo se reutiliza en el
+    upsert, la conversión al otro formato y el reporte de validación. Si el
+    archivo es idéntico a la última versión subida no se procesa nuevamente. Con
+    'reject_invalid', un catálogo que no supera la validación no se guarda y se levanta
+    InvalidCatalogError.
+    """
+
+    def __init__(self, raw_data, reject_invalid=False):
+        self.raw_data = raw_data
+        self.reject_invalid = reject_invalid
+        self.catalog = None
+        self.error_messages = []
+        self.unchanged = False
+
+    def run(self):
+        try:
+            self.catalog = CatalogUpload.create_from_url_or_file(self.raw_data,
+                                                                 self.reject_invalid)
+        except CatalogUnchangedError as e:
+            self.catalog = e.catalog
+            self.unchanged = True
+            self.error_messages = [str(e)]
+            return self.catalog
+
+        # Un catálogo guardado con 'reject_invalid' ya se validó sin errores
+        self.error_messages = [] if self.reject_invalid else self.catalog.validate()
+        return self.catalog
@@ -0,0 +1,39 @@
+from django.core.exceptions import ValidationError
+from django.core.management import BaseCommand, CommandError
+
+from infra.apps.catalog.bulk_upload import ERROR, BulkDistributionUpload, archive_entries, \
+    format_result, manifest_entries
+from infra.apps.catalog.exceptions.catalog_not_uploaded_error import CatalogNotUploadedError
+from infra.apps.catalog.helpers.command_node import get_command_node
+
+
+class Command(BaseCommand):
+    help = 'Sube las distribuciones de un nodo desde un zip/tar o un manifiesto CSV de URLs'
+
+    def add_arguments(self, parser):
+        parser.add_argument('node', help='Identificador del nodo')
+        parser.add_argument('path', help='Archivo zip/tar, o CSV con columnas url, '
+                                         'distribution_identifier y file_name')
+        parser.add_argument('--manifest', action='store_true',
+                            help='Interpreta el archivo como manifiesto aunque no termine en .csv')
+
+    def handle(self, *args, **options):
+        node = get_command_node(options['node'])
+
+        path = options['path']
+        is_manifest = options['manifest'] or path.lower().endswith('.csv')
+        try:
+            with open(path, 'rb') as file:
+                entries = manifest_entries(file) if is_manifest else archive_entries(file)
+                results = BulkDistributionUpload(node).run(entries)
+        except CatalogNotUploadedError:
+            raise CommandError(f'No se encontraron catálogos subidos para el nodo: {node}')
+        except ValidationError as e:
+            raise CommandError(e.messages[0])
+
+        for result in results:
+            self.stdout.write(format_result(result))
+
+        failed = [result for result in results if result.status == ERROR]
+        if failed:
+            raise CommandError(f'{len(failed)} de {len(results)} entradas con errores')
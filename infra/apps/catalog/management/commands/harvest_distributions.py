@@ -0,0 +1,56 @@
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.management import BaseCommand
+from django.utils import timezone
+
+from infra.apps.catalog.harvest import Harvester, claim_due_distributions, next_due_at
+
+# Espera máxima entre dos rondas de --loop, para tomar las distribuciones nuevas
+MAX_SLEEP = 5 * 60
+
+
+class Command(BaseCommand):
+    help = 'Actualiza las distribuciones cargadas desde una URL cuyo horario de ' \
+           'actualización ya pasó'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--node', action='append', dest='nodes',
+                            help='Identificador de un nodo (se puede repetir)')
+        parser.add_argument('--limit', type=int,
+                            help='Cantidad máxima de distribuciones a actualizar por ronda')
+        parser.add_argument('--workers', type=int, default=settings.HARVEST_MAX_WORKERS,
+                            help='Cantidad máxima de descargas en paralelo')
+        parser.add_argument('--per-node', type=int, default=settings.HARVEST_PER_NODE,
+                            help='Cantidad máxima de descargas en paralelo de un mismo nodo')
+        parser.add_argument('--loop', action='store_true',
+                            help='No termina: espera hasta la próxima actualización pendiente')
+
+    def handle(self, *args, **options):
+        harvester = Harvester(options['workers'], options['per_node'])
+        while True:
+            self.harvest(harvester, options)
+            if not options['loop']:
+                return
+            time.sleep(self.seconds_until_next(options['nodes']))
+
+    def harvest(self, harvester, options):
+        distributions = claim_due_distributions(timezone.now(), options['limit'],
+                                                options['nodes'])
+        statuses = defaultdict(int)
+        for result in harvester.run(distributions):
+            statuses[result.status] += 1
+            line = f'{result.node}/{result.distribution_identifier}: {result.status}'
+            self.stdout.write(f'{line} ({result.message})' if result.message else line)
+        summary = ', '.join(f'{status}: {count}' for status, count in sorted(statuses.items()))
+        self.stdout.write(f'{len(distributions)} distribuciones actualizadas'
+                          + (f' ({summary})' if summary else ''))
+
+    @staticmethod
+    def seconds_until_next(nodes):
+        next_at = next_due_at(nodes)
+        if next_at is None:
+            return MAX_SLEEP
+        seconds = (next_at - timezone.now()).total_seconds()
+        return min(max(seconds, 1), MAX_SLEEP)
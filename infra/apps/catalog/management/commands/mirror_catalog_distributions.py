@@ -0,0 +1,35 @@
+from django.conf import settings
+from django.core.management import BaseCommand, CommandError
+
+from infra.apps.catalog.bulk_upload import ERROR, format_result
+from infra.apps.catalog.exceptions.catalog_not_uploaded_error import CatalogNotUploadedError
+from infra.apps.catalog.helpers.command_node import get_command_node
+from infra.apps.catalog.mirror import CatalogMirror
+
+
+class Command(BaseCommand):
+    help = 'Descarga en paralelo las distribuciones del último catálogo de un nodo ' \
+           'a partir de sus downloadURL'
+
+    def add_arguments(self, parser):
+        parser.add_argument('node', help='Identificador del nodo')
+        parser.add_argument('--workers', type=int, default=settings.MIRROR_MAX_WORKERS,
+                            help='Cantidad máxima de descargas en paralelo')
+        parser.add_argument('--per-host', type=int, default=settings.MIRROR_PER_HOST,
+                            help='Cantidad máxima de descargas en paralelo a un mismo host')
+
+    def handle(self, *args, **options):
+        node = get_command_node(options['node'])
+
+        try:
+            mirror = CatalogMirror(node, options['workers'], options['per_host'])
+        except CatalogNotUploadedError:
+            raise CommandError(f'No se encontraron catálogos subidos para el nodo: {node}')
+
+        results = mirror.run()
+        for result in results:
+            self.stdout.write(format_result(result))
+
+        failed = [result for result in results if result.status == ERROR]
+        if failed:
+            raise CommandError(f'{len(failed)} de {len(results)} distribuciones con errores')
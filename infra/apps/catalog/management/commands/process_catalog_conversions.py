@@ -0,0 +1,9 @@
+from infra.apps.catalog.conversion_queue import ConversionQueue
+from infra.apps.catalog.management.worker_command import WorkerCommand
+
+
+class Command(WorkerCommand):
+    help = 'Genera la versión XLSX/JSON de los catálogos subidos que tienen la conversión pendiente'
+    queue_class = ConversionQueue
+    jobs_name = 'conversiones'
+    processed_message = 'conversiones procesadas'
@@ -0,0 +1,9 @@
+from infra.apps.catalog.compression_queue import CompressionQueue
+from infra.apps.catalog.management.worker_command import WorkerCommand
+
+
+class Command(WorkerCommand):
+    help = 'Genera las variantes comprimidas pendientes de las últimas versiones de los archivos'
+    queue_class = CompressionQueue
+    jobs_name = 'compresiones'
+    processed_message = 'archivos comprimidos'
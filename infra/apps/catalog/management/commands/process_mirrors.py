@@ -0,0 +1,9 @@
+from infra.apps.catalog.mirror_queue import MirrorQueue
+from infra.apps.catalog.management.worker_command import WorkerCommand
+
+
+class Command(WorkerCommand):
+    help = 'Espeja las distribuciones de los nodos con pedidos de espejado pendientes'
+    queue_class = MirrorQueue
+    jobs_name = 'espejados'
+    processed_message = 'espejados procesados'
@@ -0,0 +1,40 @@
+from django.core.management import BaseCommand, CommandError
+
+from infra.apps.catalog.models import Node
+from infra.apps.catalog.retention import VersionPruner
+
+
+class Command(BaseCommand):
+    help = 'Borra las versiones históricas de catálogos y distribuciones que no conserva ' \
+           'la política de retención de cada nodo'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--node', action='append', dest='nodes',
+                            help='Identificador de un nodo (se puede repetir)')
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Informa lo que se borraría y los bytes a liberar, '
+                                 'sin borrar nada')
+        parser.add_argument('--batch-size', type=int,
+                            help='Cantidad de filas a borrar por lote')
+        parser.add_argument('--io-workers', type=int,
+                            help='Cantidad máxima de operaciones de disco en paralelo')
+
+    def handle(self, *args, **options):
+        nodes = Node.objects.order_by('identifier')
+        if options['nodes']:
+            nodes = nodes.filter(identifier__in=options['nodes'])
+            missing = set(options['nodes']) - {node.identifier for node in nodes}
+            if missing:
+                raise CommandError(f'No existen los nodos: {", ".join(sorted(missing))}')
+
+        total_bytes = 0
+        for node in nodes:
+            pruner = VersionPruner(node, options['dry_run'], options['batch_size'],
+                                   options['io_workers']).run()
+            total_bytes += pruner.bytes
+            self.stdout.write(f'{node.identifier}: {pruner.catalog_uploads} catálogos, '
+                              f'{pruner.distribution_uploads} versiones de distribuciones, '
+                              f'{pruner.files} archivos, {pruner.bytes} bytes')
+
+        action = 'Se liberarían' if options['dry_run'] else 'Se liberaron'
+        self.stdout.write(f'{action} {total_bytes} bytes')
@@ -0,0 +1,41 @@
+from collections import defaultdict
+
+from django.core.management import BaseCommand, CommandError
+
+from infra.apps.catalog.reconciliation import ORPHAN, MediaReconciliation
+
+
+class Command(BaseCommand):
+    help = 'Compara los archivos de MEDIA_ROOT/catalog con las rutas guardadas en la base e ' \
+           'informa (o corrige) los archivos huérfanos y las filas sin archivo'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--fix', action='store_true',
+                            help='Borra los archivos huérfanos y las filas sin archivo')
+        parser.add_argument('--workers', type=int,
+                            help='Cantidad de threads que recorren los directorios')
+        parser.add_argument('--run-size', type=int,
+                            help='Cantidad máxima de rutas a ordenar en memoria')
+        parser.add_argument('--batch-size', type=int,
+                            help='Filas por consulta y por lote de correcciones')
+
+    def handle(self, *args, **options):
+        reconciliation = MediaReconciliation(options['fix'], options['workers'],
+                                             options['run_size'], options['batch_size'])
+        statuses = defaultdict(int)
+        try:
+            for finding in reconciliation.run():
+                statuses[finding.status] += 1
+                if finding.status == ORPHAN:
+                    self.stdout.write(f'Huérfano: {finding.path}')
+                else:
+                    rows = ', '.join(f'{model} {pk}' for model, pk in finding.rows)
+                    self.stdout.write(f'Sin archivo: {finding.path} ({rows})')
+        except OSError as e:
+            raise CommandError(f'No se pudo recorrer {e.filename}: {e.strerror}')
+
+        self.stdout.write(f'{statuses[ORPHAN]} archivos huérfanos, '
+                          f'{sum(statuses.values()) - statuses[ORPHAN]} rutas sin archivo')
+        if options['fix']:
+            self.stdout.write(f'{reconciliation.removed_files} archivos borrados, '
+                              f'{reconciliation.deleted_rows} filas borradas')
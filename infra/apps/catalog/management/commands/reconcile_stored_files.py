@@ -0,0 +1,92 @@
+import os
+
+from django.conf import settings
+from django.core.files import File
+from django.core.management import BaseCommand
+
+from infra.apps.catalog.constants import CATALOG_ROOT
+from infra.apps.catalog.helpers.file_hash import file_sha256
+from infra.apps.catalog.helpers.tree_scan import scan_tree
+from infra.apps.catalog.models import StoredFile
+
+
+class Command(BaseCommand):
+    help = 'Sincroniza los metadatos de archivos guardados en la base con los archivos en disco'
+
+    def __init__(self, *args, **kwargs):
+        super(Command, self).__init__(*args, **kwargs)
+        self.options = {}
+        self.added = self.updated = self.checksummed = self.missing = 0
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Informa las diferencias sin corregirlas')
+        parser.add_argument('--checksums', action='store_true',
+                            help='Recalcula el SHA-256 de los archivos nuevos o modificados, '
+                                 'y lo completa en las filas que no lo tienen')
+        parser.add_argument('--batch-size', type=int, default=settings.RECONCILE_BATCH_SIZE,
+                            help='Cantidad de archivos o filas por consulta')
+
+    def handle(self, *args, **options):
+        # Los archivos y las filas se procesan en lotes, sin cargarlos todos en memoria
+        self.options = options
+        batch_size = options['batch_size']
+        batch = []
+        for path in scan_tree(settings.MEDIA_ROOT, CATALOG_ROOT,
+                              settings.RECONCILE_SCAN_WORKERS):
+            if isinstance(path, OSError):
+                # Sin el listado completo, sus filas se tomarían como inexistentes
+                raise path
+            batch.append(path)
+            if len(batch) >= batch_size:
+                self.reconcile_files(batch)
+                batch = []
+        self.reconcile_files(batch)
+
+        missing = []
+        rows = StoredFile.objects.filter(path__startswith=os.path.join(CATALOG_ROOT, '')) \
+            .values_list('path', flat=True)
+        for path in rows.iterator(chunk_size=batch_size):
+            if not os.path.lexists(os.path.join(settings.MEDIA_ROOT, path)):
+                self.stdout.write(f'Inexistente: {path}')
+                missing.append(path)
+        self.missing = len(missing)
+        if not options['dry_run']:
+            for start in range(0, len(missing), batch_size):
+                StoredFile.objects.filter(path__in=missing[start:start + batch_size]).delete()
+
+        self.stdout.write(f'{self.added} nuevos, {self.updated} modificados, '
+                          f'{self.checksummed} sin checksum, {self.missing} inexistentes')
+
+    def reconcile_files(self, paths):
+        stored_files = StoredFile.objects.for_paths(paths)
+        for path in paths:
+            absolute_path = os.path.join(settings.MEDIA_ROOT, path)
+            try:
+                stat = os.stat(absolute_path)
+            except FileNotFoundError:
+                # Borrado durante el recorrido: su fila se informa como inexistente
+                continue
+            stored_file = stored_files.get(path)
+            if stored_file is None:
+                self.added += 1
+                status = 'Nuevo'
+            elif stored_file.size != stat.st_size or stored_file.mtime != stat.st_mtime:
+                self.updated += 1
+                status = 'Modificado'
+            elif self.options['checksums'] and not stored_file.checksum:
+                # P. ej. las filas creadas por la migración, que no leen los archivos
+                self.checksummed += 1
+                status = 'Sin checksum'
+            else:
+                continue
+
+            self.stdout.write(f'{status}: {path}')
+            if not self.options['dry_run']:
+                StoredFile.objects.record(path, self.checksum(absolute_path))
+
+    def checksum(self, path):
+        if not self.options['checksums']:
+            return ''
+        with open(path, 'rb') as file:
+            return file_sha256(File(file))
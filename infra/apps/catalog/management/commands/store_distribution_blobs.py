@@ -0,0 +1,34 @@
+import os
+
+from django.core.management import BaseCommand
+
+from infra.apps.catalog.helpers.file_hash import file_sha256
+from infra.apps.catalog.models import Distribution, DistributionUpload
+from infra.apps.catalog.storage.blob_store import adopt_blob
+from infra.apps.catalog.storage.file_links import link_file
+
+
+class Command(BaseCommand):
+    help = 'Migra las versiones de distribuciones guardadas antes del blob store, ' \
+           'reemplazando las copias duplicadas por hardlinks'
+
+    def handle(self, *args, **options):
+        migrated = 0
+        uploads = DistributionUpload.objects.filter(file_hash='').order_by('id')
+        for upload in uploads.iterator():
+            path = upload.file.path
+            if not os.path.exists(path):
+                self.stderr.write(f'No existe el archivo de {upload}: {path}')
+                continue
+            upload.file_hash = file_sha256(upload.file)
+            upload.file.close()
+            link_file(adopt_blob(path, upload.file_hash), path)
+            upload.save(update_fields=['file_hash'])
+            migrated += 1
+
+        for distribution in Distribution.objects.iterator():
+            latest_upload = distribution.get_latest_upload()
+            if latest_upload and os.path.exists(latest_upload.file.path):
+                latest_upload.file.storage.save_as_latest(latest_upload)
+
+        self.stdout.write(f'{migrated} versiones migradas al blob store')
@@ -0,0 +1,64 @@
+import time
+
+from django.conf import settings
+from django.core.management import BaseCommand, CommandError
+
+from infra.apps.catalog.models import Node
+from infra.apps.catalog.sync import sync_nodes
+
+
+class Command(BaseCommand):
+    help = 'Sincroniza los catálogos de todos los nodos (o de los indicados) desde el file system'
+
+    def add_arguments(self, parser):
+        parser.add_argument('identifiers', nargs='*',
+                            help='Identificadores de los nodos a sincronizar (por defecto, todos)')
+        parser.add_argument('--exclude', nargs='+', default=[],
+                            help='Identificadores de nodos a excluir')
+        parser.add_argument('--concurrency', type=int, default=settings.SYNC_NODES_CONCURRENCY,
+                            help='Cantidad de procesos en paralelo (1 sincroniza secuencialmente)')
+
+    def handle(self, *args, **options):
+        nodes = self.get_nodes(options['identifiers'], options['exclude'])
+
+        start = time.perf_counter()
+        results = []
+        for result in sync_nodes(nodes, options['concurrency']):
+            results.append(result)
+            self.stdout.write(self.format_result(result))
+        elapsed = time.perf_counter() - start
+
+        self.write_summary(results, elapsed)
+        failed = [result for result in results if result.error]
+        if failed:
+            raise CommandError(f'Falló la sincronización de {len(failed)} nodos')
+
+    def get_nodes(self, identifiers, exclude):
+        nodes = Node.objects.exclude(identifier__in=exclude).order_by('identifier')
+        if not identifiers:
+            return list(nodes)
+
+        nodes = list(nodes.filter(identifier__in=identifiers))
+        missing = set(identifiers) - {node.identifier for node in nodes} - set(exclude)
+        if missing:
+            raise CommandError(f'No existen los nodos: {", ".join(sorted(missing))}')
+        return nodes
+
+    def format_result(self, result):
+        if result.error:
+            return self.style.ERROR(
+                f'{result.identifier}: {result.error} ({result.seconds:.2f}s)')
+        if result.unchanged:
+            return f'{result.identifier}: sin cambios ({result.seconds:.2f}s)'
+        return f'{result.identifier}: OK, {len(result.validation_errors)} errores de ' \
+               f'validación ({result.seconds:.2f}s)'
+
+    def write_summary(self, results, elapsed):
+        failed = [result for result in results if result.error]
+        unchanged = [result for result in results if result.unchanged]
+        self.stdout.write('')
+        self.stdout.write(f'{len(results)} nodos sincronizados en {elapsed:.2f}s, '
+                          f'{len(unchanged)} sin cambios, {len(failed)} con errores')
+        for result in sorted(results, key=lambda result: result.seconds, reverse=True):
+            status = 'ERROR' if result.error else 'IGUAL' if result.unchanged else 'OK'
+            self.stdout.write(f'  {result.identifier:<20} {status:<5} {result.seconds:8.2f}s')
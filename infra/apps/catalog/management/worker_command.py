@@ -0,0 +1,27 @@
+import time
+
+from django.core.management import BaseCommand
+
+
+class WorkerCommand(BaseCommand):
+    """Worker que procesa una WorkQueue hasta vaciarla y espera nuevos trabajos."""
+    queue_class = None
+    # Nombre de los trabajos en los mensajes, p. ej. 'conversiones'
+    jobs_name = ''
+    processed_message = ''
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true',
+                            help=f'Procesa {self.jobs_name} pendientes y termina')
+        parser.add_argument('--sleep', type=float, default=5,
+                            help=f'Segundos de espera cuando no hay {self.jobs_name} pendientes')
+
+    def handle(self, *args, **options):
+        queue = self.queue_class()  # pylint: disable=E1102
+        while True:
+            processed = queue.process_pending()
+            if processed:
+                self.stdout.write(f'{processed} {self.processed_message}')
+            if options['once']:
+                break
+            time.sleep(options['sleep'])
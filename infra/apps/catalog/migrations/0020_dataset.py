@@ -0,0 +1,76 @@
+# Generated by Django 2.2.2 on 2026-10-18 08:11
+
+import os
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+from pydatajson import DataJson
+
+from infra.apps.catalog.helpers.metadata_hash import metadata_hash
+
+
+def index_latest_catalog_uploads(apps, schema_editor):
+    """Indexa los datasets del último catálogo subido de cada nodo, que son los que se
+    leen al cargar distribuciones"""
+    Node = apps.get_model("catalog", "Node")
+    Dataset = apps.get_model("catalog", "Dataset")
+
+    for node in Node.objects.all():
+        catalog = node.catalogupload_set.order_by('uploaded_at').last()
+        if catalog is None:
+            continue
+
+        file_field, file_format = (catalog.json_file, 'json') if catalog.json_file \
+            else (catalog.xlsx_file, 'xlsx')
+        try:
+            datajson = DataJson(os.path.join(settings.MEDIA_ROOT, file_field.name),
+                                catalog_format=file_format)
+        except Exception:
+            continue
+
+        datasets = {}
+        for dataset in datajson.get('dataset') or []:
+            identifier = dataset.get('identifier') if isinstance(dataset, dict) else None
+            if identifier and identifier not in datasets:
+                datasets[identifier] = Dataset(node=node,
+                                               catalog_upload=catalog,
+                                               identifier=identifier,
+                                               title=dataset.get('title') or '',
+                                               metadata_hash=metadata_hash(dataset))
+        Dataset.objects.bulk_create(datasets.values())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0019_auto_20191113_1732'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='distribution',
+            name='catalog',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='catalog.Node'),
+        ),
+        migrations.CreateModel(
+            name='Dataset',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('identifier', models.CharField(max_length=200)),
+                ('title', models.TextField(blank=True)),
+                ('metadata_hash', models.CharField(max_length=64)),
+                ('catalog_upload', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='catalog.CatalogUpload')),
+                ('node', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='catalog.Node')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='dataset',
+            index=models.Index(fields=['node', 'identifier'], name='catalog_dat_node_id_e38989_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='dataset',
+            unique_together={('catalog_upload', 'identifier')},
+        ),
+        migrations.RunPython(index_latest_catalog_uploads, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 2.2.2 on 2026-10-18 08:13
+
+import hashlib
+import os
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def hash_catalog_upload_files(apps, schema_editor):
+    CatalogUpload = apps.get_model("catalog", "CatalogUpload")
+
+    for catalog in CatalogUpload.objects.all():
+        file_field = catalog.json_file if catalog.format == 'json' else catalog.xlsx_file
+        path = os.path.join(settings.MEDIA_ROOT, file_field.name)
+        if not file_field.name or not os.path.isfile(path):
+            continue
+
+        sha256 = hashlib.sha256()
+        with open(path, 'rb') as catalog_file:
+            for chunk in iter(lambda: catalog_file.read(64 * 1024), b''):
+                sha256.update(chunk)
+        catalog.content_hash = sha256.hexdigest()
+        catalog.save(update_fields=['content_hash'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0020_dataset'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='catalogupload',
+            name='content_hash',
+            field=models.CharField(blank=True, db_index=True, max_length=64),
+        ),
+        migrations.RunPython(hash_catalog_upload_files, migrations.RunPython.noop),
+    ]
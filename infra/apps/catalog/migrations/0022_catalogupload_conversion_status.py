@@ -0,0 +1,37 @@
+# Generated by Django 2.2.2 on 2026-10-18 08:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0021_catalogupload_content_hash'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='catalogupload',
+            name='conversion_attempts',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='catalogupload',
+            name='conversion_available_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='catalogupload',
+            name='conversion_error',
+            field=models.TextField(blank=True),
+        ),
+        migrations.AddField(
+            model_name='catalogupload',
+            name='conversion_status',
+            field=models.CharField(choices=[('pending', 'Pendiente'), ('converting', 'Convirtiendo'), ('done', 'Finalizada'), ('failed', 'Fallida')], default='done', max_length=10),
+        ),
+        migrations.AddIndex(
+            model_name='catalogupload',
+            index=models.Index(fields=['conversion_status', 'conversion_available_at'], name='catalog_cat_convers_292a47_idx'),
+        ),
+    ]
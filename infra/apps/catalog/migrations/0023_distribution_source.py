@@ -0,0 +1,28 @@
+# Generated by Django 2.2.2 on 2026-10-18 08:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0022_catalogupload_conversion_status'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='distribution',
+            name='etag',
+            field=models.CharField(blank=True, max_length=500),
+        ),
+        migrations.AddField(
+            model_name='distribution',
+            name='last_modified',
+            field=models.CharField(blank=True, max_length=100),
+        ),
+        migrations.AddField(
+            model_name='distribution',
+            name='source_url',
+            field=models.URLField(blank=True, max_length=2000),
+        ),
+    ]
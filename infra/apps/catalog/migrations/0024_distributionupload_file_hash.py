@@ -0,0 +1,18 @@
+# Generated by Django 2.2.2 on 2026-10-18 08:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0023_distribution_source'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='distributionupload',
+            name='file_hash',
+            field=models.CharField(blank=True, db_index=True, max_length=64),
+        ),
+    ]
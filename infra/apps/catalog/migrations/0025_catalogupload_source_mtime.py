@@ -0,0 +1,18 @@
+# Generated by Django 2.2.2 on 2026-10-18 08:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0024_distributionupload_file_hash'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='catalogupload',
+            name='source_mtime',
+            field=models.FloatField(blank=True, null=True),
+        ),
+    ]
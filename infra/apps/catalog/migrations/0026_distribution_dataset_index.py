@@ -0,0 +1,17 @@
+# Generated by Django 2.2.2 on 2026-10-18 08:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0025_catalogupload_source_mtime'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='distribution',
+            index=models.Index(fields=['catalog', 'dataset_identifier'], name='catalog_dis_catalog_a798fb_idx'),
+        ),
+    ]
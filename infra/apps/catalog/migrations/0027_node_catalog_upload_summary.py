@@ -0,0 +1,43 @@
+# Generated by Django 2.2.2 on 2026-10-18 08:36
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def summarize_catalog_uploads(apps, schema_editor):
+    Node = apps.get_model("catalog", "Node")
+
+    for node in Node.objects.all():
+        uploads = node.catalogupload_set.order_by('uploaded_at')
+        latest = uploads.last()
+        node.latest_catalog_upload = latest
+        node.catalog_upload_count = uploads.count()
+        node.last_upload_date = latest.uploaded_at if latest else None
+        node.save(update_fields=['latest_catalog_upload', 'catalog_upload_count',
+                                 'last_upload_date'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0026_distribution_dataset_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='node',
+            name='catalog_upload_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='node',
+            name='last_upload_date',
+            field=models.DateField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='node',
+            name='latest_catalog_upload',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='catalog.CatalogUpload'),
+        ),
+        migrations.RunPython(summarize_catalog_uploads, migrations.RunPython.noop),
+    ]
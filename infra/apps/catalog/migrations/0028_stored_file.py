@@ -0,0 +1,48 @@
+# Generated by Django 2.2.2 on 2026-10-18 08:40
+
+import os
+
+from django.conf import settings
+from django.db import migrations, models
+
+from infra.apps.catalog.helpers.tree_scan import scan_tree
+
+
+def record_stored_files(apps, schema_editor):
+    # Sin checksums: leer todos los archivos demoraría la migración.
+    # './manage.py reconcile_stored_files --checksums' los completa
+    StoredFile = apps.get_model("catalog", "StoredFile")
+    stored_files = []
+    for path in scan_tree(settings.MEDIA_ROOT, 'catalog', settings.RECONCILE_SCAN_WORKERS):
+        if isinstance(path, OSError):
+            raise path
+        try:
+            stat = os.stat(os.path.join(settings.MEDIA_ROOT, path))
+        except FileNotFoundError:
+            continue
+        stored_files.append(StoredFile(path=path, size=stat.st_size, mtime=stat.st_mtime))
+        if len(stored_files) >= 1000:
+            StoredFile.objects.bulk_create(stored_files)
+            stored_files = []
+    StoredFile.objects.bulk_create(stored_files)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0027_node_catalog_upload_summary'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StoredFile',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('path', models.CharField(max_length=1000, unique=True)),
+                ('size', models.BigIntegerField()),
+                ('mtime', models.FloatField()),
+                ('checksum', models.CharField(blank=True, max_length=64)),
+            ],
+        ),
+        migrations.RunPython(record_stored_files, migrations.RunPython.noop),
+    ]
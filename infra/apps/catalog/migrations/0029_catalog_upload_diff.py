@@ -0,0 +1,23 @@
+# Generated by Django 2.2.2 on 2026-10-18 08:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0028_stored_file'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='catalogupload',
+            name='diff',
+            field=models.TextField(blank=True),
+        ),
+        migrations.AddField(
+            model_name='dataset',
+            name='distribution_hashes',
+            field=models.TextField(blank=True),
+        ),
+    ]
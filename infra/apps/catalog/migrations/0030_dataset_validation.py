@@ -0,0 +1,25 @@
+# Generated by Django 2.2.2 on 2026-10-18 08:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0029_catalog_upload_diff'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DatasetValidation',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('validator_version', models.CharField(max_length=50)),
+                ('metadata_hash', models.CharField(max_length=64)),
+                ('errors', models.TextField()),
+            ],
+            options={
+                'unique_together': {('validator_version', 'metadata_hash')},
+            },
+        ),
+    ]
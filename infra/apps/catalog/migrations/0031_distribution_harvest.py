@@ -0,0 +1,44 @@
+# Generated by Django 2.2.2 on 2026-10-18 09:09
+
+from django.conf import settings
+from django.db import migrations, models
+from django.utils import timezone
+
+from infra.apps.catalog.helpers.harvest_schedule import next_harvest_time
+
+
+def schedule_url_distributions(apps, schema_editor):
+    Distribution = apps.get_model("catalog", "Distribution")
+    now = timezone.now()
+    distributions = list(Distribution.objects.exclude(source_url=''))
+    for distribution in distributions:
+        distribution.next_harvest_at = next_harvest_time(
+            f'{distribution.catalog_id}/{distribution.identifier}', now,
+            settings.HARVEST_INTERVAL)
+    Distribution.objects.bulk_update(distributions, ['next_harvest_at'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0030_dataset_validation'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='distribution',
+            name='harvest_failures',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='distribution',
+            name='last_harvest_error',
+            field=models.TextField(blank=True),
+        ),
+        migrations.AddField(
+            model_name='distribution',
+            name='next_harvest_at',
+            field=models.DateTimeField(blank=True, db_index=True, null=True),
+        ),
+        migrations.RunPython(schedule_url_distributions, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 2.2.2 on 2026-10-18 09:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0031_distribution_harvest'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='node',
+            name='retention_daily_days',
+            field=models.PositiveSmallIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='node',
+            name='retention_weekly_months',
+            field=models.PositiveSmallIntegerField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 2.2.2 on 2026-10-18 09:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0032_node_retention'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PendingCompression',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('path', models.CharField(max_length=1000, unique=True)),
+                ('attempts', models.PositiveSmallIntegerField(default=0)),
+                ('available_at', models.DateTimeField()),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='pendingcompression',
+            index=models.Index(fields=['available_at', 'id'], name='catalog_pen_availab_933936_idx'),
+        ),
+    ]
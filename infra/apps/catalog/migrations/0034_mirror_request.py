@@ -0,0 +1,32 @@
+# Generated by Django 2.2.2 on 2026-10-18 09:56
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0033_pending_compression'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MirrorRequest',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('pending', 'Pendiente'), ('running', 'En curso'), ('done', 'Finalizado'), ('failed', 'Fallido')], default='pending', max_length=10)),
+                ('attempts', models.PositiveSmallIntegerField(default=0)),
+                ('available_at', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('error', models.TextField(blank=True)),
+                ('results', models.TextField(blank=True)),
+                ('node', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='catalog.Node')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='mirrorrequest',
+            index=models.Index(fields=['status', 'available_at'], name='catalog_mir_status_9be9af_idx'),
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 2.2.2 on 2026-10-18 09:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0034_mirror_request'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='catalogupload',
+            name='source_mtime',
+        ),
+        migrations.AddField(
+            model_name='catalogupload',
+            name='source_signature',
+            field=models.CharField(blank=True, max_length=64),
+        ),
+    ]
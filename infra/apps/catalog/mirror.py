@@ -0,0 +1,60 @@
+import os
+from urllib.parse import urlparse
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+
+from infra.apps.catalog.bulk_upload import ENTRY_ERRORS, BulkDistributionUpload, BulkEntry
+from infra.apps.catalog.helpers.parallel_downloads import DownloadJob, parallel_downloads, \
+    url_host
+
+
+def catalog_entries(catalog_upload):
+    """Una entrada por cada distribución del catálogo con downloadURL."""
+    for dataset in catalog_upload.get_datasets():
+        for distribution in dataset.get('distribution') or []:
+            url = (distribution.get('downloadURL') or '').strip()
+            identifier = distribution.get('identifier')
+            if not url or not identifier:
+                continue
+            file_name = distribution.get('fileName') or os.path.basename(urlparse(url).path)
+            yield BulkEntry(url, identifier, file_name, None, url)
+
+
+class CatalogMirror(BulkDistributionUpload):
+    """Descarga en paralelo las distribuciones del último catálogo de un nodo.
+
+    Las descargas corren en un pool de threads acotado, con a lo sumo 'per_host'
+    conexiones simultáneas (y una sesión con conexiones reutilizables) por host. Los
+    archivos descargados se guardan a medida que terminan, y las filas se crean en bulk
+    al final, igual que en una carga masiva.
+    """
+
+    def __init__(self, node, max_workers=None, per_host=None):
+        super(CatalogMirror, self).__init__(node)
+        self.max_workers = max_workers or settings.MIRROR_MAX_WORKERS
+        self.per_host = per_host or settings.MIRROR_PER_HOST
+
+    def run(self, entries=None):
+        if entries is None:
+            entries = catalog_entries(self.node.get_latest_catalog_upload())
+
+        jobs = []
+        for entry in entries:
+            try:
+                target = self.prepare(entry)
+            except ValidationError as e:
+                self.add_error(entry, e)
+                continue
+            jobs.append(DownloadJob(target, url_host(entry.url), entry.url,
+                                    self.conditional_headers(target)))
+
+        for job, download in parallel_downloads(jobs, self.max_workers, self.per_host):
+            try:
+                if isinstance(download, Exception):
+                    raise download
+                self.add_download(job.item, download)
+            except ENTRY_ERRORS as e:
+                self.add_error(job.item.entry, e)
+        self.save()
+        return self.results
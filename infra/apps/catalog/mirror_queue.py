@@ -0,0 +1,37 @@
+import json
+
+from django.utils import timezone
+
+from infra.apps.catalog.exceptions.catalog_not_uploaded_error import CatalogNotUploadedError
+from infra.apps.catalog.mirror import CatalogMirror
+from infra.apps.catalog.models import MirrorRequest
+from infra.apps.catalog.work_queue import WorkQueue
+
+
+class MirrorQueue(WorkQueue):
+    """Pedidos de espejado de las distribuciones de un nodo."""
+    model = MirrorRequest
+    settings_prefix = 'MIRROR'
+    permanent_errors = (CatalogNotUploadedError,)
+
+    def claimable(self):
+        return MirrorRequest.objects.filter(status__in=MirrorRequest.IN_PROGRESS)
+
+    def run(self, job):
+        return CatalogMirror(job.node).run()
+
+    def claim_values(self, job):
+        return {'status': MirrorRequest.RUNNING}
+
+    def done_values(self, job, result):
+        return {'status': MirrorRequest.DONE, 'finished_at': timezone.now(), 'error': '',
+                'results': json.dumps([bulk_result._asdict() for bulk_result in result])}
+
+    def retry_values(self, job, error):
+        return {'status': MirrorRequest.PENDING, 'error': str(error)}
+
+    def failed_values(self, job, error):
+        if isinstance(error, CatalogNotUploadedError):
+            error = 'No se encontraron catálogos subidos para el nodo'
+        return {'status': MirrorRequest.FAILED, 'finished_at': timezone.now(),
+                'error': str(error), 'results': ''}
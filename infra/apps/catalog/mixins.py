@@ -1,20 +1,28 @@
 from django.contrib.auth.mixins import UserPassesTestMixin
+from django.db.models import Exists, OuterRef
 
 from infra.apps.catalog.models import Node
 
 
+def get_administered_node(user, node_id):
+    # Resuelve el nodo y el permiso del usuario en una única consulta
+    nodes = Node.objects.filter(id=node_id)
+    if not user.is_superuser:
+        admins = Node.admins.through.objects.filter(node=OuterRef('pk'), user=user.pk)
+        nodes = nodes.annotate(is_admin=Exists(admins)).filter(is_admin=True)
+    return nodes.first()
+
+
 class UserIsNodeAdminMixin(UserPassesTestMixin):
 
     def check_user_is_node_admin(self, user, node_id):
-        try:
-            node = Node.objects.get(id=node_id)
-        except Node.DoesNotExist:
-            return False
-        if user.is_superuser:
-            return True
-        return node in user.node_set.all()
+        return get_administered_node(user, node_id) is not None
 
     def test_func(self):
-        user = self.request.user
-        node_id = self.kwargs['node_id']
-        return self.check_user_is_node_admin(user, node_id)
+        # El nodo queda en el request para que las vistas no vuelvan a consultarlo
+        self.request.node = get_administered_node(self.request.user, self.kwargs['node_id'])
+        return self.request.node is not None
+
+    @property
+    def node(self):
+        return self.request.node
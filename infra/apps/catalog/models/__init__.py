@@ -1,10 +1,20 @@
 from .catalog_upload import CatalogUpload
 from .node import Node
+from .dataset import Dataset
+from .dataset_validation import DatasetValidation
 from .distribution import DistributionUpload, Distribution
+from .stored_file import StoredFile
+from .pending_compression import PendingCompression
+from .mirror_request import MirrorRequest
 
 __all__ = [
     'CatalogUpload',
     'Node',
+    'Dataset',
+    'DatasetValidation',
     'DistributionUpload',
     'Distribution',
+    'StoredFile',
+    'PendingCompression',
+    'MirrorRequest',
 ]
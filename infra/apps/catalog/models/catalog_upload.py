@@ -1,18 +1,30 @@
 # coding=utf-8
+import json
 import os
+import uuid
 
 from django.conf import settings
 from django.core.files import File
 from django.db import models, transaction
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
 from django.utils import timezone
 from pydatajson import DataJson
 from pydatajson.writers import write_xlsx_catalog, write_json_catalog
 
+from infra.apps.catalog.catalog_cache import PARSED_CATALOG_CACHE
+from infra.apps.catalog.catalog_diff import catalog_diff
 from infra.apps.catalog.constants import CATALOG_ROOT
+from infra.apps.catalog.exceptions.catalog_unchanged_error import CatalogUnchangedError
+from infra.apps.catalog.exceptions.invalid_catalog_error import InvalidCatalogError
+from infra.apps.catalog.helpers.file_hash import file_sha256
 from infra.apps.catalog.helpers.file_name_for_format import file_name_for_format
+from infra.apps.catalog.models.dataset import Dataset
+from infra.apps.catalog.models.stored_file import StoredFile
 from infra.apps.catalog.storage.catalog_storage import CustomJsonCatalogStorage, \
     CustomExcelCatalogStorage
 from infra.apps.catalog.validator.catalog_data_validator import CatalogDataValidator
+from infra.apps.catalog.validator.incremental_validation import validate_catalog
 
 
 def catalog_file_path(instance, file_format, _filename=None):
@@ -36,6 +48,9 @@ class CatalogUpload(models.Model):
         unique_together = (
             ('node', 'uploaded_at')
         )
+        indexes = [
+            models.Index(fields=['conversion_status', 'conversion_available_at']),
+        ]
 
     FORMAT_JSON = 'json'
     FORMAT_XLSX = 'xlsx'
@@ -44,6 +59,17 @@ class CatalogUpload(models.Model):
         (FORMAT_XLSX, 'XLSX'),
     ]
 
+    CONVERSION_PENDING = 'pending'
+    CONVERSION_CONVERTING = 'converting'
+    CONVERSION_DONE = 'done'
+    CONVERSION_FAILED = 'failed'
+    CONVERSION_STATUS_OPTIONS = [
+        (CONVERSION_PENDING, 'Pendiente'),
+        (CONVERSION_CONVERTING, 'Convirtiendo'),
+        (CONVERSION_DONE, 'Finalizada'),
+        (CONVERSION_FAILED, 'Fallida'),
+    ]
+
     node = models.ForeignKey(to='Node', on_delete=models.CASCADE, unique_for_date='uploaded_at')
     format = models.CharField(max_length=4, blank=False, null=False, choices=FORMAT_OPTIONS)
     uploaded_at = models.DateField(auto_now_add=True)
@@ -53,16 +79,31 @@ class CatalogUpload(models.Model):
     xlsx_file = models.FileField(upload_to=xlsx_catalog_file_path,
                                  storage=CustomExcelCatalogStorage(),
                                  null=True, blank=True)
+    content_hash = models.CharField(max_length=64, blank=True, db_index=True)
+    # mtime, tamaño e inodo del data.json del que se sincronizó (ver Node.sync)
+    source_signature = models.CharField(max_length=64, blank=True)
+    conversion_status = models.CharField(max_length=10,
+                                         choices=CONVERSION_STATUS_OPTIONS,
+                                         default=CONVERSION_DONE)
+    conversion_attempts = models.PositiveSmallIntegerField(default=0)
+    conversion_available_at = models.DateTimeField(null=True, blank=True)
+    conversion_error = models.TextField(blank=True)
+    # JSON con los cambios respecto de la subida anterior (vacío si es la primera)
+    diff = models.TextField(blank=True)
 
     def __init__(self, *args, **kwargs):
+        # Permite reutilizar el catálogo ya parseado al validar el archivo subido
+        datajson = kwargs.pop('datajson', None)
         super(CatalogUpload, self).__init__(*args, **kwargs)
-        self._datajson = None
+        self._datajson = datajson
 
     @property
     def datajson(self):
-        if not self._datajson:
-            file_field = self.json_file if self.json_file else self.xlsx_file
-            self._datajson = DataJson(file_field.file.name)
+        if self._datajson is None:
+            if self.json_file:
+                self._datajson = DataJson(self.json_file.path, catalog_format=self.FORMAT_JSON)
+            else:
+                self._datajson = DataJson(self.xlsx_file.path, catalog_format=self.FORMAT_XLSX)
 
         return self._datajson
 
@@ -72,14 +113,47 @@ class CatalogUpload(models.Model):
     def save(self, force_insert=False, force_update=False, using=None,
              update_fields=None):
         self.full_clean()
+        created = self._state.adding
+        source_file = self.json_file or self.xlsx_file
+        if created and source_file:
+            if not self.content_hash:
+                self.content_hash = file_sha256(source_file)
+            if settings.CATALOG_CONVERSIONS_ASYNC:
+                # La conversión al otro formato la hace el worker de process_catalog_conversions
+                self.conversion_status = self.CONVERSION_PENDING
+                self.conversion_available_at = timezone.now()
         super(CatalogUpload, self).save(force_insert, force_update, using, update_fields)
 
-        if not self.json_file or not self.xlsx_file:
+        if not created:
+            return
+
+        previous_upload = self.previous_upload()
+        self.node.update_catalog_upload_summary(created_upload=self)
+        Dataset.objects.bulk_create_from_catalog(self)
+        self.update_diff(previous_upload)
+        if self.conversion_status == self.CONVERSION_PENDING:
+            source_file.storage.save_as_latest(self)
+        elif not self.json_file or not self.xlsx_file:
             self.create_new_file()
 
     @classmethod
-    def create_from_url_or_file(cls, raw_data):
-        data = CatalogDataValidator().get_and_validate_data(raw_data)
+    def create_from_url_or_file(cls, raw_data, reject_invalid=False):
+        validator = CatalogDataValidator()
+        file_handler = validator.get_file(raw_data)
+        content_hash = file_sha256(File(file_handler))
+        unchanged = cls.unchanged_upload(raw_data['node'], raw_data['format'], content_hash)
+        if unchanged is not None:
+            file_handler.close()
+            raise CatalogUnchangedError(unchanged)
+
+        data = validator.validate_data(raw_data, file_handler)
+        if reject_invalid:
+            # Se valida antes del upsert: un catálogo rechazado no reemplaza la versión del día
+            error_messages = validate_catalog(data['datajson'])
+            if error_messages:
+                file_handler.close()
+                raise InvalidCatalogError(error_messages)
+        data['content_hash'] = content_hash
         catalog = cls.upsert(data)
 
         file_field = 'json_file' if data['format'] == 'json' else 'xlsx_file'
@@ -88,6 +162,14 @@ class CatalogUpload(models.Model):
 
         return catalog
 
+    @classmethod
+    def unchanged_upload(cls, node, file_format, content_hash):
+        latest = node.latest_catalog_upload
+        if latest is not None and latest.format == file_format \
+                and latest.content_hash == content_hash:
+            return latest
+        return None
+
     @classmethod
     def upsert(cls, data):
         with transaction.atomic():
@@ -96,43 +178,97 @@ class CatalogUpload(models.Model):
         return catalog
 
     def get_datasets(self):
+        if not self.content_hash:
+            return self.parse_datasets()
+        return PARSED_CATALOG_CACHE.get_or_set(self.content_hash, self.parse_datasets)
+
+    def parse_datasets(self):
+        # 'datajson' lee y parsea el archivo: solo se accede si el catálogo no está cacheado
         return self.datajson.get_datasets()
 
     def validate(self):
-        error_messages = []
-        file_field = self.json_file if self.json_file else self.xlsx_file
-        file_path = os.path.join(settings.MEDIA_ROOT, file_field.name)
-
         try:
-            data_json = DataJson(file_path)
+            data_json = self.datajson
         except KeyError:
             return ["No se puede validar el catálogo ingresado"]
 
-        if not data_json.is_valid_catalog():
-            error_report = data_json.validate_catalog()
-            errors = error_report['error']['catalog']['errors']
-
-            for dataset in error_report['error']['dataset']:
-                errors += dataset['errors']
-
-            error_messages = [error['message'] for error in errors]
-
-        return error_messages
+        return validate_catalog(data_json)
 
     def create_new_file(self):
-        get_existing_file_path = json_catalog_file_path if self.json_file \
-            else xlsx_catalog_file_path
         get_new_file_path = xlsx_catalog_file_path if self.json_file \
             else json_catalog_file_path
         write_new_file = write_xlsx_catalog if self.json_file else write_json_catalog
 
-        data = DataJson(os.path.join(settings.MEDIA_ROOT, get_existing_file_path(self)))
-        path = os.path.join(settings.MEDIA_ROOT, get_new_file_path(self))
-        write_new_file(data, path)
-        with open(path, 'rb+') as new_file:
-            if self.json_file:
-                self.xlsx_file.save(new_file.name, File(new_file))
-            else:
-                self.json_file.save(new_file.name, File(new_file))
-        self.xlsx_file.storage.save_as_latest(self)
-        self.json_file.storage.save_as_latest(self)
+        field_name = 'xlsx_file' if self.json_file else 'json_file'
+        storage = self._meta.get_field(field_name).storage
+
+        name = get_new_file_path(self)
+        # Nombre temporal único: dos conversiones del mismo catálogo no escriben el mismo archivo
+        temp_path = storage.path(os.path.join(
+            os.path.dirname(name), f'.tmp-{uuid.uuid4().hex}-{os.path.basename(name)}'))
+        try:
+            write_new_file(self.datajson, temp_path)
+            if storage.file_permissions_mode is not None:
+                os.chmod(temp_path, storage.file_permissions_mode)
+            # El archivo se escribe directamente en su ubicación final, sin copiarlo por el storage
+            os.replace(temp_path, storage.path(name))
+        except Exception:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        StoredFile.objects.record(name)
+        setattr(self, field_name, name)
+        self.save(update_fields=[field_name])
+
+        if self.is_latest_upload():
+            self.xlsx_file.storage.save_as_latest(self)
+            self.json_file.storage.save_as_latest(self)
+
+    def previous_upload(self):
+        return CatalogUpload.objects.filter(node=self.node_id, uploaded_at__lt=self.uploaded_at) \
+            .order_by('-uploaded_at').first()
+
+    def update_diff(self, previous_upload):
+        diff = catalog_diff(self, previous_upload) if previous_upload is not None else None
+        self.diff = json.dumps(diff) if diff is not None else ''
+        # update() y no save(): save() vuelve a validar todo el modelo
+        CatalogUpload.objects.filter(pk=self.pk).update(diff=self.diff)
+
+    def get_diff(self):
+        return json.loads(self.diff) if self.diff else None
+
+    def stored_files(self):
+        names = [file.name for file in (self.json_file, self.xlsx_file) if file]
+        return StoredFile.objects.for_paths(names)
+
+    def is_latest_upload(self):
+        return self.node.latest_catalog_upload_id == self.id
+
+    def conversion_in_progress(self):
+        return self.conversion_status in (self.CONVERSION_PENDING, self.CONVERSION_CONVERTING)
+
+
+@receiver(post_delete, sender=CatalogUpload)
+def update_node_catalog_upload_summary(sender, instance, **_kwargs):
+    # Si se está borrando el nodo en cascada ya no hay nada que actualizar
+    node_model = sender._meta.get_field('node').related_model
+    node = node_model.objects.filter(pk=instance.node_id).first()
+    if node is not None:
+        node.update_catalog_upload_summary()
+
+
+@receiver(post_delete, sender=CatalogUpload)
+def update_next_catalog_upload_diff(sender, instance, **_kwargs):
+    # La subida siguiente pasa a compararse con la anterior a la borrada
+    next_upload = sender.objects.filter(node=instance.node_id,
+                                        uploaded_at__gt=instance.uploaded_at) \
+        .order_by('uploaded_at').first()
+    if next_upload is not None:
+        next_upload.update_diff(next_upload.previous_upload())
+
+
+@receiver(post_delete, sender=CatalogUpload)
+def invalidate_parsed_catalog(sender, instance, **_kwargs):
+    if instance.content_hash and \
+            not sender.objects.filter(content_hash=instance.content_hash).exists():
+        PARSED_CATALOG_CACHE.invalidate(instance.content_hash)
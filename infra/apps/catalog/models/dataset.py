@@ -0,0 +1,61 @@
+import json
+
+from django.db import models
+
+from infra.apps.catalog.helpers.metadata_hash import metadata_hash
+
+
+def distribution_hashes(dataset):
+    hashes = {}
+    for distribution in dataset.get('distribution') or []:
+        identifier = distribution.get('identifier') if isinstance(distribution, dict) else None
+        if identifier:
+            hashes[identifier] = metadata_hash(distribution)
+    return json.dumps(hashes, sort_keys=True)
+
+
+class DatasetManager(models.Manager):
+
+    def bulk_create_from_catalog(self, catalog_upload):
+        try:
+            catalog_datasets = catalog_upload.get_datasets()
+        except KeyError:
+            catalog_datasets = []
+
+        datasets = {}
+        for dataset in catalog_datasets:
+            identifier = dataset.get('identifier') if isinstance(dataset, dict) else None
+            if not identifier or identifier in datasets:
+                continue
+            datasets[identifier] = self.model(node=catalog_upload.node,
+                                              catalog_upload=catalog_upload,
+                                              identifier=identifier,
+                                              title=dataset.get('title') or '',
+                                              metadata_hash=metadata_hash(dataset),
+                                              distribution_hashes=distribution_hashes(dataset))
+
+        return self.bulk_create(datasets.values())
+
+
+class Dataset(models.Model):
+    class Meta:
+        unique_together = ('catalog_upload', 'identifier')
+        indexes = [
+            models.Index(fields=['node', 'identifier']),
+        ]
+
+    objects = DatasetManager()
+
+    node = models.ForeignKey(to='Node', on_delete=models.CASCADE)
+    catalog_upload = models.ForeignKey(to='CatalogUpload', on_delete=models.CASCADE)
+    identifier = models.CharField(max_length=200)
+    title = models.TextField(blank=True)
+    metadata_hash = models.CharField(max_length=64)
+    # JSON {identificador de distribución: hash de su metadata}
+    distribution_hashes = models.TextField(blank=True)
+
+    def __str__(self):
+        return f'{self.identifier} ({self.node.identifier})'
+
+    def choice_label(self):
+        return f'{self.title} - {self.identifier}'
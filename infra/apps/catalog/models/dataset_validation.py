@@ -0,0 +1,35 @@
+import json
+
+from django.db import models
+
+
+class DatasetValidationManager(models.Manager):
+
+    def cached_errors(self, validator_version, metadata_hashes):
+        validations = self.filter(validator_version=validator_version,
+                                  metadata_hash__in=set(metadata_hashes))
+        return {validation.metadata_hash: json.loads(validation.errors)
+                for validation in validations}
+
+    def store(self, validator_version, errors_by_hash):
+        self.bulk_create([self.model(validator_version=validator_version,
+                                     metadata_hash=metadata_hash,
+                                     errors=json.dumps(errors))
+                          for metadata_hash, errors in errors_by_hash.items()],
+                         ignore_conflicts=True)
+
+
+class DatasetValidation(models.Model):
+    """Errores de validación de un dataset, indexados por el hash de su metadata y la
+    versión del validador."""
+    class Meta:
+        unique_together = ('validator_version', 'metadata_hash')
+
+    objects = DatasetValidationManager()
+
+    validator_version = models.CharField(max_length=50)
+    metadata_hash = models.CharField(max_length=64)
+    errors = models.TextField()
+
+    def __str__(self):
+        return self.metadata_hash
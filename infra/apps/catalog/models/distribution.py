@@ -1,5 +1,6 @@
 import os
 import shutil
+from datetime import timedelta
 from pathlib import Path
 
 from django.conf import settings
@@ -8,8 +9,13 @@ from django.db import models
 from django.utils import timezone
 
 from infra.apps.catalog.context_managers import distribution_file_handler
-from infra.apps.catalog.helpers.temp_file_from_url import temp_file_from_url
+from infra.apps.catalog.exceptions.catalog_not_uploaded_error import CatalogNotUploadedError
+from infra.apps.catalog.helpers.file_hash import file_sha256
+from infra.apps.catalog.helpers.harvest_schedule import next_harvest_time, retry_delay
+from infra.apps.catalog.helpers.temp_file_from_url import download_to_temp_file
 from infra.apps.catalog.models.node import Node
+from infra.apps.catalog.models.stored_file import StoredFile
+from infra.apps.catalog.storage.blob_store import adopt_blob, release_blob
 from infra.apps.catalog.storage.distribution_storage import \
     DistributionStorage, distribution_directory
 
@@ -34,25 +40,74 @@ class DistributionManager(models.Manager):
                       'file_name': data['file_name']}
         )
 
-        if not created and data['file_name'] != distribution.file_name:
-            same_day_version = distribution.distributionupload_set \
-                .get(uploaded_at=timezone.now().date(),)
-
-            file_path_without_date = os.path.join(settings.MEDIA_ROOT, same_day_version.file_path())
-            file_path_with_date = \
-                os.path.join(settings.MEDIA_ROOT, same_day_version.file_path(with_date=True))
-            os.remove(file_path_without_date)
-            os.remove(file_path_with_date)
+        renamed = not created and data['file_name'] != distribution.file_name
+        if renamed:
+            same_day_version = DistributionUpload.get_version_from_same_day(distribution)
+            if same_day_version is not None:
+                same_day_version.remove_files()
 
             distribution.dataset_identifier = data['dataset_identifier']
             distribution.file_name = data['file_name']
             distribution.save()
 
-        file = data.get('file') or File(temp_file_from_url(data['url']))
+        if data.get('file'):
+            upload = self._upsert_version(distribution, data['file'])
+            distribution.update_source()
+            return upload
+
+        url = data['url']
+        latest_upload = None if created or renamed else distribution.get_latest_upload()
+        headers = distribution.conditional_headers(url) if latest_upload else None
+        download = download_to_temp_file(url, headers=headers)
+        return self.upsert_download(distribution, url, download, latest_upload)
+
+    def upsert_download(self, distribution, url, download, latest_upload):
+        """Crea o reemplaza la versión del día con lo descargado de 'url' ('download' es None
+        si el servidor respondió 304 a un pedido condicional)."""
+        if download is None:
+            # 304: sin transferencia; los validadores de la versión anterior siguen vigentes
+            upload = self._upsert_unchanged_version(distribution, latest_upload)
+            distribution.update_source(url, {'ETag': distribution.etag,
+                                             'Last-Modified': distribution.last_modified})
+            return upload
+
+        with download.file:
+            # El hash ya se calculó durante la descarga: no se vuelve a leer el archivo
+            upload = self._upsert_version(distribution, File(download.file), download.sha256)
+        distribution.update_source(url, download.headers)
+        return upload
+
+    def bulk_upsert(self, node, distributions):
+        """Crea las distribuciones nuevas y actualiza las existentes con dos consultas bulk."""
+        new_distributions = [distribution for distribution in distributions
+                             if distribution.pk is None]
+        self.bulk_create(new_distributions)
+        # No todas las bases devuelven los ids creados por bulk_create
+        saved = dict(self.filter(catalog=node,
+                                 identifier__in=[d.identifier for d in new_distributions])
+                     .values_list('identifier', 'pk'))
+        for distribution in new_distributions:
+            distribution.pk = saved[distribution.identifier]
+        self.bulk_update(distributions, ['dataset_identifier', 'file_name', 'source_url', 'etag',
+                                         'last_modified'] + Distribution.HARVEST_FIELDS)
+
+    def _upsert_unchanged_version(self, distribution, latest_upload):
+        # La versión del día tiene su propia ruta fechada, un hardlink al blob de la anterior:
+        # así borrar o renombrar una de las dos no afecta a la otra
+        file_hash = latest_upload.file_hash
+        if not file_hash:
+            # Versión anterior al blob store
+            file_hash = file_sha256(latest_upload.file)
+            adopt_blob(latest_upload.file.path, file_hash)
+        name = distribution_file_path(DistributionUpload(distribution=distribution,
+                                                         uploaded_at=timezone.now().date()))
+        latest_upload.file.storage.link_blob(name, file_hash)
+        return self._upsert_version(distribution, name, file_hash)
+
+    def _upsert_version(self, distribution, file, file_hash=''):
         upload, _ = distribution.distributionupload_set.update_or_create(
             uploaded_at=timezone.now().date(),
-            defaults={'file': file}
-
+            defaults={'file': file, 'file_hash': file_hash}
         )
         return upload
 
@@ -60,6 +115,9 @@ class DistributionManager(models.Manager):
 class Distribution(models.Model):
     class Meta:
         unique_together = ('identifier', 'catalog')
+        indexes = [
+            models.Index(fields=['catalog', 'dataset_identifier']),
+        ]
 
     objects = DistributionManager()
 
@@ -67,19 +125,70 @@ class Distribution(models.Model):
     dataset_identifier = models.CharField(max_length=64)
     file_name = models.CharField(max_length=800)
     identifier = models.CharField(max_length=64)
+    source_url = models.URLField(max_length=2000, blank=True)
+    etag = models.CharField(max_length=500, blank=True)
+    last_modified = models.CharField(max_length=100, blank=True)
+    # Próxima actualización desde source_url (harvest_distributions)
+    next_harvest_at = models.DateTimeField(null=True, blank=True, db_index=True)
+    harvest_failures = models.PositiveSmallIntegerField(default=0)
+    last_harvest_error = models.TextField(blank=True)
+
+    HARVEST_FIELDS = ['next_harvest_at', 'harvest_failures', 'last_harvest_error']
 
     def save(self, force_insert=False, force_update=False, using=None,
              update_fields=None):
-        self.catalog.get_latest_catalog_upload()  # Validación de que hay un upload
+        if not self.catalog.has_catalog_upload():
+            raise CatalogNotUploadedError
         super(Distribution, self).save(force_insert, force_update, using, update_fields)
 
     def delete(self, using=None, keep_parents=False):
+        file_hashes = set(self.distributionupload_set.values_list('file_hash', flat=True))
         super(Distribution, self).delete(using=using, keep_parents=keep_parents)
         shutil.rmtree(os.path.join(settings.MEDIA_ROOT, distribution_directory(self)))
+        StoredFile.objects.forget_directory(distribution_directory(self))
+        for file_hash in file_hashes:
+            release_blob(file_hash)
 
     def __str__(self):
         return f'{self.identifier} ({self.catalog.identifier})'
 
+    def get_latest_upload(self):
+        return self.distributionupload_set.order_by('-uploaded_at', '-id').first()
+
+    def conditional_headers(self, url):
+        headers = {}
+        if url != self.source_url:
+            return headers
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+    def update_source(self, url='', response_headers=None):
+        response_headers = response_headers or {}
+        self.source_url = url
+        self.etag = response_headers.get('ETag', '')
+        self.last_modified = response_headers.get('Last-Modified', '')
+        self.schedule_harvest()
+        self.save(update_fields=['source_url', 'etag', 'last_modified'] + self.HARVEST_FIELDS)
+
+    def schedule_harvest(self, now=None):
+        self.next_harvest_at = next_harvest_time(f'{self.catalog_id}/{self.identifier}',
+                                                 now or timezone.now(),
+                                                 settings.HARVEST_INTERVAL) \
+            if self.source_url else None
+        self.harvest_failures = 0
+        self.last_harvest_error = ''
+
+    def postpone_harvest(self, error, now=None, failed=True):
+        if failed:
+            self.harvest_failures += 1
+        delay = retry_delay(self.harvest_failures, settings.HARVEST_RETRY_DELAY,
+                            settings.HARVEST_INTERVAL)
+        self.next_harvest_at = (now or timezone.now()) + timedelta(seconds=delay)
+        self.last_harvest_error = error
+
 
 class DistributionUpload(models.Model):
     distribution = models.ForeignKey(to=Distribution, on_delete=models.CASCADE)
@@ -87,11 +196,52 @@ class DistributionUpload(models.Model):
     file = models.FileField(upload_to=distribution_file_path,
                             storage=DistributionStorage(),
                             max_length=1000)
+    file_hash = models.CharField(max_length=64, blank=True, db_index=True)
 
     def save(self, force_insert=False, force_update=False, using=None,
              update_fields=None):
+        # Un archivo ya guardado (p. ej. una versión sin cambios) no se vuelve a copiar
+        file_is_new = not self.file._committed
+        previous_hash = None
+        if file_is_new:
+            if self.pk:
+                previous_hash = DistributionUpload.objects.filter(pk=self.pk) \
+                    .values_list('file_hash', flat=True).first()
+            # Un hash asignado junto con el archivo nuevo se usa tal cual; el de la versión
+            # anterior corresponde a otro archivo
+            self.store_file(self.file_hash if self.file_hash != previous_hash else None)
         super(DistributionUpload, self).save(force_insert, force_update, using, update_fields)
-        self.file.storage.save_as_latest(self)
+        if file_is_new:
+            self.file.storage.save_as_latest(self)
+            release_blob(previous_hash)
+
+    def store_file(self, file_hash=None):
+        # El contenido se guarda una única vez en el blob store, indexado por su SHA-256;
+        # la ruta fechada y la "latest" son hardlinks a ese blob
+        self.file_hash = file_hash or file_sha256(self.file)
+        # 'uploaded_at' (auto_now_add) forma parte de la ruta y todavía no fue asignado
+        self._meta.get_field('uploaded_at').pre_save(self, self._state.adding)
+        name = self.file.field.generate_filename(self, self.file.name)
+        self.file = self.file.storage.save_blob(name, self.file, self.file_hash)
+
+    def delete(self, using=None, keep_parents=False):
+        result = super(DistributionUpload, self).delete(using=using, keep_parents=keep_parents)
+        if not self.is_path_shared(self.file.name):
+            self.file.storage.delete(self.file.name)
+        release_blob(self.file_hash)
+        return result
+
+    def remove_files(self):
+        storage = self.file.storage
+        storage.delete(str(self.file_path()))
+        dated_path = str(self.file_path(with_date=True))
+        if not self.is_path_shared(dated_path):
+            storage.delete(dated_path)
+        release_blob(self.file_hash)
+
+    def is_path_shared(self, name):
+        # Otra fila puede seguir usando la misma ruta fechada; borrarla perdería sus datos
+        return DistributionUpload.objects.filter(file=name).exclude(pk=self.pk).exists()
 
     @classmethod
     def update_or_create(cls, distribution, file):
@@ -125,3 +275,6 @@ class DistributionUpload(models.Model):
 
     def file_path_with_date(self):
         return self.file_path(with_date=True)
+
+    def stored_file(self):
+        return StoredFile.objects.filter(path=self.file.name).first()
@@ -0,0 +1,51 @@
+import json
+
+from django.db import models
+from django.utils import timezone
+
+
+class MirrorRequestManager(models.Manager):
+
+    def enqueue(self, node):
+        # Si el nodo ya tiene un espejado sin terminar, no se encola otro
+        pending = self.filter(node=node, status__in=self.model.IN_PROGRESS).first()
+        if pending is not None:
+            return pending
+        return self.create(node=node, available_at=timezone.now())
+
+
+class MirrorRequest(models.Model):
+    """Pedido de espejado de las distribuciones del último catálogo de un nodo. Lo procesa el
+    worker de process_mirrors."""
+    class Meta:
+        indexes = [models.Index(fields=['status', 'available_at'])]
+
+    objects = MirrorRequestManager()
+
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUS_OPTIONS = [
+        (PENDING, 'Pendiente'),
+        (RUNNING, 'En curso'),
+        (DONE, 'Finalizado'),
+        (FAILED, 'Fallido'),
+    ]
+    IN_PROGRESS = (PENDING, RUNNING)
+
+    node = models.ForeignKey(to='Node', on_delete=models.CASCADE)
+    status = models.CharField(max_length=10, choices=STATUS_OPTIONS, default=PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    available_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    error = models.TextField(blank=True)
+    # Resultados por distribución (BulkResult) serializados en JSON
+    results = models.TextField(blank=True)
+
+    def __str__(self):
+        return f'{self.node} ({self.get_status_display()})'
+
+    def get_results(self):
+        return json.loads(self.results) if self.results else []
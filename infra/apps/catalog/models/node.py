@@ -1,34 +1,102 @@
+import os
+
 from django.conf import settings
+from django.core.files import File
 from django.db import models
 
 from infra.apps.catalog.exceptions.catalog_not_uploaded_error import CatalogNotUploadedError
+from infra.apps.catalog.exceptions.catalog_unchanged_error import CatalogUnchangedError
+from infra.apps.catalog.helpers.file_hash import file_sha256
+from infra.apps.catalog.helpers.retention_policy import RetentionPolicy
 from infra.apps.catalog.models.catalog_upload import CatalogUpload
+from infra.apps.catalog.models.dataset import Dataset
 from infra.apps.catalog.storage.paths import latest_json_catalog_path
 from infra.apps.catalog.helpers.temp_uploaded_file import temp_uploaded_file
 from infra.apps.catalog.validator.catalog_data_validator import CatalogDataValidator
 
 
+def stat_signature(stat):
+    # Con el mtime solo, un archivo reescrito dentro de la resolución del reloj o con el mtime
+    # preservado (cp -p, rsync -t) pasaría por no modificado
+    return f'{stat.st_mtime_ns}:{stat.st_size}:{stat.st_ino}'
+
+
 class Node(models.Model):
     identifier = models.CharField(max_length=20, unique=True)
     admins = models.ManyToManyField(settings.AUTH_USER_MODEL, blank=True)
+    # Resumen de los catálogos subidos, mantenido por CatalogUpload al crear y borrar
+    latest_catalog_upload = models.ForeignKey(to='CatalogUpload', on_delete=models.SET_NULL,
+                                              null=True, blank=True, related_name='+')
+    catalog_upload_count = models.PositiveIntegerField(default=0)
+    last_upload_date = models.DateField(null=True, blank=True)
+    # Política de retención propia del nodo (vacío: la global de settings)
+    retention_daily_days = models.PositiveSmallIntegerField(null=True, blank=True)
+    retention_weekly_months = models.PositiveSmallIntegerField(null=True, blank=True)
 
     def __str__(self):
         return self.identifier
 
     def get_latest_catalog_upload(self):
-        catalog = self.catalogupload_set.order_by('uploaded_at').last()
-        if catalog is None:
+        if self.latest_catalog_upload_id is None:
             raise CatalogNotUploadedError
 
-        return catalog
+        return self.latest_catalog_upload
+
+    def retention_policy(self):
+        return RetentionPolicy(
+            daily_days=self.retention_daily_days
+            if self.retention_daily_days is not None else settings.RETENTION_DAILY_DAYS,
+            weekly_months=self.retention_weekly_months
+            if self.retention_weekly_months is not None else settings.RETENTION_WEEKLY_MONTHS,
+        )
+
+    def has_catalog_upload(self):
+        return self.latest_catalog_upload_id is not None
+
+    def latest_datasets(self):
+        if not self.has_catalog_upload():
+            raise CatalogNotUploadedError
+
+        return Dataset.objects.filter(catalog_upload=self.latest_catalog_upload_id)
+
+    def update_catalog_upload_summary(self, created_upload=None):
+        uploads = self.catalogupload_set.order_by('uploaded_at')
+        latest = uploads.last()
+        if created_upload is not None and latest == created_upload:
+            latest = created_upload
+        self.latest_catalog_upload = latest
+        self.catalog_upload_count = uploads.count()
+        self.last_upload_date = latest.uploaded_at if latest else None
+        # update() y no save(): el nodo puede estar borrándose en cascada
+        Node.objects.filter(pk=self.pk).update(latest_catalog_upload=latest,
+                                               catalog_upload_count=self.catalog_upload_count,
+                                               last_upload_date=self.last_upload_date)
 
     def sync(self):
         path = latest_json_catalog_path(self.identifier)
+        source_signature = stat_signature(os.stat(path))
+        latest = self.latest_catalog_upload
+        if latest is not None and latest.source_signature == source_signature:
+            raise CatalogUnchangedError(latest)
+
+        with open(path, 'rb') as catalog_file:
+            content_hash = file_sha256(File(catalog_file))
+            unchanged = CatalogUpload.unchanged_upload(self, 'json', content_hash)
+            if unchanged is not None:
+                # Se registra el stat para no volver a leer el archivo en la próxima sincronización
+                unchanged.source_signature = source_signature
+                unchanged.save(update_fields=['source_signature'])
+                raise CatalogUnchangedError(unchanged)
 
-        catalog_data = CatalogDataValidator().get_and_validate_data({
-            'file': temp_uploaded_file(open(path, 'rb')),
-            'node': self,
-            'format': 'json',
-        })
+            catalog_data = CatalogDataValidator().get_and_validate_data({
+                'file': temp_uploaded_file(catalog_file),
+                'node': self,
+                'format': 'json',
+            })
 
-        return CatalogUpload.upsert(catalog_data)
+        catalog_data['content_hash'] = content_hash
+        catalog = CatalogUpload.upsert(catalog_data)
+        # data.json pasa a ser un link a la nueva versión fechada
+        catalog.source_signature = stat_signature(os.stat(path))
+        catalog.save(update_fields=['source_signature'])
+        return catalog
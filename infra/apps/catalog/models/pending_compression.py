@@ -0,0 +1,29 @@
+from django.db import models
+from django.utils import timezone
+
+
+class PendingCompressionManager(models.Manager):
+
+    def enqueue(self, path):
+        # Una nueva versión de la misma ruta reinicia los intentos y vuelve a quedar disponible
+        pending, _ = self.update_or_create(path=str(path), defaults={
+            'attempts': 0,
+            'available_at': timezone.now(),
+        })
+        return pending
+
+
+class PendingCompression(models.Model):
+    """Copia "latest" (ruta relativa a MEDIA_ROOT) cuyas variantes comprimidas todavía no se
+    generaron. La procesa el worker de process_compressions."""
+    class Meta:
+        indexes = [models.Index(fields=['available_at', 'id'])]
+
+    objects = PendingCompressionManager()
+
+    path = models.CharField(max_length=1000, unique=True)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    available_at = models.DateTimeField()
+
+    def __str__(self):
+        return self.path
@@ -0,0 +1,50 @@
+import os
+
+from django.conf import settings
+from django.db import models
+
+
+class StoredFileManager(models.Manager):
+
+    def record(self, path, checksum=''):
+        stat = os.stat(os.path.join(settings.MEDIA_ROOT, path))
+        stored_file, _ = self.update_or_create(path=str(path), defaults={
+            'size': stat.st_size,
+            'mtime': stat.st_mtime,
+            'checksum': checksum,
+        })
+        return stored_file
+
+    def record_link(self, source, destination):
+        # Un hardlink comparte tamaño, mtime y contenido con el archivo original
+        stored_file = self.filter(path=str(source)).first()
+        if stored_file is None:
+            return self.record(destination)
+
+        stored_file, _ = self.update_or_create(path=str(destination), defaults={
+            'size': stored_file.size,
+            'mtime': stored_file.mtime,
+            'checksum': stored_file.checksum,
+        })
+        return stored_file
+
+    def forget(self, path):
+        self.filter(path=str(path)).delete()
+
+    def forget_directory(self, directory):
+        self.filter(path__startswith=os.path.join(str(directory), '')).delete()
+
+    def for_paths(self, paths):
+        return self.in_bulk([str(path) for path in paths], field_name='path')
+
+
+class StoredFile(models.Model):
+    objects = StoredFileManager()
+
+    path = models.CharField(max_length=1000, unique=True)
+    size = models.BigIntegerField()
+    mtime = models.FloatField()
+    checksum = models.CharField(max_length=64, blank=True)
+
+    def __str__(self):
+        return self.path
@@ -0,0 +1,253 @@
+import os
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from itertools import chain, groupby
+
+from django.conf import settings
+from django.core.files import File
+from django.db.models import Q
+
+from infra.apps.catalog.constants import BLOBS_ROOT, CATALOG_ROOT
+from infra.apps.catalog.helpers.external_sort import external_sort
+from infra.apps.catalog.helpers.file_hash import file_sha256
+from infra.apps.catalog.helpers.tree_scan import scan_tree
+from infra.apps.catalog.models import CatalogUpload, Distribution, DistributionUpload, Node, \
+    StoredFile
+from infra.apps.catalog.storage.blob_store import blob_path, release_blob
+from infra.apps.catalog.storage.compressed_variants import VARIANT_SUFFIXES, is_compressible
+from infra.apps.catalog.storage.distribution_storage import distribution_directory_path
+from infra.apps.catalog.storage.paths import catalog_path
+
+ORPHAN = 'orphan'
+DANGLING = 'dangling'
+
+# Referencias a rutas desde la base: filas de cada modelo y copias "latest" esperadas
+CATALOG_UPLOAD = 'catalog_upload'
+DISTRIBUTION_UPLOAD = 'distribution_upload'
+LATEST = 'latest'
+
+# 'rows' son los (modelo, id) que referencian a 'path' (vacío para los huérfanos)
+Finding = namedtuple('Finding', ['status', 'path', 'rows'])
+
+
+def _escape(path):
+    # Las rutas se guardan una por línea en los archivos temporales del ordenamiento
+    return path.replace('\\', '\\\\').replace('\n', '\\n').replace('\t', '\\t')
+
+
+def _unescape(line):
+    path, _separator, rest = line.partition('\t')
+    unescaped = []
+    characters = iter(path)
+    for character in characters:
+        if character == '\\':
+            character = {'n': '\n', 't': '\t'}.get(next(characters, ''), '\\')
+        unescaped.append(character)
+    return ''.join(unescaped), rest
+
+
+def _path_key(line):
+    return line.partition('\t')[0]
+
+
+def _with_variants(path):
+    yield path
+    if is_compressible(path):
+        for suffix in VARIANT_SUFFIXES:
+            yield f'{path}{suffix}'
+
+
+def referenced_paths(chunk_size):
+    """Genera una línea 'ruta<TAB>modelo<TAB>id' por cada ruta a la que hace referencia la
+    base, leyendo las filas en chunks sin cargarlas todas en memoria."""
+    uploads = CatalogUpload.objects.values_list('id', 'json_file', 'xlsx_file')
+    for upload_id, json_file, xlsx_file in uploads.iterator(chunk_size=chunk_size):
+        for name in (json_file, xlsx_file):
+            if name:
+                yield f'{_escape(name)}\t{CATALOG_UPLOAD}\t{upload_id}'
+
+    uploads = DistributionUpload.objects.values_list('id', 'file')
+    for upload_id, name in uploads.iterator(chunk_size=chunk_size):
+        yield f'{_escape(name)}\t{DISTRIBUTION_UPLOAD}\t{upload_id}'
+
+    for identifier in Node.objects.values_list('identifier', flat=True) \
+            .iterator(chunk_size=chunk_size):
+        for file_name in ('data.json', 'catalog.xlsx'):
+            for path in _with_variants(catalog_path(identifier, file_name)):
+                yield f'{_escape(path)}\t{LATEST}\t'
+
+    distributions = Distribution.objects.values_list('catalog__identifier', 'dataset_identifier',
+                                                     'identifier', 'file_name')
+    for node, dataset, identifier, file_name in distributions.iterator(chunk_size=chunk_size):
+        directory = distribution_directory_path(node, dataset, identifier)
+        for path in _with_variants(os.path.join(directory, file_name)):
+            yield f'{_escape(path)}\t{LATEST}\t'
+
+
+def is_blob(path):
+    return path.startswith(BLOBS_ROOT + os.sep)
+
+
+def _is_unlinked_blob(path):
+    # Ninguna versión fechada es un hardlink al blob: nada lo referencia
+    try:
+        return os.stat(os.path.join(settings.MEDIA_ROOT, path)).st_nlink == 1
+    except FileNotFoundError:
+        return False
+
+
+def media_paths(scan_workers):
+    """Rutas de los archivos bajo MEDIA_ROOT/catalog y de los blobs sin hardlinks."""
+    for path in chain(scan_tree(settings.MEDIA_ROOT, BLOBS_ROOT, scan_workers),
+                      scan_tree(settings.MEDIA_ROOT, CATALOG_ROOT, scan_workers)):
+        if isinstance(path, OSError):
+            # Sin el listado completo, los archivos del directorio se tomarían como faltantes
+            raise path
+        if is_blob(path) and not _is_unlinked_blob(path):
+            continue
+        yield _escape(path)
+
+
+def compare_sorted(disk, references):
+    """Recorre a la par las rutas en disco y las referencias de la base, ambas ordenadas por
+    ruta, y genera los huérfanos (en disco sin referencias) y las rutas faltantes que
+    referencian filas (las copias "latest" faltantes no se informan)."""
+    disk = iter(disk)
+    next_disk = next(disk, None)
+    for key, lines in groupby(references, key=_path_key):
+        while next_disk is not None and next_disk < key:
+            yield Finding(ORPHAN, _unescape(next_disk)[0], [])
+            next_disk = next(disk, None)
+        if next_disk == key:
+            next_disk = next(disk, None)
+            continue
+        path = None
+        rows = []
+        for line in lines:
+            path, rest = _unescape(line)
+            model, row_id = rest.split('\t')
+            if model != LATEST:
+                rows.append((model, int(row_id)))
+        if rows:
+            yield Finding(DANGLING, path, rows)
+    while next_disk is not None:
+        yield Finding(ORPHAN, _unescape(next_disk)[0], [])
+        next_disk = next(disk, None)
+
+
+def linked_blob_hash(absolute_path, stat):
+    """Hash del blob del que el archivo es un hardlink, o '' si no lo es."""
+    if stat.st_nlink <= 1:
+        return ''
+    with open(absolute_path, 'rb') as f:
+        file_hash = file_sha256(File(f))
+    try:
+        if os.path.samestat(os.stat(blob_path(file_hash)), stat):
+            return file_hash
+    except FileNotFoundError:
+        pass
+    return ''
+
+
+class MediaReconciliation:
+    """Compara los archivos bajo MEDIA_ROOT/catalog con las rutas de la base, y busca los
+    blobs que ya no tienen hardlinks.
+
+    Los dos listados se ordenan por separado con un ordenamiento externo (nunca hay más de
+    'run_size' rutas en memoria) y se comparan con un merge. Con 'fix' se borran los
+    archivos huérfanos (liberando sus blobs) y las filas cuyos archivos no existen, en lotes
+    de 'batch_size' y volviendo a verificar cada caso antes de corregirlo: el sitio puede
+    estar recibiendo archivos mientras tanto.
+    """
+
+    def __init__(self, fix=False, scan_workers=None, run_size=None, batch_size=None):
+        self.fix = fix
+        self.scan_workers = scan_workers or settings.RECONCILE_SCAN_WORKERS
+        self.run_size = run_size or settings.RECONCILE_RUN_SIZE
+        self.batch_size = batch_size or settings.RECONCILE_BATCH_SIZE
+        self.started_at = None
+        self.removed_files = self.deleted_rows = 0
+
+    def run(self):
+        self.started_at = time.time()
+        disk = external_sort(media_paths(self.scan_workers), self.run_size)
+        references = external_sort(referenced_paths(self.batch_size), self.run_size,
+                                   key=_path_key)
+        orphans, dangling = [], []
+        with ThreadPoolExecutor(max_workers=self.scan_workers) as executor:
+            for finding in compare_sorted(disk, references):
+                yield finding
+                if not self.fix:
+                    continue
+                pending = orphans if finding.status == ORPHAN else dangling
+                pending.append(finding)
+                if len(pending) >= self.batch_size:
+                    self.fix_findings(executor, orphans, dangling)
+            if self.fix:
+                self.fix_findings(executor, orphans, dangling)
+
+    def fix_findings(self, executor, orphans, dangling):
+        self.remove_orphans(executor, [finding.path for finding in orphans])
+        self.delete_dangling_rows(dangling)
+        orphans.clear()
+        dangling.clear()
+
+    def remove_orphans(self, executor, paths):
+        if not paths:
+            return
+        referenced = set(DistributionUpload.objects.filter(file__in=paths)
+                         .values_list('file', flat=True))
+        for names in CatalogUpload.objects \
+                .filter(Q(json_file__in=paths) | Q(xlsx_file__in=paths)) \
+                .values_list('json_file', 'xlsx_file'):
+            referenced.update(names)
+        paths = [path for path in paths if path not in referenced]
+        removed = [path for path, was_removed in zip(paths, executor.map(self.remove_file, paths))
+                   if was_removed]
+        StoredFile.objects.filter(path__in=removed).delete()
+        self.removed_files += len(removed)
+
+    def remove_file(self, path):
+        absolute_path = os.path.join(settings.MEDIA_ROOT, path)
+        try:
+            stat = os.stat(absolute_path)
+            # Un archivo escrito durante la comparación puede tener su fila recién creada
+            if stat.st_mtime >= self.started_at:
+                return False
+            if is_blob(path):
+                # release_blob vuelve a verificar que nadie haya creado un link mientras tanto
+                release_blob(os.path.basename(path))
+                return not os.path.exists(absolute_path)
+            file_hash = linked_blob_hash(absolute_path, stat)
+            os.remove(absolute_path)
+        except FileNotFoundError:
+            return False
+        release_blob(file_hash)
+        return True
+
+    def delete_dangling_rows(self, findings):
+        missing = {finding.path for finding in findings
+                   if not os.path.exists(os.path.join(settings.MEDIA_ROOT, finding.path))}
+        row_ids = {model: set() for model in (CATALOG_UPLOAD, DISTRIBUTION_UPLOAD)}
+        for finding in findings:
+            if finding.path in missing:
+                for model, row_id in finding.rows:
+                    row_ids[model].add(row_id)
+
+        uploads = DistributionUpload.objects.filter(pk__in=row_ids[DISTRIBUTION_UPLOAD])
+        file_hashes = set(uploads.values_list('file_hash', flat=True))
+        deleted, _ = uploads.delete()
+        for file_hash in file_hashes:
+            release_blob(file_hash)
+        self.deleted_rows += deleted
+        StoredFile.objects.filter(path__in=missing).delete()
+        # Un catálogo se borra solo si no existe ninguno de sus archivos
+        catalog_ids = [upload_id for upload_id, json_file, xlsx_file in CatalogUpload.objects
+                       .filter(pk__in=row_ids[CATALOG_UPLOAD])
+                       .values_list('id', 'json_file', 'xlsx_file')
+                       if not any(os.path.exists(os.path.join(settings.MEDIA_ROOT, name))
+                                  for name in (json_file, xlsx_file) if name)]
+        # Las señales de post_delete actualizan el resumen del nodo y el diff siguiente
+        CatalogUpload.objects.filter(pk__in=catalog_ids).delete()
+        self.deleted_rows += len(catalog_ids)
@@ -0,0 +1,134 @@
+import os
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from infra.apps.catalog.helpers.retention_policy import versions_to_prune
+from infra.apps.catalog.models import CatalogUpload, DistributionUpload, StoredFile
+from infra.apps.catalog.storage.blob_store import blob_path, release_blob
+
+
+def _batches(items, size):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def _stat(path):
+    try:
+        return os.stat(path)
+    except FileNotFoundError:
+        return None
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def reclaimable_bytes(stats, blob_stats):
+    """Bytes que se liberan al borrar los archivos de 'stats': un inodo se libera cuando se
+    borran todos sus hardlinks, contando el blob como borrado si no le quedan otros."""
+    removed = defaultdict(int)
+    sizes = {}
+    links = {}
+    for stat in stats:
+        if stat is not None:
+            inode = (stat.st_dev, stat.st_ino)
+            removed[inode] += 1
+            sizes[inode], links[inode] = stat.st_size, stat.st_nlink
+    blob_inodes = {(stat.st_dev, stat.st_ino) for stat in blob_stats if stat is not None}
+    return sum(sizes[inode] for inode, count in removed.items()
+               if count + (inode in blob_inodes) >= links[inode])
+
+
+class VersionPruner:  # pylint: disable=R0902
+    """Borra las versiones históricas de catálogos y distribuciones de un nodo que no conserva
+    su política de retención.
+
+    Las filas se borran en lotes de 'batch_size' y los archivos fechados se borran después,
+    con a lo sumo 'io_workers' operaciones de disco en paralelo. La versión más reciente de
+    cada archivo siempre se conserva, así que las copias "latest" (hardlinks escritos por
+    save_as_latest) nunca se tocan. Con 'dry_run' solo se calcula lo que se borraría.
+    """
+
+    def __init__(self, node, dry_run=False, batch_size=None, io_workers=None):
+        self.node = node
+        self.policy = node.retention_policy()
+        self.today = None
+        self.executor = None
+        self.dry_run = dry_run
+        self.batch_size = batch_size or settings.RETENTION_BATCH_SIZE
+        self.io_workers = io_workers or settings.RETENTION_IO_WORKERS
+        self.catalog_uploads = self.distribution_uploads = self.files = self.bytes = 0
+
+    def run(self, today=None):
+        self.today = today or timezone.now().date()
+        with ThreadPoolExecutor(max_workers=self.io_workers) as executor:
+            self.executor = executor
+            self.prune_catalog_uploads()
+            self.prune_distribution_uploads()
+        return self
+
+    def prune_catalog_uploads(self):
+        versions = CatalogUpload.objects.filter(node=self.node) \
+            .values_list('id', 'uploaded_at')
+        pruned = versions_to_prune(versions, self.policy, self.today)
+        for ids in _batches(pruned, self.batch_size):
+            uploads = CatalogUpload.objects.filter(pk__in=ids)
+            names = [name for row in uploads.values_list('json_file', 'xlsx_file')
+                     for name in row if name]
+            if not self.dry_run:
+                with transaction.atomic():
+                    uploads.delete()
+            self.remove_files(names)
+            self.catalog_uploads += len(ids)
+
+    def prune_distribution_uploads(self):
+        distribution_ids = list(self.node.distribution_set.order_by('id')
+                                .values_list('id', flat=True))
+        pruned = []
+        for ids in _batches(distribution_ids, self.batch_size):
+            versions = defaultdict(list)
+            for upload_id, distribution_id, uploaded_at in DistributionUpload.objects \
+                    .filter(distribution__in=ids) \
+                    .values_list('id', 'distribution_id', 'uploaded_at'):
+                versions[distribution_id].append((upload_id, uploaded_at))
+            for distribution_versions in versions.values():
+                pruned.extend(versions_to_prune(distribution_versions, self.policy, self.today))
+            while len(pruned) >= self.batch_size:
+                self.delete_distribution_uploads(pruned[:self.batch_size])
+                pruned = pruned[self.batch_size:]
+        if pruned:
+            self.delete_distribution_uploads(pruned)
+
+    def delete_distribution_uploads(self, ids):
+        uploads = DistributionUpload.objects.filter(pk__in=ids)
+        rows = list(uploads.values_list('file', 'file_hash'))
+        names = {name for name, _file_hash in rows}
+        if not self.dry_run:
+            with transaction.atomic():
+                uploads.delete()
+        # Las versiones sin cambios (304) comparten la ruta fechada de una versión anterior
+        names -= set(DistributionUpload.objects.exclude(pk__in=ids)
+                     .filter(file__in=names).values_list('file', flat=True))
+        self.remove_files(sorted(names), {file_hash for _name, file_hash in rows if file_hash})
+        self.distribution_uploads += len(ids)
+
+    def remove_files(self, names, file_hashes=()):
+        paths = [os.path.join(settings.MEDIA_ROOT, name) for name in names]
+        blob_paths = [blob_path(file_hash) for file_hash in file_hashes]
+        self.bytes += reclaimable_bytes(list(self.executor.map(_stat, paths)),
+                                        list(self.executor.map(_stat, blob_paths)))
+        self.files += len(names)
+        if self.dry_run:
+            return
+
+        list(self.executor.map(_remove, paths))
+        StoredFile.objects.filter(path__in=names).delete()
+        # Los blobs se liberan al final: recién ahí se sabe si les quedan hardlinks
+        list(self.executor.map(release_blob, file_hashes))
@@ -0,0 +1,54 @@
+import os
+import tempfile
+
+from django.conf import settings
+
+from infra.apps.catalog.constants import BLOBS_ROOT
+from infra.apps.catalog.storage.file_links import link_file
+
+
+def blob_path(sha256):
+    return os.path.join(settings.MEDIA_ROOT, BLOBS_ROOT, sha256[:2], sha256[2:4], sha256)
+
+
+def store_blob(content, sha256, permissions=None):
+    path = blob_path(sha256)
+    if os.path.exists(path):
+        # Contenido ya almacenado: no se escribe nada
+        return path
+
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix='.tmp-')
+    try:
+        with os.fdopen(fd, 'wb') as temp_file:
+            for chunk in content.chunks():
+                temp_file.write(chunk)
+        if permissions is not None:
+            os.chmod(temp_path, permissions)
+        os.replace(temp_path, path)
+    except BaseException:
+        os.remove(temp_path)
+        raise
+    content.seek(0)
+    return path
+
+
+def adopt_blob(source, sha256):
+    path = blob_path(sha256)
+    if not os.path.exists(path):
+        link_file(source, path)
+    return path
+
+
+def release_blob(sha256):
+    # La cantidad de hardlinks del blob funciona como contador de referencias:
+    # si sólo queda el propio blob, ninguna versión lo usa
+    if not sha256:
+        return
+    path = blob_path(sha256)
+    try:
+        if os.stat(path).st_nlink <= 1:
+            os.remove(path)
+    except FileNotFoundError:
+        pass
@@ -0,0 +1,92 @@
+import gzip
+import os
+import shutil
+import tempfile
+
+try:
+    import zstandard
+except ImportError:  # zstd es opcional: sin el paquete solo se generan variantes gzip
+    zstandard = None
+
+COMPRESSIBLE_EXTENSIONS = ('.json', '.csv')
+
+GZIP_LEVEL = 6
+ZSTD_LEVEL = 10
+
+CHUNK_SIZE = 64 * 1024
+
+
+def _write_gzip(source, destination):
+    # mtime=0: el mismo contenido genera siempre el mismo .gz
+    with gzip.GzipFile(fileobj=destination, mode='wb',
+                       compresslevel=GZIP_LEVEL, mtime=0) as compressed:
+        shutil.copyfileobj(source, compressed, CHUNK_SIZE)
+
+
+def _write_zstd(source, destination):
+    zstandard.ZstdCompressor(level=ZSTD_LEVEL).copy_stream(source, destination)
+
+
+# (Content-Encoding, sufijo, escritor), en orden de preferencia al negociar
+VARIANTS = [
+    ('zstd', '.zst', _write_zstd if zstandard is not None else None),
+    ('gzip', '.gz', _write_gzip),
+]
+
+VARIANT_SUFFIXES = [suffix for _encoding, suffix, _writer in VARIANTS]
+
+
+def is_compressible(name):
+    return os.path.splitext(str(name))[1].lower() in COMPRESSIBLE_EXTENSIONS
+
+
+def write_compressed_variants(path, permissions=None):
+    """Escribe (o reemplaza atómicamente) las variantes comprimidas de 'path' y borra
+    las de formatos que ya no se generan. Devuelve los sufijos escritos.
+    """
+    written = []
+    for _encoding, suffix, writer in VARIANTS:
+        if writer is None:
+            remove_file(path + suffix)
+            continue
+
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix='.tmp-')
+        try:
+            with open(path, 'rb') as source, os.fdopen(fd, 'wb') as destination:
+                writer(source, destination)
+            if permissions is not None:
+                os.chmod(temp_path, permissions)
+            os.replace(temp_path, path + suffix)
+        except BaseException:
+            os.remove(temp_path)
+            raise
+        written.append(suffix)
+    return written
+
+
+def remove_compressed_variants(path):
+    return [suffix for suffix in VARIANT_SUFFIXES if remove_file(path + suffix)]
+
+
+def remove_file(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        return False
+    return True
+
+
+def accepted_variants(accept_encoding):
+    """Variantes (Content-Encoding, sufijo) aceptadas por el cliente, en orden de preferencia."""
+    accepted = set()
+    for item in accept_encoding.split(','):
+        coding, _, params = item.partition(';')
+        quality = params.strip()
+        if quality.startswith('q='):
+            try:
+                if float(quality[2:]) <= 0:
+                    continue
+            except ValueError:
+                continue
+        accepted.add(coding.strip().lower())
+    return [(encoding, suffix) for encoding, suffix, _writer in VARIANTS if encoding in accepted]
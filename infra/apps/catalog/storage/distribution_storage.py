@@ -1,20 +1,42 @@
 import os
 
 from infra.apps.catalog.constants import CATALOG_ROOT
-from infra.apps.catalog.storage.infra_storage import InfraStorage
+from infra.apps.catalog.storage.blob_store import blob_path, store_blob
+from infra.apps.catalog.storage.file_links import link_file
+from infra.apps.catalog.storage.infra_storage import InfraStorage, stored_files
 
 
 def distribution_directory(instance):
+    return distribution_directory_path(instance.catalog.identifier,
+                                       instance.dataset_identifier,
+                                       instance.identifier)
+
+
+def distribution_directory_path(node_identifier, dataset_identifier, identifier):
     return os.path.join(CATALOG_ROOT,
-                        instance.catalog.identifier,
+                        node_identifier,
                         'dataset',
-                        instance.dataset_identifier,
+                        dataset_identifier,
                         'distribution',
-                        instance.identifier,
+                        identifier,
                         'download')
 
 
 class DistributionStorage(InfraStorage):
+    def save_blob(self, name, content, sha256):
+        blob = store_blob(content, sha256, self.file_permissions_mode)
+        link_file(blob, self.path(name))
+        if self.tracks_files():
+            stored_files().record(name, sha256)
+        return name
+
+    def link_blob(self, name, sha256):
+        # Nueva ruta para un contenido ya almacenado: no se escribe ningún byte
+        link_file(blob_path(sha256), self.path(name))
+        if self.tracks_files():
+            stored_files().record(name, sha256)
+        return name
+
     def latest_file_path(self, instance):
         return os.path.join(distribution_directory(instance.distribution),
                             instance.distribution.file_name)
@@ -0,0 +1,57 @@
+import os
+import shutil
+import uuid
+
+
+def link_file(source, destination):
+    # Se crea el link con un nombre temporal en el mismo directorio y se reemplaza el destino
+    # atómicamente, así nunca hay un instante sin archivo en 'destination'
+    if os.path.exists(destination) and os.path.samefile(source, destination):
+        return
+
+    directory = os.path.dirname(destination)
+    os.makedirs(directory, exist_ok=True)
+    temp_path = os.path.join(directory, f'.{os.path.basename(destination)}.{uuid.uuid4().hex}')
+    try:
+        os.link(source, temp_path)
+    except OSError:
+        # Filesystems sin soporte de hardlinks (o distinto dispositivo): se copia el contenido
+        copy_file(source, temp_path)
+    os.replace(temp_path, destination)
+    # rename() entre dos links del mismo archivo no hace nada y deja el temporal
+    if os.path.lexists(temp_path):
+        os.remove(temp_path)
+
+
+def copy_file(source, destination):
+    with open(source, 'rb') as src, open(destination, 'wb') as dst:
+        size = os.fstat(src.fileno()).st_size
+        for copy_range in _kernel_copy_functions():
+            try:
+                _copy_in_kernel(copy_range, src.fileno(), dst.fileno(), size)
+                break
+            except OSError:
+                dst.seek(0)
+                dst.truncate()
+        else:
+            shutil.copyfileobj(src, dst)
+    shutil.copymode(source, destination)
+
+
+def _kernel_copy_functions():
+    # copy_file_range (Python >= 3.8) permite reflinks y copias del lado del servidor en NFS;
+    # sendfile evita igualmente pasar los datos por espacio de usuario
+    if hasattr(os, 'copy_file_range'):
+        yield lambda src_fd, dst_fd, count, offset: \
+            os.copy_file_range(src_fd, dst_fd, count, offset, offset)
+    if hasattr(os, 'sendfile'):
+        yield lambda src_fd, dst_fd, count, offset: os.sendfile(dst_fd, src_fd, offset, count)
+
+
+def _copy_in_kernel(copy_range, src_fd, dst_fd, size):
+    offset = 0
+    while offset < size:
+        copied = copy_range(src_fd, dst_fd, size - offset, offset)
+        if not copied:
+            break
+        offset += copied
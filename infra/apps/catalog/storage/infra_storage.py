@@ -1,18 +1,103 @@
 import os
+import uuid
 
+from django.apps import apps
+from django.conf import settings
 from django.core.files.storage import FileSystemStorage
 
+from infra.apps.catalog.helpers.file_hash import file_sha256
+from infra.apps.catalog.storage.compressed_variants import VARIANT_SUFFIXES, \
+    is_compressible, remove_compressed_variants, write_compressed_variants
+from infra.apps.catalog.storage.file_links import link_file
+
+
+def stored_files():
+    # Import diferido: los modelos importan los storages
+    return apps.get_model('catalog', 'StoredFile').objects
+
+
+def pending_compressions():
+    return apps.get_model('catalog', 'PendingCompression').objects
+
 
 class InfraStorage(FileSystemStorage):
     def get_available_name(self, name, max_length=None):
-        if self.exists(name):
-            os.remove(os.path.join(self.location, name))
+        # El archivo existente se reemplaza atómicamente en _save
+        return name
+
+    def _save(self, name, content):
+        checksum = file_sha256(content)
+        # Se escribe en un temporal del mismo directorio y se reemplaza con os.replace,
+        # así los lectores nunca encuentran el archivo ausente o a medio escribir
+        directory, basename = os.path.split(name)
+        temp_name = super(InfraStorage, self)._save(
+            os.path.join(directory, f'.{basename}.{uuid.uuid4().hex}'), content)
+        os.replace(self.path(temp_name), self.path(name))
+        if self.tracks_files():
+            stored_files().record(name, checksum)
         return name
 
+    def delete(self, name):
+        super(InfraStorage, self).delete(name)
+        self.remove_compressed_variants(name)
+        if self.tracks_files():
+            stored_files().forget(name)
+
+    def remove_compressed_variants(self, name):
+        removed = remove_compressed_variants(self.path(name))
+        if self.tracks_files():
+            for suffix in removed:
+                stored_files().forget(f'{name}{suffix}')
+
+    def tracks_files(self):
+        # Los metadatos en la base se guardan con rutas relativas a MEDIA_ROOT
+        return self.location == os.path.abspath(settings.MEDIA_ROOT)
+
     def save_as_latest(self, instance):
-        path = self.latest_file_path(instance)
-        self.save(path, instance.file)
-        instance.file.seek(0)
+        name = self.file_field(instance).name
+        latest_name = self.latest_file_path(instance)
+        # Con el mismo contenido (p. ej. una carga deduplicada) las variantes siguen sirviendo
+        unchanged = self.has_same_content(name, latest_name)
+        link_file(self.path(name), self.path(latest_name))
+        if self.tracks_files():
+            stored_files().record_link(name, latest_name)
+        if unchanged or not is_compressible(latest_name):
+            return
+        if settings.COMPRESSIONS_ASYNC and self.tracks_files():
+            # Las variantes anteriores ya no corresponden; las nuevas las genera el worker
+            self.remove_compressed_variants(latest_name)
+            pending_compressions().enqueue(latest_name)
+        else:
+            self.save_compressed_variants(latest_name)
+
+    def has_same_content(self, name, latest_name):
+        if not self.tracks_files():
+            return False
+        stored = stored_files().for_paths([name, latest_name])
+        source, latest = stored.get(name), stored.get(latest_name)
+        if source is None or latest is None or not source.checksum or \
+                source.checksum != latest.checksum:
+            return False
+        # El archivo puede haberse reemplazado desde afuera de la app sin actualizar la base
+        try:
+            stat = os.stat(self.path(latest_name))
+        except FileNotFoundError:
+            return False
+        return stat.st_size == latest.size and stat.st_mtime == latest.mtime
+
+    def save_compressed_variants(self, name):
+        # Variantes precomprimidas para no comprimir en cada descarga
+        written = write_compressed_variants(self.path(name), self.file_permissions_mode)
+        if not self.tracks_files():
+            return
+        for suffix in VARIANT_SUFFIXES:
+            if suffix in written:
+                stored_files().record(f'{name}{suffix}')
+            else:
+                stored_files().forget(f'{name}{suffix}')
+
+    def file_field(self, instance):
+        return instance.file
 
     def latest_file_path(self, instance):
         raise NotImplementedError
@@ -1,8 +1,19 @@
+import multiprocessing
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import django
 from django.core.exceptions import ValidationError
+from django.db import connections
 
 from infra.apps.catalog.exceptions.catalog_sync_error import CatalogSyncError
+from infra.apps.catalog.exceptions.catalog_unchanged_error import CatalogUnchangedError
 from infra.apps.catalog.models import Node
 
+NodeSyncResult = namedtuple('NodeSyncResult',
+                            ['identifier', 'validation_errors', 'error', 'unchanged', 'seconds'])
+
 
 def sync_catalog(node_id):
     try:
@@ -17,3 +28,44 @@ def sync_catalog(node_id):
         raise CatalogSyncError(f"Error de lectura del catálogo: {str(e)}")
     except FileNotFoundError:
         raise CatalogSyncError("No se encontró un catálogo en el file system para este nodo")
+
+
+def sync_nodes(nodes, concurrency=1):
+    nodes = [(node.id, node.identifier) for node in nodes]
+    if concurrency <= 1:
+        for node_id, identifier in nodes:
+            yield timed_sync(node_id, identifier)
+        return
+
+    # Cada proceso abre sus propias conexiones: compartir el socket heredado las corrompe
+    connections.close_all()
+    with ProcessPoolExecutor(max_workers=concurrency,
+                             mp_context=_multiprocessing_context(),
+                             initializer=django.setup) as executor:
+        futures = [executor.submit(timed_sync, node_id, identifier)
+                   for node_id, identifier in nodes]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+def timed_sync(node_id, identifier):
+    start = time.perf_counter()
+    validation_errors, error, unchanged = [], '', False
+    try:
+        validation_errors = sync_catalog(node_id)
+    except CatalogUnchangedError:
+        unchanged = True
+    except CatalogSyncError as e:
+        error = str(e)
+    except Exception as e:  # pylint: disable=W0703
+        # Un nodo con problemas no debe frenar la sincronización del resto
+        error = f'{type(e).__name__}: {e}'
+    return NodeSyncResult(identifier, validation_errors, error, unchanged,
+                          time.perf_counter() - start)
+
+
+def _multiprocessing_context():
+    # Con fork los workers heredan la configuración ya cargada de Django
+    if 'fork' in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context('fork')
+    return None
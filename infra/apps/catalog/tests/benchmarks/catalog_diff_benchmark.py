@@ -0,0 +1,40 @@
+import os
+import time
+
+import pytest
+from pydatajson import DataJson
+
+from infra.apps.catalog.catalog_diff import catalog_diff
+from infra.apps.catalog.models import CatalogUpload, Dataset, Node
+from infra.apps.catalog.tests.helpers.synthetic_catalog import synthetic_catalog
+
+pytestmark = pytest.mark.django_db
+
+DATASETS_COUNT = int(os.environ.get('BENCHMARK_DATASETS', 5000))
+
+
+def _upload_with_datasets(identifier, catalog):
+    # Se evita la conversión de formatos: solo interesan los datasets ingestados
+    node = Node.objects.create(identifier=identifier)
+    CatalogUpload.objects.bulk_create([CatalogUpload(node=node, format='json')])
+    upload = CatalogUpload.objects.get(node=node)
+    upload._datajson = DataJson(catalog)  # pylint: disable=W0212
+    Dataset.objects.bulk_create_from_catalog(upload)
+    return upload
+
+
+def test_catalog_diff():
+    previous = _upload_with_datasets('previous', synthetic_catalog(DATASETS_COUNT))
+    catalog = synthetic_catalog(DATASETS_COUNT)
+    for dataset in catalog['dataset'][::100]:
+        dataset['title'] += ' (modificado)'
+    current = _upload_with_datasets('current', catalog)
+
+    start = time.perf_counter()
+    diff = catalog_diff(current, previous)
+    elapsed = time.perf_counter() - start
+
+    print(f'\n{DATASETS_COUNT} datasets, {len(diff["datasets"]["modified"])} modificados: '
+          f'{elapsed:.3f}s')
+    assert len(diff['datasets']['modified']) == len(catalog['dataset'][::100])
+    assert elapsed < 1
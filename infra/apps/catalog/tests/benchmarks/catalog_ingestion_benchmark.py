@@ -0,0 +1,30 @@
+import os
+import time
+
+import pytest
+
+from infra.apps.catalog.helpers.temp_uploaded_file import temp_uploaded_file
+from infra.apps.catalog.ingestion import CatalogIngestion
+from infra.apps.catalog.tests.helpers.parse_counter import count_catalog_parses
+from infra.apps.catalog.tests.helpers.synthetic_catalog import write_synthetic_catalog
+
+pytestmark = pytest.mark.django_db
+
+DATASETS_COUNT = int(os.environ.get('BENCHMARK_DATASETS', 500))
+
+
+@pytest.mark.parametrize('file_format', ['json', 'xlsx'])
+def test_catalog_ingestion(node, tmp_path, file_format):
+    path = write_synthetic_catalog(tmp_path, DATASETS_COUNT, file_format)
+
+    with open(path, 'rb') as sample, count_catalog_parses() as parses:
+        raw_data = {'format': file_format, 'node': node, 'file': temp_uploaded_file(sample)}
+        start = time.perf_counter()
+        ingestion = CatalogIngestion(raw_data)
+        ingestion.run()
+        ingestion.catalog.get_datasets()
+        elapsed = time.perf_counter() - start
+
+    print(f'\n{file_format}: {DATASETS_COUNT} datasets, '
+          f'{parses.count} parseos, {elapsed:.2f}s por subida')
+    assert parses.count == 1
@@ -0,0 +1,34 @@
+import os
+import time
+
+import pytest
+from pydatajson import DataJson
+
+from infra.apps.catalog.tests.helpers.synthetic_catalog import synthetic_catalog
+from infra.apps.catalog.validator.incremental_validation import validate_catalog
+
+pytestmark = pytest.mark.django_db
+
+DATASETS_COUNT = int(os.environ.get('BENCHMARK_DATASETS', 500))
+
+
+def _timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+
+def test_incremental_validation():
+    catalog = synthetic_catalog(DATASETS_COUNT)
+    _, first = _timed(validate_catalog, DataJson(catalog))
+
+    for dataset in catalog['dataset'][::100]:
+        dataset['title'] += ' (modificado)'
+    data_json = DataJson(catalog)
+    full_report, full = _timed(data_json.validate_catalog)
+    errors, incremental = _timed(validate_catalog, data_json)
+
+    print(f'\n{DATASETS_COUNT} datasets, 1% modificados: completa {full:.2f}s, '
+          f'primera incremental {first:.2f}s, incremental {incremental:.2f}s')
+    assert (errors == []) == (full_report['status'] == 'OK')
+    assert incremental < full
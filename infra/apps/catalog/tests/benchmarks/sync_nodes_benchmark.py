@@ -0,0 +1,39 @@
+import os
+import shutil
+import time
+
+import pytest
+
+from infra.apps.catalog.models import Node
+from infra.apps.catalog.storage.paths import latest_json_catalog_path
+from infra.apps.catalog.sync import sync_nodes
+from infra.apps.catalog.tests.helpers.synthetic_catalog import write_synthetic_catalog
+
+pytestmark = pytest.mark.django_db(transaction=True)
+
+DATASETS_COUNT = int(os.environ.get('BENCHMARK_DATASETS', 500))
+NODES_COUNT = int(os.environ.get('BENCHMARK_NODES', 8))
+
+
+@pytest.fixture
+def nodes(tmp_path):
+    source = write_synthetic_catalog(tmp_path, DATASETS_COUNT)
+    nodes = []
+    for index in range(NODES_COUNT):
+        node = Node.objects.create(identifier=f'benchmark_{index}')
+        path = latest_json_catalog_path(node.identifier)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        shutil.copyfile(source, path)
+        nodes.append(node)
+    return nodes
+
+
+@pytest.mark.parametrize('concurrency', [1, 4])
+def test_sync_nodes(nodes, concurrency):
+    start = time.perf_counter()
+    results = list(sync_nodes(nodes, concurrency))
+    elapsed = time.perf_counter() - start
+
+    print(f'\nconcurrencia {concurrency}: {NODES_COUNT} nodos de {DATASETS_COUNT} datasets, '
+          f'{elapsed:.2f}s')
+    assert not [result.error for result in results if result.error]
@@ -0,0 +1,254 @@
+import io
+import os
+import tarfile
+import zipfile
+
+import pytest
+from django.core.exceptions import ValidationError
+from django.core.files import File
+from django.core.management import CommandError, call_command
+from django.urls import reverse
+
+from infra.apps.catalog.bulk_upload import CREATED, ERROR, UNCHANGED, UPDATED, \
+    BulkDistributionUpload, archive_entries, manifest_entries
+from infra.apps.catalog.exceptions.catalog_not_uploaded_error import CatalogNotUploadedError
+from infra.apps.catalog.models import CatalogUpload, Distribution, DistributionUpload
+from infra.apps.catalog.tests.helpers.open_catalog import open_catalog
+
+pytestmark = pytest.mark.django_db
+
+MEDICAMENTOS = 'ed9e418f-9858-44df-8ce7-a74fde738684'
+CONSULTAS = '69de22b3-04b9-43ff-a945-a042d206997e'
+CONSULTAS_FILE_NAME = \
+    'cantidad-consultas-medicas-ambulatorias-subsector-oficial-argentina-anos-2013-2014.csv'
+
+
+@pytest.fixture(name='full_catalog')
+def fixture_full_catalog(node):
+    with open_catalog('valid_data.json') as catalog_fd:
+        CatalogUpload(format=CatalogUpload.FORMAT_JSON, json_file=File(catalog_fd),
+                      node=node).save()
+    return node
+
+
+def _zip(files):
+    archive = io.BytesIO()
+    with zipfile.ZipFile(archive, 'w') as zip_file:
+        for name, content in files.items():
+            zip_file.writestr(name, content)
+    archive.seek(0)
+    return archive
+
+
+def _tar(files):
+    archive = io.BytesIO()
+    with tarfile.open(fileobj=archive, mode='w:gz') as tar_file:
+        for name, content in files.items():
+            info = tarfile.TarInfo(name)
+            info.size = len(content)
+            tar_file.addfile(info, io.BytesIO(content))
+    archive.seek(0)
+    return archive
+
+
+def _run(node, archive):
+    return BulkDistributionUpload(node).run(archive_entries(archive))
+
+
+def _statuses(results):
+    return {result.distribution_identifier: result.status for result in results}
+
+
+def _read(upload):
+    with open(upload.file.path, 'rb') as file:
+        return file.read()
+
+
+def _latest_path(upload):
+    return upload.file.storage.path(str(upload.file_path()))
+
+
+def test_zip_entries_resolved_by_directory_and_file_name(full_catalog):
+    results = _run(full_catalog, _zip({f'{MEDICAMENTOS}/medicamentos.csv': b'a,b\n1,2',
+                                       f'otros/{CONSULTAS_FILE_NAME}': b'c,d\n3,4'}))
+
+    assert _statuses(results) == {MEDICAMENTOS: CREATED, CONSULTAS: CREATED}
+    medicamentos = Distribution.objects.get(identifier=MEDICAMENTOS)
+    assert medicamentos.dataset_identifier == '5fcacd04-58eb-4b43-89a0-55231c58f1b4'
+    assert medicamentos.file_name == 'medicamentos.csv'
+    assert _read(medicamentos.get_latest_upload()) == b'a,b\n1,2'
+    assert os.path.isfile(_latest_path(medicamentos.get_latest_upload()))
+    consultas = Distribution.objects.get(identifier=CONSULTAS)
+    assert _read(consultas.get_latest_upload()) == b'c,d\n3,4'
+
+
+def test_tar_entries(full_catalog):
+    results = _run(full_catalog, _tar({f'{MEDICAMENTOS}/medicamentos.csv': b'a,b\n1,2'}))
+
+    assert _statuses(results) == {MEDICAMENTOS: CREATED}
+    assert DistributionUpload.objects.filter(distribution__identifier=MEDICAMENTOS).count() == 1
+
+
+def test_same_content_is_unchanged(full_catalog):
+    _run(full_catalog, _zip({f'{MEDICAMENTOS}/medicamentos.csv': b'a,b\n1,2'}))
+    results = _run(full_catalog, _zip({f'{MEDICAMENTOS}/medicamentos.csv': b'a,b\n1,2'}))
+
+    assert _statuses(results) == {MEDICAMENTOS: UNCHANGED}
+    assert DistributionUpload.objects.filter(distribution__identifier=MEDICAMENTOS).count() == 1
+
+
+def test_same_day_upload_replaces_version(full_catalog):
+    _run(full_catalog, _zip({f'{MEDICAMENTOS}/medicamentos.csv': b'a,b\n1,2'}))
+    old_path = _latest_path(Distribution.objects.get(identifier=MEDICAMENTOS).get_latest_upload())
+    results = _run(full_catalog, _zip({f'{MEDICAMENTOS}/nuevo.csv': b'a,b\n5,6'}))
+
+    assert _statuses(results) == {MEDICAMENTOS: UPDATED}
+    distribution = Distribution.objects.get(identifier=MEDICAMENTOS)
+    upload = DistributionUpload.objects.get(distribution=distribution)
+    assert distribution.file_name == 'nuevo.csv'
+    assert _read(upload) == b'a,b\n5,6'
+    assert not os.path.exists(old_path)
+
+
+def test_unknown_and_ambiguous_files_are_errors(full_catalog):
+    results = _run(full_catalog, _zip({'desconocido.csv': b'a',
+                                       'vigilancia-de-dengue-y-zika-201812.xls': b'b',
+                                       f'{MEDICAMENTOS}/medicamentos.csv': b'c'}))
+
+    assert [result.status for result in results] == [ERROR, ERROR, CREATED]
+    assert Distribution.objects.filter(catalog=full_catalog).count() == 1
+
+
+def test_repeated_distribution_is_an_error(full_catalog):
+    results = _run(full_catalog, _zip({f'{CONSULTAS}/uno.csv': b'a',
+                                       f'otros/{CONSULTAS_FILE_NAME}': b'b'}))
+
+    assert [result.status for result in results] == [CREATED, ERROR]
+
+
+def test_macos_metadata_is_ignored(full_catalog):
+    results = _run(full_catalog, _zip({f'__MACOSX/{MEDICAMENTOS}/._medicamentos.csv': b'x',
+                                       f'{MEDICAMENTOS}/medicamentos.csv': b'a'}))
+
+    assert _statuses(results) == {MEDICAMENTOS: CREATED}
+
+
+def test_invalid_archive(full_catalog):
+    with pytest.raises(ValidationError) as e:
+        _run(full_catalog, io.BytesIO(b'no es un archivo comprimido'))
+    assert 'zip o tar' in str(e.value)
+
+
+def test_node_without_catalog(node):
+    with pytest.raises(CatalogNotUploadedError):
+        BulkDistributionUpload(node)
+
+
+def test_manifest_entries(full_catalog, http_server):
+    http_server.add('/medicamentos.csv', body=b'a,b\n1,2', etag='"v1"')
+    http_server.add('/consultas.csv', body=b'c,d\n3,4')
+    manifest = io.BytesIO(
+        'url,distribution_identifier,file_name\n'
+        f'{http_server.url("/medicamentos.csv")},{MEDICAMENTOS},\n'
+        f'{http_server.url("/consultas.csv")},,{CONSULTAS_FILE_NAME}\n'.encode())
+
+    results = BulkDistributionUpload(full_catalog).run(manifest_entries(manifest))
+
+    assert _statuses(results) == {MEDICAMENTOS: CREATED, CONSULTAS: CREATED}
+    medicamentos = Distribution.objects.get(identifier=MEDICAMENTOS)
+    assert medicamentos.file_name == 'medicamentos.csv'
+    assert medicamentos.source_url == http_server.url('/medicamentos.csv')
+    assert medicamentos.etag == '"v1"'
+
+
+def test_manifest_not_modified_is_unchanged(full_catalog, http_server):
+    route = http_server.add('/medicamentos.csv', body=b'a,b\n1,2', etag='"v1"')
+    manifest = f'url,distribution_identifier\n' \
+               f'{http_server.url("/medicamentos.csv")},{MEDICAMENTOS}\n'.encode()
+    BulkDistributionUpload(full_catalog).run(manifest_entries(io.BytesIO(manifest)))
+
+    results = BulkDistributionUpload(full_catalog).run(manifest_entries(io.BytesIO(manifest)))
+
+    assert _statuses(results) == {MEDICAMENTOS: UNCHANGED}
+    assert route.requests[-1].get('If-None-Match') == '"v1"'
+
+
+def test_manifest_download_error(full_catalog, http_server):
+    http_server.add('/roto.csv', status=500)
+    manifest = f'url,distribution_identifier\n' \
+               f'{http_server.url("/roto.csv")},{MEDICAMENTOS}\n'.encode()
+
+    results = BulkDistributionUpload(full_catalog).run(manifest_entries(io.BytesIO(manifest)))
+
+    assert _statuses(results) == {MEDICAMENTOS: ERROR}
+    assert not Distribution.objects.filter(identifier=MEDICAMENTOS).exists()
+
+
+def test_manifest_file_name_with_path_is_an_error(full_catalog, http_server):
+    route = http_server.add('/medicamentos.csv', body=b'a,b\n1,2')
+    manifest = f'url,distribution_identifier,file_name\n' \
+               f'{http_server.url("/medicamentos.csv")},{MEDICAMENTOS},../../x.csv\n'.encode()
+
+    results = BulkDistributionUpload(full_catalog).run(manifest_entries(io.BytesIO(manifest)))
+
+    assert _statuses(results) == {MEDICAMENTOS: ERROR}
+    assert 'no es válido' in results[0].message
+    assert not route.requests
+    assert not Distribution.objects.filter(identifier=MEDICAMENTOS).exists()
+
+
+def test_manifest_without_url_column(full_catalog):
+    with pytest.raises(ValidationError) as e:
+        BulkDistributionUpload(full_catalog).run(
+            manifest_entries(io.BytesIO(b'distribution_identifier\n1\n')))
+    assert 'url' in str(e.value)
+
+
+def _bulk_url(node):
+    return reverse('catalog:bulk_distribution_upload', kwargs={'node_id': node.id})
+
+
+def test_view_returns_report(admin_client, full_catalog):
+    archive = _zip({f'{MEDICAMENTOS}/medicamentos.csv': b'a', 'desconocido.csv': b'b'})
+    archive.name = 'distribuciones.zip'
+
+    response = admin_client.post(_bulk_url(full_catalog), {'archive': archive})
+
+    assert response.status_code == 200
+    results = response.json()['results']
+    assert [result['status'] for result in results] == [CREATED, ERROR]
+    assert results[0]['distribution_identifier'] == MEDICAMENTOS
+
+
+def test_view_without_files(admin_client, full_catalog):
+    response = admin_client.post(_bulk_url(full_catalog))
+    assert response.status_code == 400
+
+
+def test_view_forbidden_for_non_admin(logged_client, full_catalog):
+    archive = _zip({f'{MEDICAMENTOS}/medicamentos.csv': b'a'})
+    archive.name = 'distribuciones.zip'
+
+    response = logged_client.post(_bulk_url(full_catalog), {'archive': archive})
+
+    assert response.status_code == 403
+    assert not Distribution.objects.exists()
+
+
+def test_command(full_catalog, tmp_path):
+    path = tmp_path / 'distribuciones.zip'
+    path.write_bytes(_zip({f'{MEDICAMENTOS}/medicamentos.csv': b'a'}).getvalue())
+    out = io.StringIO()
+
+    call_command('bulk_upload_distributions', full_catalog.identifier, str(path), stdout=out)
+
+    assert f'{MEDICAMENTOS}/medicamentos.csv: {CREATED} ({MEDICAMENTOS})' in out.getvalue()
+
+
+def test_command_fails_with_entry_errors(full_catalog, tmp_path):
+    path = tmp_path / 'distribuciones.zip'
+    path.write_bytes(_zip({'desconocido.csv': b'a'}).getvalue())
+
+    with pytest.raises(CommandError):
+        call_command('bulk_upload_distributions', full_catalog.identifier, str(path),
+                     stdout=io.StringIO())
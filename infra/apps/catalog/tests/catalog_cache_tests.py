@@ -0,0 +1,93 @@
+import os
+
+import pytest
+
+from infra.apps.catalog.catalog_cache import ParsedCatalogCache, PARSED_CATALOG_CACHE
+from infra.apps.catalog.models import CatalogUpload
+from infra.apps.catalog.tests.helpers.parse_counter import count_catalog_parses
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(name='cache')
+def fixture_cache(settings, tmp_path):
+    settings.CATALOG_CACHE_DIR = str(tmp_path)
+    return ParsedCatalogCache()
+
+
+def _disk_entries(directory):
+    return sorted(name for name in os.listdir(directory) if name.endswith('.pickle'))
+
+
+def test_get_or_set_only_computes_once(cache):
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return ['dataset']
+
+    cache.get_or_set('hash', compute)
+    assert cache.get_or_set('hash', compute) == ['dataset']
+    assert len(calls) == 1
+
+
+def test_entries_shared_through_disk(cache):
+    cache.set('hash', ['dataset'])
+    other_worker = ParsedCatalogCache()
+    assert other_worker.get('hash') == ['dataset']
+
+
+def test_memory_evicts_least_recently_used(cache, settings):
+    settings.CATALOG_CACHE_MEMORY_BYTES = 100
+    cache.set('first', 'a' * 30)
+    cache.set('second', 'b' * 30)
+    cache.get('first')
+    cache.set('third', 'c' * 30)
+
+    assert list(cache._memory) == ['first', 'third']
+
+
+def test_disk_evicts_least_recently_used(cache, settings, tmp_path):
+    settings.CATALOG_CACHE_DISK_BYTES = 100
+    cache.set('first', 'a' * 30)
+    os.utime(tmp_path / 'first.pickle', (0, 0))
+    cache.set('second', 'b' * 30)
+    cache.set('third', 'c' * 30)
+
+    assert _disk_entries(tmp_path) == ['second.pickle', 'third.pickle']
+
+
+def test_invalidate_removes_entry(cache, tmp_path):
+    cache.set('hash', ['dataset'])
+    cache.invalidate('hash')
+    assert cache.get('hash') is None
+    assert not _disk_entries(tmp_path)
+
+
+def test_catalog_upload_stores_content_hash(catalog):
+    assert len(catalog.content_hash) == 64
+
+
+def test_datasets_served_from_cache_without_parsing(catalog):
+    PARSED_CATALOG_CACHE.clear_memory()
+    with count_catalog_parses() as parses:
+        datasets = CatalogUpload.objects.get(id=catalog.id).get_datasets()
+    assert parses.count == 0
+    assert datasets[0]['identifier'] == '125'
+
+
+def test_deleting_catalog_upload_invalidates_cache(catalog):
+    content_hash = catalog.content_hash
+    catalog.delete()
+    assert PARSED_CATALOG_CACHE.get(content_hash) is None
+
+
+def test_cache_is_not_stored_under_media_root(catalog, settings):
+    catalog.get_datasets()
+
+    assert os.path.isdir(settings.CATALOG_CACHE_DIR)
+    media_root = os.path.abspath(settings.MEDIA_ROOT)
+    assert os.path.commonpath([media_root, os.path.abspath(settings.CATALOG_CACHE_DIR)]) \
+        != media_root
+    for _, _, files in os.walk(media_root):
+        assert not [name for name in files if name.endswith('.pickle')]
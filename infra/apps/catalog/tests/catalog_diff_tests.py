@@ -0,0 +1,97 @@
+import json
+
+import pytest
+from django.core.files import File
+from django.urls import reverse
+from freezegun import freeze_time
+
+from infra.apps.catalog.catalog_diff import diff_hashes
+from infra.apps.catalog.models import CatalogUpload
+from infra.apps.catalog.tests.helpers.synthetic_catalog import synthetic_catalog
+
+pytestmark = pytest.mark.django_db
+
+
+def _upload(node, catalog, tmp_path, date):
+    path = tmp_path / f'catalog-{date}.json'
+    path.write_text(json.dumps(catalog))
+    with freeze_time(date), open(path, 'rb') as catalog_fd:
+        upload = CatalogUpload(format=CatalogUpload.FORMAT_JSON,
+                               json_file=File(catalog_fd), node=node)
+        upload.save()
+    return upload
+
+
+def _distribution_ids(dataset):
+    return [distribution['identifier'] for distribution in dataset['distribution']]
+
+
+@pytest.fixture(name='uploads')
+def fixture_uploads(node, tmp_path):
+    previous = synthetic_catalog(5)
+    current = synthetic_catalog(6)
+    removed = current['dataset'].pop(0)
+    current['dataset'][0]['title'] = 'Nuevo título'
+    current['dataset'][1]['distribution'][0]['title'] = 'Nueva distribución'
+
+    first = _upload(node, previous, tmp_path, '2019-01-01')
+    second = _upload(node, current, tmp_path, '2019-01-02')
+    return first, second, removed, current
+
+
+def test_first_upload_has_no_diff(catalog):
+    assert catalog.get_diff() is None
+
+
+def test_diff_against_previous_upload(uploads):
+    first, second, removed, current = uploads
+    diff = CatalogUpload.objects.get(pk=second.pk).get_diff()
+
+    assert diff['previous_upload'] == {'id': first.id, 'uploaded_at': '2019-01-01'}
+    assert diff['datasets'] == {'added': ['dataset-5'],
+                                'removed': ['dataset-0'],
+                                'modified': ['dataset-1', 'dataset-2']}
+    assert diff['distributions'] == {'added': _distribution_ids(current['dataset'][-1]),
+                                     'removed': _distribution_ids(removed),
+                                     'modified': ['2.0']}
+
+
+def test_deleting_previous_upload_updates_diff(uploads, tmp_path):
+    first, second, _removed, current = uploads
+    third = _upload(first.node, current, tmp_path, '2019-01-03')
+
+    second.delete()
+
+    diff = CatalogUpload.objects.get(pk=third.pk).get_diff()
+    assert diff['previous_upload']['id'] == first.id
+    assert diff['datasets']['added'] == ['dataset-5']
+
+
+def test_diff_hashes():
+    diff = diff_hashes({'a': '1', 'b': '2', 'c': '3'}, {'b': '2', 'c': '4', 'd': '5'})
+
+    assert diff == {'added': ['d'], 'removed': ['a'], 'modified': ['c']}
+
+
+def test_diff_endpoint(admin_client, uploads):
+    _first, second, _removed, _current = uploads
+    response = admin_client.get(reverse('catalog:catalog_upload_diff',
+                                        kwargs={'node_id': second.node.id, 'pk': second.pk}))
+
+    assert response.json()['diff']['datasets']['added'] == ['dataset-5']
+
+
+def test_diff_endpoint_requires_node_admin(logged_client, uploads):
+    _first, second, _removed, _current = uploads
+    response = logged_client.get(reverse('catalog:catalog_upload_diff',
+                                         kwargs={'node_id': second.node.id, 'pk': second.pk}))
+
+    assert response.status_code == 403
+
+
+def test_history_shows_diff_summary(admin_client, uploads):
+    _first, second, _removed, _current = uploads
+    response = admin_client.get(reverse('catalog:catalog_history',
+                                        kwargs={'node_id': second.node.id}))
+
+    assert '+1 / -1 / ~2' in response.content.decode('utf-8')
@@ -0,0 +1,204 @@
+import gzip
+import os
+import uuid
+from unittest import mock
+
+import pytest
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+
+from infra.apps.catalog.compression_queue import CompressionQueue
+from infra.apps.catalog.models import PendingCompression, StoredFile
+from infra.apps.catalog.storage import compressed_variants
+from infra.apps.catalog.storage.compressed_variants import accepted_variants
+from infra.apps.catalog.storage.paths import absolute_catalog_path, catalog_path
+
+pytestmark = pytest.mark.django_db
+
+
+def _read(path):
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+def _gunzip(path):
+    with gzip.open(path, 'rb') as f:
+        return f.read()
+
+
+def _latest_path(upload):
+    return upload.file.storage.path(upload.file.storage.latest_file_path(upload))
+
+
+def _upload_csv(distribution):
+    content = f'a,b\n{uuid.uuid4().hex},1\n'.encode()
+    return distribution.distributionupload_set.create(file=ContentFile(content, name='data.csv'))
+
+
+def test_latest_json_catalog_has_gzip_variant(catalog):
+    latest = absolute_catalog_path(catalog.node.identifier, 'data.json')
+
+    assert _gunzip(latest + '.gz') == _read(latest)
+    assert StoredFile.objects.filter(
+        path=catalog_path(catalog.node.identifier, 'data.json.gz')).exists()
+
+
+def test_xlsx_catalog_is_not_compressed(catalog):
+    assert not os.path.exists(absolute_catalog_path(catalog.node.identifier, 'catalog.xlsx.gz'))
+
+
+def test_latest_csv_distribution_has_gzip_variant(distribution):
+    upload = _upload_csv(distribution)
+
+    assert _gunzip(_latest_path(upload) + '.gz') == _read(upload.file.path)
+
+
+def test_new_version_replaces_gzip_variant(distribution):
+    _upload_csv(distribution)
+    upload = _upload_csv(distribution)
+
+    assert _gunzip(_latest_path(upload) + '.gz') == _read(upload.file.path)
+
+
+def test_deleting_file_removes_its_variants(distribution):
+    upload = _upload_csv(distribution)
+    latest_name = upload.file.storage.latest_file_path(upload)
+
+    upload.file.storage.delete(latest_name)
+
+    assert not os.path.exists(_latest_path(upload) + '.gz')
+    assert not StoredFile.objects.filter(path=f'{latest_name}.gz').exists()
+
+
+def test_deleting_distribution_removes_variants(distribution):
+    upload = _upload_csv(distribution)
+    distribution.delete()
+
+    assert not os.path.exists(_latest_path(upload) + '.gz')
+
+
+def test_zstd_variant_when_available(distribution):
+    zstandard = pytest.importorskip('zstandard')
+    upload = _upload_csv(distribution)
+
+    with open(_latest_path(upload) + '.zst', 'rb') as f:
+        decompressed = zstandard.ZstdDecompressor().stream_reader(f).read()
+    assert decompressed == _read(upload.file.path)
+
+
+def test_unavailable_zstd_removes_stale_variant(distribution, monkeypatch):
+    upload = _upload_csv(distribution)
+    stale = _latest_path(upload) + '.zst'
+    with open(stale, 'wb') as f:
+        f.write(b'stale')
+    monkeypatch.setattr(compressed_variants, 'VARIANTS',
+                        [('zstd', '.zst', None), ('gzip', '.gz', compressed_variants._write_gzip)])
+
+    upload.file.storage.save_compressed_variants(upload.file.storage.latest_file_path(upload))
+
+    assert not os.path.exists(stale)
+
+
+def test_same_content_is_not_compressed_again(distribution):
+    upload = _upload_csv(distribution)
+
+    with mock.patch('infra.apps.catalog.storage.infra_storage.write_compressed_variants') \
+            as write_variants:
+        upload.file.storage.save_as_latest(upload)
+
+    write_variants.assert_not_called()
+
+
+def test_externally_replaced_latest_file_is_linked_again(distribution):
+    upload = _upload_csv(distribution)
+    dated = _read(upload.file.path)
+    # Un proceso externo reemplaza el archivo (nunca lo sobreescribe en el lugar)
+    replacement = _latest_path(upload) + '.nuevo'
+    with open(replacement, 'wb') as f:
+        f.write(b'otro contenido')
+    os.replace(replacement, _latest_path(upload))
+
+    upload.file.storage.save_as_latest(upload)
+
+    assert _read(upload.file.path) == dated
+    assert os.path.samefile(_latest_path(upload), upload.file.path)
+    assert _gunzip(_latest_path(upload) + '.gz') == _read(upload.file.path)
+
+
+@pytest.fixture(name='async_distribution')
+def fixture_async_distribution(distribution, settings):
+    # Se activa después de crear la distribución, para que sus fixtures no encolen nada
+    settings.COMPRESSIONS_ASYNC = True
+    settings.COMPRESSION_RETRY_DELAY = 0
+    return distribution
+
+
+def test_async_compression_is_queued(async_distribution):
+    _upload_csv(async_distribution)
+    upload = _upload_csv(async_distribution)
+    latest_name = upload.file.storage.latest_file_path(upload)
+
+    assert not os.path.exists(_latest_path(upload) + '.gz')
+    assert not StoredFile.objects.filter(path=f'{latest_name}.gz').exists()
+    assert PendingCompression.objects.filter(path=latest_name).exists()
+
+    assert CompressionQueue().process_pending() == 1
+
+    assert _gunzip(_latest_path(upload) + '.gz') == _read(upload.file.path)
+    assert StoredFile.objects.filter(path=f'{latest_name}.gz').exists()
+    assert not PendingCompression.objects.exists()
+
+
+def test_requeued_compression_is_kept(async_distribution):
+    upload = _upload_csv(async_distribution)
+    queue = CompressionQueue()
+    pending = queue.claim_next()
+    # Una versión nueva se sube mientras el worker comprime la anterior
+    PendingCompression.objects.enqueue(pending.path)
+
+    queue.process(pending)
+
+    assert PendingCompression.objects.filter(path=pending.path).exists()
+    assert os.path.exists(_latest_path(upload) + '.gz')
+
+
+def test_failed_compression_is_retried(async_distribution):
+    _upload_csv(async_distribution)
+    queue = CompressionQueue()
+
+    with mock.patch('infra.apps.catalog.storage.infra_storage.write_compressed_variants',
+                    side_effect=ValueError):
+        assert not queue.process(queue.claim_next())
+    pending = PendingCompression.objects.get()
+    assert pending.attempts == 1
+
+    assert queue.process(queue.claim_next())
+    assert not PendingCompression.objects.exists()
+
+
+def test_compression_is_dropped_after_max_attempts(async_distribution, settings):
+    settings.COMPRESSION_MAX_ATTEMPTS = 1
+    _upload_csv(async_distribution)
+
+    with mock.patch('infra.apps.catalog.storage.infra_storage.write_compressed_variants',
+                    side_effect=ValueError):
+        assert CompressionQueue().process_pending() == 1
+
+    assert not PendingCompression.objects.exists()
+
+
+def test_process_compressions_command(async_distribution):
+    upload = _upload_csv(async_distribution)
+
+    call_command('process_compressions', '--once', stdout=open(os.devnull, 'w'))
+
+    assert _gunzip(_latest_path(upload) + '.gz') == _read(upload.file.path)
+
+
+def test_accepted_variants_follow_preference_order():
+    assert accepted_variants('gzip, zstd') == [('zstd', '.zst'), ('gzip', '.gz')]
+
+
+def test_accepted_variants_ignore_rejected_encodings():
+    assert accepted_variants('gzip;q=0, br') == []
+    assert accepted_variants('') == []
@@ -9,6 +9,7 @@ from django.test import Client
 
 from infra.apps.catalog.models import CatalogUpload, Node
 from infra.apps.catalog.models.distribution import Distribution
+from infra.apps.catalog.tests.helpers.http_server import LocalHTTPServer
 from infra.apps.catalog.tests.helpers.open_catalog import open_catalog
 
 
@@ -38,6 +39,13 @@ def mock_request():
     return requests_mock.mock()
 
 
+@pytest.fixture
+def http_server():
+    server = LocalHTTPServer().start()
+    yield server
+    server.stop()
+
+
 def _node_id():
     return 'test_id'
 
@@ -53,6 +61,7 @@ def media_root():
     import shutil
     shutil.rmtree(settings.MEDIA_ROOT)
     os.mkdir(settings.MEDIA_ROOT)
+    shutil.rmtree(settings.CATALOG_CACHE_DIR, ignore_errors=True)
 
 
 @pytest.fixture
@@ -0,0 +1,127 @@
+import os
+from unittest import mock
+
+import pytest
+from django.conf import settings as django_settings
+from django.core.management import call_command
+from django.urls import reverse
+
+from infra.apps.catalog.conversion_queue import ConversionQueue
+from infra.apps.catalog.helpers.temp_uploaded_file import temp_uploaded_file
+from infra.apps.catalog.models import CatalogUpload
+from infra.apps.catalog.tests.helpers.open_catalog import open_catalog
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(autouse=True)
+def async_conversions(settings):
+    settings.CATALOG_CONVERSIONS_ASYNC = True
+    settings.CATALOG_CONVERSION_RETRY_DELAY = 0
+
+
+def _upload(node):
+    with open_catalog('valid_data.json') as sample:
+        data_dict = {'format': 'json', 'node': node, 'file': temp_uploaded_file(sample)}
+        return CatalogUpload.create_from_url_or_file(data_dict)
+
+
+def _latest_path(node, file_name):
+    return os.path.join(django_settings.MEDIA_ROOT, 'catalog', node.identifier, file_name)
+
+
+def test_upload_leaves_conversion_pending(node):
+    catalog = _upload(node)
+    assert catalog.conversion_status == CatalogUpload.CONVERSION_PENDING
+    assert not catalog.xlsx_file
+
+
+def test_upload_saves_source_as_latest(node):
+    _upload(node)
+    assert os.path.exists(_latest_path(node, 'data.json'))
+
+
+def test_pending_conversion_is_processed(node):
+    catalog = _upload(node)
+    assert ConversionQueue().process_pending() == 1
+
+    catalog.refresh_from_db()
+    assert catalog.conversion_status == CatalogUpload.CONVERSION_DONE
+    assert catalog.xlsx_file
+    assert os.path.exists(_latest_path(node, 'catalog.xlsx'))
+
+
+def test_claimed_conversion_is_not_claimed_twice(node):
+    _upload(node)
+    assert ConversionQueue().claim_next() is not None
+    assert ConversionQueue().claim_next() is None
+
+
+def test_failed_conversion_is_retried(node):
+    catalog = _upload(node)
+    with mock.patch.object(CatalogUpload, 'create_new_file', side_effect=ValueError('error')):
+        ConversionQueue().process_pending(limit=1)
+
+    catalog.refresh_from_db()
+    assert catalog.conversion_status == CatalogUpload.CONVERSION_PENDING
+    assert catalog.conversion_attempts == 1
+    assert catalog.conversion_error == 'error'
+
+
+def test_conversion_fails_after_max_attempts(node, settings):
+    settings.CATALOG_CONVERSION_MAX_ATTEMPTS = 2
+    catalog = _upload(node)
+    with mock.patch.object(CatalogUpload, 'create_new_file', side_effect=ValueError('error')):
+        ConversionQueue().process_pending()
+
+    catalog.refresh_from_db()
+    assert catalog.conversion_status == CatalogUpload.CONVERSION_FAILED
+    assert catalog.conversion_attempts == 2
+
+
+def test_command_processes_pending_conversions(node):
+    catalog = _upload(node)
+    call_command('process_catalog_conversions', '--once')
+
+    catalog.refresh_from_db()
+    assert catalog.conversion_status == CatalogUpload.CONVERSION_DONE
+
+
+def test_catalog_uploaded_from_view_is_converted_by_worker(admin_client, node, settings,
+                                                           tmp_path):
+    # Sin archivos de otros tests: catalog.xlsx solo existe después de la conversión
+    settings.MEDIA_ROOT = str(tmp_path)
+    with open_catalog('valid_data.json') as sample:
+        response = admin_client.post(reverse('catalog:add_catalog', kwargs={'node_id': node.id}),
+                                     {'format': 'json', 'node': node.identifier, 'file': sample})
+    assert response.status_code == 302
+    catalog = node.catalogupload_set.get()
+    assert catalog.conversion_status == CatalogUpload.CONVERSION_PENDING
+    xlsx_url = reverse('catalog:catalog_download', kwargs={'node_id': node.id,
+                                                           'file_format': 'xlsx'})
+    assert admin_client.get(xlsx_url).status_code == 404
+
+    call_command('process_catalog_conversions', '--once')
+
+    catalog.refresh_from_db()
+    assert catalog.conversion_status == CatalogUpload.CONVERSION_DONE
+    response = admin_client.get(xlsx_url)
+    assert response.status_code == 200
+    with open(catalog.xlsx_file.path, 'rb') as xlsx_file:
+        assert b''.join(response.streaming_content) == xlsx_file.read()
+
+
+def test_failed_conversion_removes_its_temp_file(node):
+    catalog = _upload(node)
+
+    def write_partially(_catalog, path):
+        with open(path, 'wb') as f:
+            f.write(b'incompleto')
+        raise ValueError('error')
+
+    with mock.patch('infra.apps.catalog.models.catalog_upload.write_xlsx_catalog',
+                    side_effect=write_partially):
+        ConversionQueue().process_pending(limit=1)
+
+    directory = os.path.dirname(catalog.json_file.path)
+    assert not [name for name in os.listdir(directory) if name.startswith('.tmp-')]
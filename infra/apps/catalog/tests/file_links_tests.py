@@ -0,0 +1,94 @@
+import os
+from unittest import mock
+
+import pytest
+from django.core.files.base import ContentFile
+
+from infra.apps.catalog.storage.catalog_storage import CustomJsonCatalogStorage
+from infra.apps.catalog.storage.file_links import link_file, copy_file
+from infra.apps.catalog.storage.infra_storage import InfraStorage
+from infra.apps.catalog.storage.paths import latest_json_catalog_path
+
+pytestmark = pytest.mark.django_db
+
+
+def _write(path, content):
+    with open(path, 'wb') as f:
+        f.write(content)
+    return path
+
+
+def _read(path):
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+def test_link_replaces_destination_with_same_file(tmp_path):
+    source = _write(tmp_path / 'source', b'new')
+    destination = _write(tmp_path / 'destination', b'old')
+
+    link_file(str(source), str(destination))
+
+    assert os.path.samefile(source, destination)
+    assert sorted(os.listdir(tmp_path)) == ['destination', 'source']
+
+
+def test_link_to_same_file_leaves_no_temp_files(tmp_path):
+    source = _write(tmp_path / 'source', b'content')
+    os.link(source, tmp_path / 'destination')
+
+    link_file(str(source), str(tmp_path / 'destination'))
+
+    assert sorted(os.listdir(tmp_path)) == ['destination', 'source']
+
+
+def test_link_falls_back_to_copy(tmp_path):
+    source = _write(tmp_path / 'source', b'content')
+    with mock.patch('os.link', side_effect=OSError):
+        link_file(str(source), str(tmp_path / 'destination'))
+
+    assert not os.path.samefile(source, tmp_path / 'destination')
+    assert _read(tmp_path / 'destination') == b'content'
+
+
+def test_copy_without_kernel_copy_support(tmp_path):
+    content = os.urandom(1024 * 1024)
+    source = _write(tmp_path / 'source', content)
+    with mock.patch('os.copy_file_range', side_effect=OSError, create=True), \
+            mock.patch('os.sendfile', side_effect=OSError):
+        copy_file(str(source), str(tmp_path / 'destination'))
+
+    assert _read(tmp_path / 'destination') == content
+
+
+def test_copy_uses_sendfile_without_copy_file_range(tmp_path):
+    content = os.urandom(1024 * 1024)
+    source = _write(tmp_path / 'source', content)
+    with mock.patch('os.copy_file_range', side_effect=OSError, create=True):
+        copy_file(str(source), str(tmp_path / 'destination'))
+
+    assert _read(tmp_path / 'destination') == content
+
+
+def test_storage_save_replaces_existing_file_in_place(tmp_path):
+    storage = InfraStorage(location=str(tmp_path))
+    storage.save('data.json', ContentFile(b'old'))
+    with mock.patch('os.remove') as remove:
+        name = storage.save('data.json', ContentFile(b'new'))
+
+    remove.assert_not_called()
+    assert name == 'data.json'
+    assert os.listdir(tmp_path) == ['data.json']
+    assert _read(tmp_path / 'data.json') == b'new'
+
+
+def test_latest_catalog_is_link_to_dated_file(catalog):
+    assert os.path.samefile(catalog.json_file.path,
+                            latest_json_catalog_path(catalog.node.identifier))
+
+
+def test_latest_catalog_is_saved_without_copying(catalog):
+    with mock.patch('infra.apps.catalog.storage.file_links.copy_file') as copy:
+        CustomJsonCatalogStorage().save_as_latest(catalog)
+
+    copy.assert_not_called()
@@ -0,0 +1,155 @@
+import io
+from datetime import datetime, timedelta
+
+import pytest
+from django.conf import settings
+from django.core.management import call_command
+from django.test import override_settings
+from django.utils import timezone
+
+from infra.apps.catalog.harvest import ERROR, POSTPONED, UNCHANGED, UPDATED, Harvester, \
+    claim_due_distributions
+from infra.apps.catalog.helpers.harvest_schedule import next_harvest_time, retry_delay
+from infra.apps.catalog.models.distribution import Distribution
+
+pytestmark = pytest.mark.django_db
+
+
+def _url_distribution(node, http_server, identifier, body=None, delay=0.0):
+    path = f'/files/{identifier}'
+    http_server.add(path, body=body or identifier.encode(), etag=f'"{identifier}"',
+                    delay=delay)
+    upload = Distribution.objects.upsert_upload(node, {
+        'dataset_identifier': '1',
+        'distribution_identifier': identifier,
+        'file_name': f'{identifier}.csv',
+        'url': http_server.url(path),
+    })
+    return upload.distribution
+
+
+def _make_due(*distributions):
+    Distribution.objects.filter(pk__in=[distribution.pk for distribution in distributions]) \
+        .update(next_harvest_at=timezone.now() - timedelta(minutes=1))
+
+
+def _harvest(**kwargs):
+    return list(Harvester(**kwargs).run(claim_due_distributions(timezone.now())))
+
+
+def _statuses(results):
+    return {result.distribution_identifier: result.status for result in results}
+
+
+def test_next_harvest_time_keeps_a_fixed_slot():
+    after = datetime(2020, 1, 1, 12, tzinfo=timezone.utc)
+    first = next_harvest_time('nodo/1.1', after, 3600)
+
+    assert after < first <= after + timedelta(hours=1)
+    assert next_harvest_time('nodo/1.1', first, 3600) == first + timedelta(hours=1)
+    assert len({next_harvest_time(f'nodo/1.{i}', after, 3600) for i in range(20)}) > 1
+
+
+def test_retry_delay_grows_up_to_maximum():
+    assert [retry_delay(failures, 10, 60) for failures in range(1, 6)] == [10, 20, 40, 60, 60]
+
+
+def test_upload_from_url_schedules_harvest(catalog, http_server):
+    distribution = _url_distribution(catalog.node, http_server, '1.1')
+
+    assert timezone.now() < distribution.next_harvest_at <= \
+        timezone.now() + timedelta(seconds=settings.HARVEST_INTERVAL)
+    assert distribution.harvest_failures == 0
+
+
+def test_harvest_replaces_version_of_the_day(catalog, http_server):
+    distribution = _url_distribution(catalog.node, http_server, '1.1')
+    http_server.add('/files/1.1', body=b'nuevo', etag='"nuevo"')
+    _make_due(distribution)
+
+    results = _harvest()
+
+    assert _statuses(results) == {'1.1': UPDATED}
+    distribution.refresh_from_db()
+    assert distribution.etag == '"nuevo"'
+    assert distribution.next_harvest_at > timezone.now()
+    assert distribution.distributionupload_set.count() == 1
+    with open(distribution.get_latest_upload().file.path, 'rb') as file:
+        assert file.read() == b'nuevo'
+
+
+def test_harvest_unchanged_distribution(catalog, http_server):
+    distribution = _url_distribution(catalog.node, http_server, '1.1')
+    _make_due(distribution)
+
+    assert _statuses(_harvest()) == {'1.1': UNCHANGED}
+    route = http_server.server.routes['/files/1.1']
+    assert route.requests[-1].get('If-None-Match') == '"1.1"'
+
+
+def test_failed_harvest_is_retried_with_backoff(catalog, http_server):
+    distribution = _url_distribution(catalog.node, http_server, '1.1')
+    http_server.add('/files/1.1', status=500)
+
+    for failures in (1, 2):
+        _make_due(distribution)
+        before = timezone.now()
+        assert _statuses(_harvest()) == {'1.1': ERROR}
+
+        distribution.refresh_from_db()
+        assert distribution.harvest_failures == failures
+        assert distribution.last_harvest_error
+        delay = retry_delay(failures, settings.HARVEST_RETRY_DELAY, settings.HARVEST_INTERVAL)
+        assert distribution.next_harvest_at >= before + timedelta(seconds=delay)
+
+
+@override_settings(HARVEST_HOST_MAX_FAILURES=1)
+def test_failing_host_is_postponed(catalog, http_server):
+    distributions = [_url_distribution(catalog.node, http_server, f'1.{i}') for i in range(3)]
+    for distribution in distributions:
+        http_server.add(f'/files/{distribution.identifier}', status=500)
+    _make_due(*distributions)
+
+    statuses = sorted(_statuses(_harvest(max_workers=1, per_node=1)).values())
+
+    assert statuses == [ERROR, POSTPONED, POSTPONED]
+    failures = Distribution.objects.values_list('harvest_failures', flat=True)
+    assert sorted(failures) == [0, 0, 1]
+    assert not Distribution.objects.filter(next_harvest_at__lte=timezone.now()).exists()
+
+
+def test_harvest_limits_concurrency_per_node(catalog, http_server):
+    distributions = [_url_distribution(catalog.node, http_server, f'1.{i}', delay=0.02)
+                     for i in range(6)]
+    for distribution in distributions:
+        http_server.add(f'/files/{distribution.identifier}', body=b'nuevo', delay=0.02)
+    _make_due(*distributions)
+
+    results = _harvest(max_workers=8, per_node=2)
+
+    assert len(results) == 6
+    assert http_server.max_concurrent_requests() <= 2
+
+
+def test_claimed_distributions_are_not_claimed_again(catalog, http_server):
+    distributions = [_url_distribution(catalog.node, http_server, f'1.{i}') for i in range(3)]
+    _make_due(*distributions)
+
+    claimed = {d.identifier for d in claim_due_distributions(timezone.now(), limit=2)}
+    remaining = {d.identifier for d in claim_due_distributions(timezone.now())}
+
+    assert len(claimed) == 2
+    assert claimed | remaining == {'1.0', '1.1', '1.2'}
+    assert not claimed & remaining
+    assert not claim_due_distributions(timezone.now())
+
+
+def test_harvest_command(catalog, http_server):
+    distribution = _url_distribution(catalog.node, http_server, '1.1')
+    _make_due(distribution)
+    out = io.StringIO()
+
+    call_command('harvest_distributions', '--node', catalog.node.identifier, stdout=out)
+
+    assert f'{catalog.node.identifier}/1.1: {UNCHANGED}' in out.getvalue()
+    assert '1 distribuciones actualizadas' in out.getvalue()
@@ -0,0 +1,142 @@
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from socketserver import ThreadingMixIn
+
+CHUNK = bytes(range(256)) * 256
+
+
+def generated_body(size):
+    """Genera `size` bytes determinísticos sin tenerlos todos en memoria."""
+    remaining = size
+    while remaining > 0:
+        chunk = CHUNK[:remaining]
+        remaining -= len(chunk)
+        yield chunk
+
+
+class Route:
+    def __init__(self, body=b'', size=None, status=200, headers=None, content_length=True,
+                 delay=0, etag=None, chunk_delay=0):
+        self.body = body
+        self.etag = etag
+        self.delay = delay
+        # Espera entre chunks, para simular un servidor que envía el cuerpo muy lento
+        self.chunk_delay = chunk_delay
+        self.size = len(body) if size is None else size
+        self.status = status
+        self.headers = headers or {}
+        self.content_length = content_length
+        self.requests = []
+
+    def chunks(self):
+        if self.body:
+            yield self.body
+        else:
+            yield from generated_body(self.size)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):  # pylint: disable=C0103
+        route = self.server.routes.get(self.path)
+        if route is None:
+            self.send_response(404)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+
+        route.requests.append(dict(self.headers))
+        self.server.clients.add(self.client_address)
+        with self.server.track_concurrency(self.headers.get('Host')):
+            self.respond(route)
+
+    def respond(self, route):
+        time.sleep(route.delay)
+        if route.etag and self.headers.get('If-None-Match') == route.etag:
+            self.send_response(304)
+            self.send_header('ETag', route.etag)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+
+        self.send_response(route.status)
+        if route.etag:
+            self.send_header('ETag', route.etag)
+        for name, value in route.headers.items():
+            self.send_header(name, value)
+        if route.content_length:
+            self.send_header('Content-Length', str(route.size))
+        else:
+            self.send_header('Connection', 'close')
+            self.close_connection = True
+        self.end_headers()
+        for chunk in route.chunks():
+            self.wfile.write(chunk)
+            time.sleep(route.chunk_delay)
+
+    def log_message(self, *args):  # pylint: disable=W0221
+        pass
+
+
+class _ThreadingHTTPServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.lock = threading.Lock()
+        self.active = {}
+        self.max_active = {}
+        self.clients = set()
+
+    @contextmanager
+    def track_concurrency(self, host):
+        # Máxima cantidad de pedidos atendidos en simultáneo por header Host
+        with self.lock:
+            self.active[host] = self.active.get(host, 0) + 1
+            self.max_active[host] = max(self.max_active.get(host, 0), self.active[host])
+        try:
+            yield
+        finally:
+            with self.lock:
+                self.active[host] -= 1
+
+    def handle_error(self, request, client_address):
+        # Los clientes cortan la conexión a propósito en algunos tests (p. ej. tamaño máximo)
+        pass
+
+
+class LocalHTTPServer:
+    """Servidor HTTP local que reemplaza a los servidores remotos en los tests."""
+
+    def __init__(self):
+        self.server = _ThreadingHTTPServer(('127.0.0.1', 0), _Handler)
+        self.server.routes = {}
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def add(self, path, **kwargs):
+        route = Route(**kwargs)
+        self.server.routes[path] = route
+        return route
+
+    def url(self, path, host=None):
+        address, port = self.server.server_address
+        return f'http://{host or address}:{port}{path}'
+
+    def connection_count(self):
+        return len(self.server.clients)
+
+    def max_concurrent_requests(self, host=None):
+        if host is None:
+            return max(self.server.max_active.values(), default=0)
+        return self.server.max_active.get(f'{host}:{self.server.server_address[1]}', 0)
@@ -0,0 +1,24 @@
+from contextlib import contextmanager
+from unittest import mock
+
+from pydatajson import readers
+
+
+class ParseCounter:
+    def __init__(self):
+        self.count = 0
+
+
+@contextmanager
+def count_catalog_parses():
+    """Cuenta las lecturas de archivos de catálogo hechas por pydatajson."""
+    counter = ParseCounter()
+    original = readers.read_catalog
+
+    def counting_read_catalog(catalog, *args, **kwargs):
+        if not isinstance(catalog, dict):
+            counter.count += 1
+        return original(catalog, *args, **kwargs)
+
+    with mock.patch.object(readers, 'read_catalog', counting_read_catalog):
+        yield counter
@@ -0,0 +1,37 @@
+import copy
+import json
+import os
+
+from pydatajson import DataJson
+from pydatajson.writers import write_xlsx_catalog
+
+from infra.apps.catalog.tests.helpers.open_catalog import catalog_path
+
+
+def synthetic_catalog(datasets_count):
+    with open(catalog_path('valid_data.json'), 'rb') as sample:
+        catalog = json.loads(sample.read().decode('utf-8'))
+
+    templates = catalog['dataset']
+    datasets = []
+    for index in range(datasets_count):
+        dataset = copy.deepcopy(templates[index % len(templates)])
+        dataset['identifier'] = f'dataset-{index}'
+        dataset['title'] = f"{dataset['title']} {index}"
+        for dist_index, distribution in enumerate(dataset.get('distribution', [])):
+            distribution['identifier'] = f'{index}.{dist_index}'
+        datasets.append(dataset)
+
+    catalog['dataset'] = datasets
+    return catalog
+
+
+def write_synthetic_catalog(directory, datasets_count, file_format='json'):
+    catalog = synthetic_catalog(datasets_count)
+    path = os.path.join(str(directory), f'synthetic-{datasets_count}.{file_format}')
+    if file_format == 'json':
+        with open(path, 'w') as catalog_file:
+            json.dump(catalog, catalog_file)
+    else:
+        write_xlsx_catalog(DataJson(catalog), path)
+    return path
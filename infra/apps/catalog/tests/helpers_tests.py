@@ -0,0 +1,79 @@
+import hashlib
+import tracemalloc
+
+import pytest
+from requests import RequestException, Timeout
+
+from infra.apps.catalog.exceptions.download_too_large_error import DownloadTooLargeError
+from infra.apps.catalog.helpers.temp_file_from_url import download_to_temp_file, \
+    temp_file_from_url
+from infra.apps.catalog.tests.helpers.http_server import CHUNK, generated_body
+
+LARGE_SIZE = 32 * 1024 * 1024
+
+
+def _sha256(size):
+    sha256 = hashlib.sha256()
+    for chunk in generated_body(size):
+        sha256.update(chunk)
+    return sha256.hexdigest()
+
+
+def test_download_writes_body_to_temp_file(http_server):
+    http_server.add('/data.csv', body=b'a,b\n1,2\n')
+    with temp_file_from_url(http_server.url('/data.csv')) as fd:
+        assert fd.read() == b'a,b\n1,2\n'
+
+
+def test_download_hashes_content(http_server):
+    http_server.add('/large.csv', size=LARGE_SIZE)
+    download = download_to_temp_file(http_server.url('/large.csv'))
+    download.file.close()
+    assert download.size == LARGE_SIZE
+    assert download.sha256 == _sha256(LARGE_SIZE)
+
+
+def test_large_download_is_not_held_in_memory(http_server):
+    http_server.add('/large.csv', size=LARGE_SIZE)
+    tracemalloc.start()
+    try:
+        download_to_temp_file(http_server.url('/large.csv')).file.close()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    assert peak < LARGE_SIZE / 8
+
+
+def test_download_larger_than_declared_max_size_fails(http_server, settings):
+    settings.DOWNLOAD_MAX_BYTES = 1024
+    http_server.add('/large.csv', size=2048)
+    with pytest.raises(DownloadTooLargeError):
+        download_to_temp_file(http_server.url('/large.csv'))
+
+
+def test_download_without_content_length_is_bounded(http_server, settings):
+    settings.DOWNLOAD_MAX_BYTES = 1024
+    http_server.add('/large.csv', size=LARGE_SIZE, content_length=False)
+    with pytest.raises(DownloadTooLargeError):
+        download_to_temp_file(http_server.url('/large.csv'))
+
+
+def test_download_error_status_fails(http_server):
+    with pytest.raises(RequestException):
+        download_to_temp_file(http_server.url('/missing.csv'))
+
+
+def test_download_times_out(http_server, settings):
+    settings.DOWNLOAD_TIMEOUT = 0.1
+    http_server.add('/slow.csv', body=b'a,b', delay=1)
+    with pytest.raises(RequestException):
+        download_to_temp_file(http_server.url('/slow.csv'))
+
+
+def test_slow_download_exceeds_total_duration(http_server, settings):
+    settings.DOWNLOAD_TIMEOUT = 1
+    settings.DOWNLOAD_MAX_DURATION = 0.3
+    # Cada lectura recibe datos a tiempo, pero la descarga completa tarda ~2 segundos
+    http_server.add('/slow.csv', size=40 * len(CHUNK), chunk_delay=0.05)
+    with pytest.raises(Timeout):
+        download_to_temp_file(http_server.url('/slow.csv'))
@@ -0,0 +1,82 @@
+from unittest import mock
+
+import pytest
+
+from infra.apps.catalog.helpers.temp_uploaded_file import temp_uploaded_file
+from infra.apps.catalog.ingestion import CatalogIngestion
+from infra.apps.catalog.storage.infra_storage import InfraStorage
+from infra.apps.catalog.tests.helpers.open_catalog import open_catalog, catalog_path
+from infra.apps.catalog.tests.helpers.parse_counter import count_catalog_parses
+
+pytestmark = pytest.mark.django_db
+
+
+def _ingest(node, file_name, file_format):
+    with open_catalog(file_name) as sample:
+        raw_data = {'format': file_format, 'node': node, 'file': temp_uploaded_file(sample)}
+        ingestion = CatalogIngestion(raw_data)
+        ingestion.run()
+    return ingestion
+
+
+def test_ingestion_creates_catalog_upload(node):
+    ingestion = _ingest(node, 'valid_data.json', 'json')
+    assert node.catalogupload_set.get() == ingestion.catalog
+
+
+def test_ingestion_returns_validation_errors(node):
+    ingestion = _ingest(node, 'data.json', 'json')
+    assert "'title' is a required property" in ingestion.error_messages
+
+
+def test_json_ingestion_parses_catalog_once(node):
+    with count_catalog_parses() as parses:
+        ingestion = _ingest(node, 'valid_data.json', 'json')
+        ingestion.catalog.get_datasets()
+    assert parses.count == 1
+
+
+def test_xlsx_ingestion_parses_catalog_once(node):
+    with count_catalog_parses() as parses:
+        ingestion = _ingest(node, 'catalogo-justicia_valido.xlsx', 'xlsx')
+        ingestion.catalog.get_datasets()
+    assert parses.count == 1
+
+
+def test_unchanged_upload_is_not_processed_again(node):
+    first = _ingest(node, 'valid_data.json', 'json')
+    with count_catalog_parses() as parses, \
+            mock.patch.object(InfraStorage, '_save') as save:
+        second = _ingest(node, 'valid_data.json', 'json')
+
+    assert second.unchanged
+    assert second.catalog == first.catalog
+    assert second.error_messages == \
+        ['El catálogo no tiene cambios respecto de la última versión subida']
+    assert parses.count == 0
+    save.assert_not_called()
+
+
+def test_unchanged_upload_keeps_existing_row(node):
+    first = _ingest(node, 'valid_data.json', 'json')
+    _ingest(node, 'valid_data.json', 'json')
+
+    assert node.catalogupload_set.get().pk == first.catalog.pk
+
+
+def test_unchanged_url_upload(node, http_server):
+    with open(catalog_path('valid_data.json'), 'rb') as sample:
+        http_server.add('/data.json', body=sample.read())
+    raw_data = {'format': 'json', 'node': node, 'url': http_server.url('/data.json')}
+    CatalogIngestion(dict(raw_data)).run()
+    ingestion = CatalogIngestion(dict(raw_data))
+    ingestion.run()
+
+    assert ingestion.unchanged
+
+
+def test_changed_format_is_processed(node):
+    _ingest(node, 'catalogo-justicia_valido.xlsx', 'xlsx')
+    ingestion = _ingest(node, 'valid_data.json', 'json')
+
+    assert not ingestion.unchanged
@@ -0,0 +1,190 @@
+import io
+import json
+from unittest import mock
+
+import pytest
+from django.core.files.base import ContentFile
+from django.core.management import CommandError, call_command
+from django.urls import reverse
+
+from infra.apps.catalog.bulk_upload import CREATED, ERROR, UNCHANGED
+from infra.apps.catalog.mirror import CatalogMirror, catalog_entries
+from infra.apps.catalog.mirror_queue import MirrorQueue
+from infra.apps.catalog.models import CatalogUpload, Distribution, MirrorRequest
+from infra.apps.catalog.tests.helpers.open_catalog import open_catalog
+
+pytestmark = pytest.mark.django_db
+
+
+def _mirrored_catalog(node, http_server, host=None, delay=0.0, first_file_name=None):
+    with open_catalog('valid_data.json') as sample:
+        data = json.load(sample)
+    identifiers = []
+    for index, distribution in enumerate(d for dataset in data['dataset']
+                                         for d in dataset['distribution']):
+        identifier = distribution['identifier']
+        path = f'/files/{identifier}'
+        http_server.add(path, body=identifier.encode(), etag=f'"{identifier}"', delay=delay)
+        # Con 'host' la mitad de las distribuciones se descarga desde otro nombre de host
+        distribution['downloadURL'] = http_server.url(path, host if index % 2 else None)
+        identifiers.append(identifier)
+    if first_file_name is not None:
+        data['dataset'][0]['distribution'][0]['fileName'] = first_file_name
+
+    CatalogUpload(format=CatalogUpload.FORMAT_JSON, node=node,
+                  json_file=ContentFile(json.dumps(data).encode(), name='data.json')).save()
+    return identifiers
+
+
+def _statuses(results):
+    return {result.distribution_identifier: result.status for result in results}
+
+
+def test_catalog_entries(node, http_server):
+    identifiers = _mirrored_catalog(node, http_server)
+
+    entries = list(catalog_entries(node.get_latest_catalog_upload()))
+
+    assert [entry.distribution_identifier for entry in entries] == identifiers
+    assert entries[0].file_name == 'consultas-medicamentos-esenciales.csv'
+    assert entries[0].url == http_server.url(f'/files/{identifiers[0]}')
+
+
+def test_mirror_downloads_all_distributions(node, http_server):
+    identifiers = _mirrored_catalog(node, http_server)
+
+    results = CatalogMirror(node, max_workers=8, per_host=4).run()
+
+    assert _statuses(results) == {identifier: CREATED for identifier in identifiers}
+    assert Distribution.objects.filter(catalog=node).count() == len(identifiers)
+    distribution = Distribution.objects.get(identifier=identifiers[0])
+    assert distribution.file_name == 'consultas-medicamentos-esenciales.csv'
+    assert distribution.source_url == http_server.url(f'/files/{identifiers[0]}')
+    with open(distribution.get_latest_upload().file.path, 'rb') as file:
+        assert file.read() == identifiers[0].encode()
+
+
+def test_catalog_file_name_with_path_is_an_error(node, http_server):
+    identifiers = _mirrored_catalog(node, http_server, first_file_name='../../x.csv')
+
+    results = CatalogMirror(node).run()
+
+    assert _statuses(results) == {identifier: ERROR if identifier == identifiers[0] else CREATED
+                                  for identifier in identifiers}
+    assert not Distribution.objects.filter(identifier=identifiers[0]).exists()
+    assert not http_server.server.routes[f'/files/{identifiers[0]}'].requests
+
+
+def test_mirror_limits_concurrency_per_host(node, http_server):
+    _mirrored_catalog(node, http_server, host='localhost', delay=0.02)
+
+    CatalogMirror(node, max_workers=8, per_host=2).run()
+
+    assert http_server.max_concurrent_requests('127.0.0.1') <= 2
+    assert http_server.max_concurrent_requests('localhost') <= 2
+    # Las conexiones se reutilizan: a lo sumo una por lane de cada host
+    assert http_server.connection_count() <= 4
+
+
+def test_mirror_again_uses_conditional_requests(node, http_server):
+    identifiers = _mirrored_catalog(node, http_server)
+    CatalogMirror(node).run()
+
+    results = CatalogMirror(node).run()
+
+    assert _statuses(results) == {identifier: UNCHANGED for identifier in identifiers}
+    route = http_server.server.routes[f'/files/{identifiers[0]}']
+    assert route.requests[-1].get('If-None-Match') == f'"{identifiers[0]}"'
+
+
+def test_failed_downloads_do_not_stop_the_mirror(node, http_server):
+    identifiers = _mirrored_catalog(node, http_server)
+    http_server.add(f'/files/{identifiers[0]}', status=500)
+
+    statuses = _statuses(CatalogMirror(node).run())
+
+    assert statuses.pop(identifiers[0]) == ERROR
+    assert set(statuses.values()) == {CREATED}
+    assert not Distribution.objects.filter(identifier=identifiers[0]).exists()
+
+
+def _mirror_url(node):
+    return reverse('catalog:mirror_distributions', kwargs={'node_id': node.id})
+
+
+def test_mirror_view_enqueues_mirror(admin_client, node, http_server):
+    identifiers = _mirrored_catalog(node, http_server)
+
+    response = admin_client.post(_mirror_url(node))
+
+    assert response.status_code == 202
+    assert response.json()['status'] == MirrorRequest.PENDING
+    assert response['Location'] == response.json()['url']
+    assert not Distribution.objects.filter(catalog=node).exists()
+
+    assert MirrorQueue().process_pending() == 1
+
+    status = admin_client.get(response['Location']).json()
+    assert status['status'] == MirrorRequest.DONE
+    assert len(status['results']) == len(identifiers)
+    assert Distribution.objects.filter(catalog=node).count() == len(identifiers)
+
+
+def test_mirror_view_does_not_enqueue_twice(admin_client, node, http_server):
+    _mirrored_catalog(node, http_server)
+
+    first = admin_client.post(_mirror_url(node)).json()
+    second = admin_client.post(_mirror_url(node)).json()
+
+    assert first['id'] == second['id']
+    assert MirrorRequest.objects.count() == 1
+
+
+def test_failed_mirror_is_retried(node, http_server, settings):
+    _mirrored_catalog(node, http_server)
+    settings.MIRROR_RETRY_DELAY = 0
+    MirrorRequest.objects.enqueue(node)
+
+    queue = MirrorQueue()
+    with mock.patch.object(CatalogMirror, 'run', side_effect=OSError('sin disco')):
+        assert not queue.process(queue.claim_next())
+    mirror_request = MirrorRequest.objects.get()
+    assert mirror_request.status == MirrorRequest.PENDING
+    assert mirror_request.error == 'sin disco'
+
+    assert queue.process(queue.claim_next())
+    assert MirrorRequest.objects.get().status == MirrorRequest.DONE
+
+
+def test_mirror_without_catalog_is_not_retried(node):
+    MirrorRequest.objects.enqueue(node)
+
+    assert MirrorQueue().process_pending() == 1
+
+    mirror_request = MirrorRequest.objects.get()
+    assert mirror_request.status == MirrorRequest.FAILED
+    assert mirror_request.attempts == 1
+    assert mirror_request.finished_at is not None
+
+
+def test_mirror_view_without_catalog(admin_client, node):
+    response = admin_client.post(_mirror_url(node))
+    assert response.status_code == 400
+    assert not MirrorRequest.objects.exists()
+
+
+def test_mirror_command(node, http_server):
+    identifiers = _mirrored_catalog(node, http_server)
+    out = io.StringIO()
+
+    call_command('mirror_catalog_distributions', node.identifier, '--per-host', '3', stdout=out)
+
+    assert f'{CREATED} ({identifiers[0]})' in out.getvalue()
+
+
+def test_mirror_command_fails_with_errors(node, http_server):
+    identifiers = _mirrored_catalog(node, http_server)
+    http_server.add(f'/files/{identifiers[0]}', status=404)
+
+    with pytest.raises(CommandError):
+        call_command('mirror_catalog_distributions', node.identifier, stdout=io.StringIO())
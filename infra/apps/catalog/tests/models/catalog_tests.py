@@ -116,7 +116,7 @@ def test_same_day_multiple_catalog_uploads(node):
         data_dict = {'format': 'json', 'node': node, 'file': temp_file}
         CatalogUpload.create_from_url_or_file(data_dict)
 
-    with open_catalog('data.json') as sample:
+    with open_catalog('valid_data.json') as sample:
         temp_file = temp_uploaded_file(sample)
         data_dict = {'format': 'json', 'node': node, 'file': temp_file}
         CatalogUpload.create_from_url_or_file(data_dict)
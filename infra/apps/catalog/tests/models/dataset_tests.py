@@ -0,0 +1,39 @@
+import pytest
+
+from infra.apps.catalog.forms import DistributionForm
+from infra.apps.catalog.helpers.metadata_hash import metadata_hash
+from infra.apps.catalog.models import Dataset
+from infra.apps.catalog.tests.helpers.parse_counter import count_catalog_parses
+
+pytestmark = pytest.mark.django_db
+
+
+def test_datasets_indexed_on_catalog_upload(catalog):
+    assert list(catalog.dataset_set.values_list('identifier', flat=True)) == ['125']
+
+
+def test_indexed_dataset_has_title_and_hash(catalog):
+    dataset = catalog.dataset_set.get()
+    assert dataset.title == catalog.get_datasets()[0]['title']
+    assert len(dataset.metadata_hash) == 64
+
+
+def test_datasets_indexed_for_xlsx_upload(xlsx_catalog):
+    assert xlsx_catalog.dataset_set.count() == len(xlsx_catalog.get_datasets())
+
+
+def test_datasets_removed_with_catalog_upload(catalog):
+    catalog.delete()
+    assert not Dataset.objects.exists()
+
+
+def test_dataset_hash_is_hash_of_metadata(catalog):
+    expected = metadata_hash(catalog.get_datasets()[0])
+    assert catalog.dataset_set.get().metadata_hash == expected
+
+
+def test_distribution_form_does_not_parse_catalog(catalog):
+    with count_catalog_parses() as parses:
+        form = DistributionForm(node=catalog.node)
+    assert parses.count == 0
+    assert form.fields['dataset_identifier'].choices[0][0] == '125'
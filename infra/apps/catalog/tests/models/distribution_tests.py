@@ -1,13 +1,20 @@
+import hashlib
 import os
+import uuid
 from pathlib import Path
+from unittest import mock
 
 import pytest
 from django.conf import settings
 from django.core.files import File
+from django.core.files.base import ContentFile
+from django.core.management import call_command
 from freezegun import freeze_time
 
 from infra.apps.catalog.exceptions.catalog_not_uploaded_error import CatalogNotUploadedError
 from infra.apps.catalog.models.distribution import DistributionUpload, Distribution
+from infra.apps.catalog.storage.blob_store import blob_path
+from infra.apps.catalog.storage.distribution_storage import DistributionStorage
 from infra.apps.catalog.tests.helpers.open_catalog import open_catalog
 
 pytestmark = pytest.mark.django_db
@@ -83,3 +90,219 @@ def test_upload_distribution_filename_without_extension(distribution):
             distribution.distributionupload_set.create(file=File(f))
         dist_filename = Path(DistributionUpload.objects.first().file.name).name
     assert dist_filename == 'file_without_extension-2019-01-01'
+
+
+def _url_data(catalog, url, file_name='data.csv'):
+    return {'dataset_identifier': '125',
+            'file_name': file_name,
+            'distribution_identifier': '125.1',
+            'node': catalog.node,
+            'url': url}
+
+
+def test_url_distribution_stores_source_and_validators(catalog, http_server):
+    http_server.add('/data.csv', body=b'a,b', etag='"v1"')
+    url = http_server.url('/data.csv')
+    upload = Distribution.objects.upsert_upload(catalog.node, _url_data(catalog, url))
+
+    assert upload.distribution.source_url == url
+    assert upload.distribution.etag == '"v1"'
+
+
+def test_url_distribution_uses_hash_computed_while_downloading(catalog, http_server):
+    http_server.add('/data.csv', body=b'a,b')
+    url = http_server.url('/data.csv')
+    with mock.patch('infra.apps.catalog.models.distribution.file_sha256') as file_sha256:
+        upload = Distribution.objects.upsert_upload(catalog.node, _url_data(catalog, url))
+
+    file_sha256.assert_not_called()
+    assert upload.file_hash == hashlib.sha256(b'a,b').hexdigest()
+    assert os.path.exists(blob_path(upload.file_hash))
+
+
+def test_same_day_refetch_replaces_hash(catalog, http_server):
+    route = http_server.add('/data.csv', body=b'a,b')
+    url = http_server.url('/data.csv')
+    Distribution.objects.upsert_upload(catalog.node, _url_data(catalog, url))
+    route.body = b'c,d'
+
+    upload = Distribution.objects.upsert_upload(catalog.node, _url_data(catalog, url))
+
+    assert DistributionUpload.objects.get().file_hash == hashlib.sha256(b'c,d').hexdigest()
+    with open(upload.file.path, 'rb') as f:
+        assert f.read() == b'c,d'
+
+
+def test_refetch_sends_conditional_headers(catalog, http_server):
+    route = http_server.add('/data.csv', body=b'a,b', etag='"v1"')
+    url = http_server.url('/data.csv')
+    Distribution.objects.upsert_upload(catalog.node, _url_data(catalog, url))
+    Distribution.objects.upsert_upload(catalog.node, _url_data(catalog, url))
+
+    assert 'If-None-Match' not in route.requests[0]
+    assert route.requests[1]['If-None-Match'] == '"v1"'
+
+
+def test_not_modified_records_version_without_new_file(catalog, http_server):
+    http_server.add('/data.csv', body=b'a,b', etag='"v1"')
+    url = http_server.url('/data.csv')
+    with freeze_time('2019-01-01'):
+        first = Distribution.objects.upsert_upload(catalog.node, _url_data(catalog, url))
+
+    with mock.patch.object(DistributionStorage, 'save_as_latest') as save_as_latest:
+        second = Distribution.objects.upsert_upload(catalog.node, _url_data(catalog, url))
+
+    assert DistributionUpload.objects.count() == 2
+    assert second.uploaded_at != first.uploaded_at
+    assert second.file.name != first.file.name
+    assert os.path.samefile(second.file.path, blob_path(first.file_hash))
+    assert second.file_hash == first.file_hash
+    save_as_latest.assert_not_called()
+
+
+def test_not_modified_reschedules_harvest(catalog, http_server):
+    http_server.add('/data.csv', body=b'a,b', etag='"v1"')
+    url = http_server.url('/data.csv')
+    with freeze_time('2019-01-01'):
+        Distribution.objects.upsert_upload(catalog.node, _url_data(catalog, url))
+    Distribution.objects.filter(identifier='125.1').update(next_harvest_at=None)
+
+    upload = Distribution.objects.upsert_upload(catalog.node, _url_data(catalog, url))
+
+    distribution = Distribution.objects.get(pk=upload.distribution.pk)
+    assert distribution.etag == '"v1"'
+    assert distribution.next_harvest_at is not None
+
+
+def test_rename_after_not_modified_keeps_previous_version(catalog, http_server):
+    http_server.add('/data.csv', body=b'a,b', etag='"v1"')
+    url = http_server.url('/data.csv')
+    with freeze_time('2019-01-01'):
+        first = Distribution.objects.upsert_upload(catalog.node, _url_data(catalog, url))
+    with freeze_time('2019-01-02'):
+        Distribution.objects.upsert_upload(catalog.node, _url_data(catalog, url))
+        data = _url_data(catalog, None, file_name='otro.csv')
+        data['file'] = _content_file(b'c,d')
+        Distribution.objects.upsert_upload(catalog.node, data)
+
+    first.refresh_from_db()
+    assert first.file.name.endswith('data-2019-01-01.csv')
+    with open(first.file.path, 'rb') as f:
+        assert f.read() == b'a,b'
+
+
+def test_changed_file_is_downloaded_again(catalog, http_server):
+    route = http_server.add('/data.csv', body=b'a,b', etag='"v1"')
+    url = http_server.url('/data.csv')
+    with freeze_time('2019-01-01'):
+        Distribution.objects.upsert_upload(catalog.node, _url_data(catalog, url))
+    route.body, route.size, route.etag = b'a,b,c', 5, '"v2"'
+    upload = Distribution.objects.upsert_upload(catalog.node, _url_data(catalog, url))
+
+    assert upload.file.read() == b'a,b,c'
+    assert upload.distribution.etag == '"v2"'
+
+
+def test_file_upload_clears_source_url(catalog, http_server):
+    http_server.add('/data.csv', body=b'a,b', etag='"v1"')
+    data = _url_data(catalog, http_server.url('/data.csv'))
+    Distribution.objects.upsert_upload(catalog.node, data)
+    with open_catalog('test_data.csv') as f:
+        data.update({'url': None, 'file': File(f)})
+        upload = Distribution.objects.upsert_upload(catalog.node, data)
+
+    assert upload.distribution.source_url == ''
+
+
+def _unique_content():
+    return f'a,b\n{uuid.uuid4().hex},1\n'.encode()
+
+
+def _content_file(content=None):
+    return ContentFile(content or _unique_content(), name='data.csv')
+
+
+def _latest_path(upload):
+    return upload.file.storage.path(upload.file.storage.latest_file_path(upload))
+
+
+def test_dated_and_latest_versions_share_blob(distribution):
+    upload = distribution.distributionupload_set.create(file=_content_file())
+
+    blob = os.stat(blob_path(upload.file_hash))
+    assert os.stat(upload.file.path).st_ino == blob.st_ino
+    assert os.stat(_latest_path(upload)).st_ino == blob.st_ino
+
+
+def test_identical_uploads_are_stored_once(distribution):
+    content = _unique_content()
+    with freeze_time('2019-01-01'):
+        first = distribution.distributionupload_set.create(file=_content_file(content))
+    second = distribution.distributionupload_set.create(file=_content_file(content))
+
+    assert first.file.path != second.file.path
+    assert os.stat(first.file.path).st_ino == os.stat(second.file.path).st_ino
+    assert os.stat(blob_path(first.file_hash)).st_nlink == 4
+
+
+def test_deleting_last_reference_removes_blob(distribution):
+    with freeze_time('2019-01-01'):
+        old = distribution.distributionupload_set.create(file=_content_file())
+    distribution.distributionupload_set.create(file=_content_file())
+
+    old.delete()
+
+    assert not os.path.exists(old.file.path)
+    assert not os.path.exists(blob_path(old.file_hash))
+
+
+def test_deleting_shared_version_keeps_blob(distribution):
+    content = _unique_content()
+    with freeze_time('2019-01-01'):
+        old = distribution.distributionupload_set.create(file=_content_file(content))
+    new = distribution.distributionupload_set.create(file=_content_file(content))
+
+    old.delete()
+
+    assert os.path.exists(blob_path(new.file_hash))
+    with open(new.file.path, 'rb') as f:
+        assert f.read() == content
+
+
+def test_replacing_same_day_version_releases_previous_blob(catalog):
+    data = _url_data(catalog, None)
+    data['file'] = _content_file()
+    first = Distribution.objects.upsert_upload(catalog.node, data)
+    data['file'] = _content_file()
+    second = Distribution.objects.upsert_upload(catalog.node, data)
+
+    assert first.file_hash != second.file_hash
+    assert not os.path.exists(blob_path(first.file_hash))
+
+
+def test_deleting_distribution_removes_blobs(distribution):
+    upload = distribution.distributionupload_set.create(file=_content_file())
+
+    distribution.delete()
+
+    assert not os.path.exists(blob_path(upload.file_hash))
+
+
+def test_store_distribution_blobs_migrates_existing_files(distribution):
+    content = _unique_content()
+    with freeze_time('2019-01-01'):
+        first = distribution.distributionupload_set.create(file=_content_file(content))
+    second = distribution.distributionupload_set.create(file=_content_file(content))
+    # Simula versiones guardadas como copias independientes, antes del blob store
+    for upload in (first, second):
+        os.remove(upload.file.path)
+        with open(upload.file.path, 'wb') as f:
+            f.write(content)
+    os.remove(blob_path(first.file_hash))
+    DistributionUpload.objects.update(file_hash='')
+
+    call_command('store_distribution_blobs')
+
+    first.refresh_from_db()
+    assert os.stat(first.file.path).st_ino == os.stat(second.file.path).st_ino
+    assert os.stat(blob_path(first.file_hash)).st_nlink == 4
@@ -3,9 +3,11 @@ from tempfile import NamedTemporaryFile
 import pytest
 from django.core.files import File
 from django.db import IntegrityError
+from freezegun import freeze_time
 
 from infra.apps.catalog.exceptions.catalog_not_uploaded_error import CatalogNotUploadedError
 from infra.apps.catalog.models import Node, CatalogUpload
+from infra.apps.catalog.tests.helpers.open_catalog import open_catalog
 
 pytestmark = pytest.mark.django_db
 
@@ -31,3 +33,53 @@ def get_latest_catalog(node):
 def test_get_latest_catalog_fails_if_no_catalogs(node):
     with pytest.raises(CatalogNotUploadedError):
         node.get_latest_catalog_upload()
+
+
+def _upload(node, file_name='data.json'):
+    with open_catalog(file_name) as sample:
+        catalog = CatalogUpload(format=CatalogUpload.FORMAT_JSON, json_file=File(sample), node=node)
+        catalog.save()
+    return catalog
+
+
+def test_catalog_upload_summary_is_updated_on_upload(node):
+    with freeze_time('2019-01-01'):
+        _upload(node)
+    latest = _upload(node, 'valid_data.json')
+
+    node.refresh_from_db()
+    assert node.latest_catalog_upload == latest
+    assert node.catalog_upload_count == 2
+    assert node.last_upload_date == latest.uploaded_at
+
+
+def test_catalog_upload_summary_is_updated_on_delete(node):
+    with freeze_time('2019-01-01'):
+        first = _upload(node)
+    _upload(node, 'valid_data.json').delete()
+
+    node.refresh_from_db()
+    assert node.latest_catalog_upload == first
+    assert node.catalog_upload_count == 1
+    assert str(node.last_upload_date) == '2019-01-01'
+
+
+def test_catalog_upload_summary_is_cleared_when_last_upload_is_deleted(node):
+    _upload(node).delete()
+
+    node.refresh_from_db()
+    assert node.latest_catalog_upload is None
+    assert node.catalog_upload_count == 0
+    assert node.last_upload_date is None
+
+
+def test_catalog_upload_check_does_not_query(catalog, django_assert_num_queries):
+    node = Node.objects.get(pk=catalog.node.pk)
+    with django_assert_num_queries(0):
+        assert node.has_catalog_upload()
+
+
+def test_deleting_node_with_uploads(catalog):
+    catalog.node.delete()
+
+    assert not CatalogUpload.objects.exists()
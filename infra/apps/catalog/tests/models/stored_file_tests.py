@@ -0,0 +1,107 @@
+import importlib
+import os
+
+import pytest
+from django.apps import apps
+from django.conf import settings
+from django.core.management import call_command
+
+from infra.apps.catalog.models import StoredFile
+from infra.apps.catalog.storage.paths import catalog_path
+
+pytestmark = pytest.mark.django_db
+
+
+def _stored_paths():
+    return set(StoredFile.objects.values_list('path', flat=True))
+
+
+def test_catalog_upload_records_dated_and_latest_files(catalog):
+    stored_paths = _stored_paths()
+
+    assert catalog.json_file.name in stored_paths
+    assert catalog.xlsx_file.name in stored_paths
+    assert catalog_path(catalog.node.identifier, 'data.json') in stored_paths
+    assert catalog_path(catalog.node.identifier, 'catalog.xlsx') in stored_paths
+
+
+def test_stored_file_matches_file_on_disk(catalog):
+    stored_file = catalog.stored_files()[catalog.json_file.name]
+
+    stat = os.stat(catalog.json_file.path)
+    assert stored_file.size == stat.st_size
+    assert stored_file.mtime == stat.st_mtime
+    assert stored_file.checksum == catalog.content_hash
+
+
+def test_distribution_upload_records_file_with_hash(distribution_upload):
+    stored_file = distribution_upload.stored_file()
+
+    assert stored_file.checksum == distribution_upload.file_hash
+    assert stored_file.size == os.path.getsize(distribution_upload.file.path)
+
+
+def test_distribution_upload_delete_forgets_file(distribution_upload):
+    name = distribution_upload.file.name
+    distribution_upload.delete()
+
+    assert name not in _stored_paths()
+
+
+def test_distribution_delete_forgets_its_directory(distribution_upload):
+    distribution = distribution_upload.distribution
+    distribution.delete()
+
+    assert not any('distribution/125.1/' in path for path in _stored_paths())
+
+
+def test_reconcile_repairs_drift(catalog):
+    removed = catalog_path(catalog.node.identifier, 'catalog.xlsx')
+    StoredFile.objects.filter(path=catalog.json_file.name).delete()
+    StoredFile.objects.filter(path=removed).update(size=0)
+    os.remove(os.path.join(settings.MEDIA_ROOT, removed))
+
+    call_command('reconcile_stored_files', '--checksums', stdout=open(os.devnull, 'w'))
+
+    stored_paths = _stored_paths()
+    assert catalog.json_file.name in stored_paths
+    assert removed not in stored_paths
+    assert StoredFile.objects.get(path=catalog.json_file.name).checksum == catalog.content_hash
+
+
+def test_reconcile_fills_missing_checksums(catalog):
+    StoredFile.objects.filter(path=catalog.json_file.name).update(checksum='')
+
+    call_command('reconcile_stored_files', stdout=open(os.devnull, 'w'))
+    assert StoredFile.objects.get(path=catalog.json_file.name).checksum == ''
+
+    call_command('reconcile_stored_files', '--checksums', stdout=open(os.devnull, 'w'))
+    assert StoredFile.objects.get(path=catalog.json_file.name).checksum == catalog.content_hash
+
+
+def test_reconcile_dry_run_does_not_change_rows(catalog):
+    StoredFile.objects.filter(path=catalog.json_file.name).delete()
+
+    call_command('reconcile_stored_files', '--dry-run', stdout=open(os.devnull, 'w'))
+
+    assert catalog.json_file.name not in _stored_paths()
+
+
+def test_reconcile_in_batches(catalog):
+    StoredFile.objects.all().delete()
+
+    call_command('reconcile_stored_files', '--batch-size', '1', stdout=open(os.devnull, 'w'))
+
+    assert catalog.json_file.name in _stored_paths()
+    assert catalog_path(catalog.node.identifier, 'data.json') in _stored_paths()
+
+
+def test_migration_records_existing_files(catalog):
+    migration = importlib.import_module('infra.apps.catalog.migrations.0028_stored_file')
+    StoredFile.objects.all().delete()
+
+    migration.record_stored_files(apps, None)
+
+    stored_file = StoredFile.objects.get(path=catalog.json_file.name)
+    assert stored_file.size == os.path.getsize(catalog.json_file.path)
+    assert stored_file.checksum == ''
@@ -0,0 +1,166 @@
+import io
+import os
+import time
+
+import pytest
+from django.core.management import call_command
+
+from infra.apps.catalog.helpers.external_sort import external_sort
+from infra.apps.catalog.helpers.tree_scan import scan_tree
+from infra.apps.catalog.models import CatalogUpload, DistributionUpload
+from infra.apps.catalog.reconciliation import DANGLING, DISTRIBUTION_UPLOAD, ORPHAN, \
+    CATALOG_UPLOAD, Finding, MediaReconciliation
+from infra.apps.catalog.storage.blob_store import blob_path
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(name='isolated_media')
+def fixture_isolated_media(settings, tmp_path):
+    # Otros tests dejan archivos en el MEDIA_ROOT compartido
+    settings.MEDIA_ROOT = str(tmp_path)
+    return tmp_path
+
+
+def _orphan(media, name, mtime=0):
+    path = media / 'catalog' / 'test_id' / name
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(b'huerfano')
+    os.utime(path, (mtime, mtime))
+    return os.path.join('catalog', 'test_id', name)
+
+
+def _blob_name(media, upload):
+    return os.path.relpath(blob_path(upload.file_hash), media)
+
+
+def _latest_path(upload):
+    return upload.file.storage.path(upload.file.storage.latest_file_path(upload))
+
+
+def _reconcile(fix=False):
+    return list(MediaReconciliation(fix=fix, scan_workers=3, run_size=2, batch_size=1).run())
+
+
+def test_external_sort_merges_runs():
+    lines = ['c\t1', 'a\t2', 'e\t3', 'b\t4', 'd\t5']
+    assert list(external_sort(lines, run_size=2)) == sorted(lines)
+    assert list(external_sort(lines, run_size=10)) == sorted(lines)
+    assert list(external_sort(['b\t1', 'a\t2'], run_size=1, key=lambda line: line[0])) == \
+        ['a\t2', 'b\t1']
+
+
+def test_scan_tree_lists_files(tmp_path):
+    for name in ('a/1.csv', 'a/b/2.csv', 'a/b/c/3.csv', 'a/.tmp-4', 'a/.oculto/5.csv'):
+        (tmp_path / name).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / name).write_bytes(b'')
+
+    assert sorted(scan_tree(str(tmp_path), 'a', max_workers=2)) == \
+        ['a/1.csv', 'a/b/2.csv', 'a/b/c/3.csv']
+
+
+@pytest.mark.usefixtures('isolated_media', 'distribution_upload')
+def test_consistent_media_has_no_findings():
+    assert _reconcile() == []
+
+
+def test_reports_orphans_and_dangling_rows(isolated_media, distribution_upload):
+    orphan = _orphan(isolated_media, 'dataset/1/viejo.csv')
+    os.remove(distribution_upload.file.path)
+
+    # El blob no es huérfano: la ruta "latest" sigue siendo un hardlink a él
+    assert _reconcile() == sorted([
+        Finding(ORPHAN, orphan, []),
+        Finding(DANGLING, distribution_upload.file.name,
+                [(DISTRIBUTION_UPLOAD, distribution_upload.id)]),
+    ], key=lambda finding: finding.path)
+
+
+def test_reports_blob_without_links(isolated_media, distribution_upload):
+    os.remove(distribution_upload.file.path)
+    os.remove(_latest_path(distribution_upload))
+
+    assert Finding(ORPHAN, _blob_name(isolated_media, distribution_upload), []) in _reconcile()
+
+
+def test_fix_removes_orphans_and_dangling_rows(isolated_media, distribution_upload):
+    orphan = _orphan(isolated_media, 'viejo.csv')
+    # Escrito durante la comparación: su fila puede estar por crearse
+    recent = _orphan(isolated_media, 'nuevo.csv', mtime=time.time() + 60)
+    os.remove(distribution_upload.file.path)
+    os.remove(_latest_path(distribution_upload))
+
+    reconciliation = MediaReconciliation(fix=True, run_size=2, batch_size=1)
+    assert len(list(reconciliation.run())) == 4
+
+    assert reconciliation.removed_files == 2
+    assert reconciliation.deleted_rows == 1
+    assert not (isolated_media / orphan).exists()
+    assert not os.path.exists(blob_path(distribution_upload.file_hash))
+    assert (isolated_media / recent).exists()
+    assert not DistributionUpload.objects.filter(pk=distribution_upload.pk).exists()
+
+
+def test_fix_releases_blob_of_orphan_link(isolated_media, distribution_upload):
+    blob = blob_path(distribution_upload.file_hash)
+    # Versión fechada que quedó sin fila (p. ej. un borrado interrumpido)
+    orphan = os.path.join(os.path.dirname(distribution_upload.file.name), 'viejo.csv')
+    os.link(blob, isolated_media / orphan)
+    os.utime(isolated_media / orphan, (0, 0))
+    DistributionUpload.objects.filter(pk=distribution_upload.pk).update(file_hash='')
+    os.remove(distribution_upload.file.path)
+    os.link(blob, distribution_upload.file.path)
+
+    assert _reconcile(fix=True) == [Finding(ORPHAN, orphan, [])]
+    assert not (isolated_media / orphan).exists()
+    assert os.stat(blob).st_nlink == 3
+
+
+def test_fix_removes_unlinked_blob(isolated_media, distribution_upload):
+    blob = blob_path('0' * 64)
+    os.makedirs(os.path.dirname(blob))
+    with open(blob, 'wb') as f:
+        f.write(b'sin versiones')
+    os.utime(blob, (0, 0))
+
+    findings = _reconcile(fix=True)
+
+    assert findings == [Finding(ORPHAN, os.path.relpath(blob, isolated_media), [])]
+    assert not os.path.exists(blob)
+    assert os.path.exists(blob_path(distribution_upload.file_hash))
+
+
+@pytest.mark.usefixtures('isolated_media')
+def test_deleting_dangling_row_releases_blob(distribution_upload):
+    blob = blob_path(distribution_upload.file_hash)
+    os.remove(distribution_upload.file.path)
+    os.remove(_latest_path(distribution_upload))
+
+    MediaReconciliation(fix=True).delete_dangling_rows([
+        Finding(DANGLING, distribution_upload.file.name,
+                [(DISTRIBUTION_UPLOAD, distribution_upload.id)])])
+
+    assert not DistributionUpload.objects.filter(pk=distribution_upload.pk).exists()
+    assert not os.path.exists(blob)
+
+
+@pytest.mark.usefixtures('isolated_media')
+def test_fix_keeps_catalog_with_remaining_files(catalog):
+    os.remove(catalog.json_file.path)
+
+    findings = _reconcile(fix=True)
+
+    assert findings == [Finding(DANGLING, catalog.json_file.name, [(CATALOG_UPLOAD, catalog.id)])]
+    assert CatalogUpload.objects.filter(pk=catalog.pk).exists()
+
+
+def test_reconcile_media_command(isolated_media, catalog):
+    orphan = _orphan(isolated_media, 'viejo.csv')
+    out = io.StringIO()
+
+    call_command('reconcile_media', '--fix', stdout=out)
+
+    assert f'Huérfano: {orphan}' in out.getvalue()
+    assert '1 archivos huérfanos, 0 rutas sin archivo' in out.getvalue()
+    assert '1 archivos borrados, 0 filas borradas' in out.getvalue()
+    assert CatalogUpload.objects.filter(pk=catalog.pk).exists()
@@ -0,0 +1,156 @@
+import io
+import os
+from datetime import date
+
+import pytest
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from freezegun import freeze_time
+
+from infra.apps.catalog.helpers.retention_policy import RetentionPolicy, months_before, \
+    versions_to_prune
+from infra.apps.catalog.models import CatalogUpload, Distribution, DistributionUpload
+from infra.apps.catalog.retention import VersionPruner
+from infra.apps.catalog.storage.blob_store import blob_path
+from infra.apps.catalog.storage.paths import absolute_catalog_path
+from infra.apps.catalog.tests.helpers.open_catalog import open_catalog
+
+pytestmark = pytest.mark.django_db
+
+TODAY = date(2020, 6, 30)
+# Las dos últimas son diarias; 06-16 y 06-18 caen en la misma semana y 05-10 y 05-20 en el
+# mismo mes, fuera de la retención semanal
+DATES = ['2020-04-01', '2020-05-10', '2020-05-20', '2020-06-16', '2020-06-18', '2020-06-25',
+         '2020-06-30']
+PRUNED_DATES = ['2020-05-10', '2020-06-16']
+
+
+@pytest.fixture(name='retention_node')
+def fixture_retention_node(catalog):
+    node = catalog.node
+    node.retention_daily_days = 7
+    node.retention_weekly_months = 1
+    node.save()
+    return node
+
+
+def _distribution_versions(node, dates):
+    for version_date in dates:
+        with freeze_time(version_date):
+            Distribution.objects.upsert_upload(node, {
+                'dataset_identifier': '125',
+                'distribution_identifier': '125.1',
+                'file_name': 'data.csv',
+                'file': ContentFile(version_date.encode(), name='data.csv'),
+            })
+    return Distribution.objects.get(catalog=node, identifier='125.1')
+
+
+def _uploaded_dates(distribution):
+    return [str(uploaded_at) for uploaded_at in distribution.distributionupload_set
+            .order_by('uploaded_at').values_list('uploaded_at', flat=True)]
+
+
+def test_versions_to_prune():
+    versions = [(index, date.fromisoformat(version_date))
+                for index, version_date in enumerate(DATES)]
+
+    pruned = versions_to_prune(versions, RetentionPolicy(daily_days=7, weekly_months=1), TODAY)
+
+    assert sorted(DATES[index] for index in pruned) == PRUNED_DATES
+
+
+def test_latest_version_is_always_kept():
+    versions = [(1, date(2019, 1, 1)), (2, date(2019, 1, 2))]
+    assert versions_to_prune(versions, RetentionPolicy(0, 0), TODAY) == [1]
+
+
+def test_months_before_clamps_day():
+    assert months_before(date(2020, 3, 31), 1) == date(2020, 2, 29)
+    assert months_before(date(2020, 1, 15), 13) == date(2018, 12, 15)
+
+
+def test_node_policy_overrides_settings(node):
+    assert node.retention_policy() == RetentionPolicy(settings.RETENTION_DAILY_DAYS,
+                                                      settings.RETENTION_WEEKLY_MONTHS)
+    node.retention_weekly_months = 2
+    assert node.retention_policy() == RetentionPolicy(settings.RETENTION_DAILY_DAYS, 2)
+
+
+def test_prune_distribution_versions(retention_node):
+    distribution = _distribution_versions(retention_node, DATES)
+    pruned_paths = [upload.file.path for upload in distribution.distributionupload_set.all()
+                    if str(upload.uploaded_at) in PRUNED_DATES]
+    pruned_blobs = [blob_path(upload.file_hash) for upload
+                    in distribution.distributionupload_set.all()
+                    if str(upload.uploaded_at) in PRUNED_DATES]
+
+    pruner = VersionPruner(retention_node, batch_size=2, io_workers=2).run(TODAY)
+
+    assert pruner.distribution_uploads == 2
+    assert pruner.bytes == sum(len(pruned_date) for pruned_date in PRUNED_DATES)
+    assert _uploaded_dates(distribution) == [d for d in DATES if d not in PRUNED_DATES]
+    assert not any(os.path.exists(path) for path in pruned_paths + pruned_blobs)
+    latest_upload = distribution.get_latest_upload()
+    with open(os.path.join(settings.MEDIA_ROOT, latest_upload.file_path()), 'rb') as latest_copy:
+        assert latest_copy.read() == b'2020-06-30'
+
+
+def test_prune_keeps_files_shared_with_kept_versions(retention_node):
+    distribution = _distribution_versions(retention_node, ['2020-06-16', '2020-06-18'])
+    # Una versión sin cambios (304) reutiliza la ruta fechada de la anterior
+    old, new = distribution.distributionupload_set.order_by('uploaded_at')
+    DistributionUpload.objects.filter(pk=new.pk).update(file=old.file.name,
+                                                        file_hash=old.file_hash)
+
+    pruner = VersionPruner(retention_node).run(TODAY)
+
+    assert pruner.distribution_uploads == 1
+    assert pruner.files == 0
+    assert os.path.exists(old.file.path)
+
+
+def test_dry_run_deletes_nothing(retention_node):
+    distribution = _distribution_versions(retention_node, DATES)
+
+    pruner = VersionPruner(retention_node, dry_run=True).run(TODAY)
+
+    assert pruner.distribution_uploads == 2
+    assert pruner.bytes == sum(len(pruned_date) for pruned_date in PRUNED_DATES)
+    assert _uploaded_dates(distribution) == DATES
+    assert all(os.path.exists(upload.file.path)
+               for upload in distribution.distributionupload_set.all())
+
+
+def test_prune_catalog_versions(retention_node):
+    for version_date in ('2020-05-10', '2020-05-20'):
+        with freeze_time(version_date), open_catalog('data.json') as catalog_fd:
+            CatalogUpload(format=CatalogUpload.FORMAT_JSON, node=retention_node,
+                          json_file=ContentFile(catalog_fd.read(), name='data.json')).save()
+    latest = retention_node.catalogupload_set.order_by('-uploaded_at').first()
+
+    pruner = VersionPruner(retention_node).run(TODAY)
+
+    assert pruner.catalog_uploads == 1
+    assert not retention_node.catalogupload_set.filter(uploaded_at='2020-05-10').exists()
+    assert not os.path.exists(absolute_catalog_path(retention_node.identifier,
+                                                    'data-2020-05-10.json'))
+    assert os.path.exists(absolute_catalog_path(retention_node.identifier,
+                                                'data-2020-05-20.json'))
+    assert os.path.exists(absolute_catalog_path(retention_node.identifier, 'data.json'))
+    retention_node.refresh_from_db()
+    assert retention_node.latest_catalog_upload == latest
+
+
+def test_prune_versions_command(retention_node):
+    distribution = _distribution_versions(retention_node, DATES)
+    out = io.StringIO()
+
+    with freeze_time(TODAY):
+        call_command('prune_versions', '--dry-run', '--node', retention_node.identifier,
+                     stdout=out)
+
+    assert '2 versiones de distribuciones' in out.getvalue()
+    assert f'Se liberarían {sum(len(d) for d in PRUNED_DATES)} bytes' in out.getvalue()
+    assert _uploaded_dates(distribution) == DATES
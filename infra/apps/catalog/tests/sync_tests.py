@@ -1,8 +1,15 @@
+import os
 from shutil import copy2
+from unittest import mock
 
 import pytest
 from django.core.exceptions import ValidationError
+from django.core.management import call_command, CommandError
+from django.db import connection
 
+from infra.apps.catalog.exceptions.catalog_unchanged_error import CatalogUnchangedError
+from infra.apps.catalog.models import Node
+from infra.apps.catalog.storage.paths import latest_json_catalog_path
 from infra.apps.catalog.sync import sync_catalog
 from infra.apps.catalog.tests.helpers.open_catalog import catalog_path
 
@@ -27,3 +34,113 @@ def test_sync_invalid_catalog(node, catalog_dest):
 def test_sync_catalog_returns_errors(node, catalog_dest):
     copy2(catalog_path('data.json'), catalog_dest)
     assert sync_catalog(node.id)
+
+
+def test_sync_unchanged_catalog_is_skipped_without_reading(node, catalog_dest):
+    copy2(catalog_path('data.json'), catalog_dest)
+    catalog = node.sync()
+    with mock.patch('infra.apps.catalog.models.node.file_sha256') as file_sha256, \
+            pytest.raises(CatalogUnchangedError):
+        node.sync()
+
+    file_sha256.assert_not_called()
+    assert node.catalogupload_set.get() == catalog
+
+
+def test_sync_touched_catalog_is_compared_by_content(node, catalog_dest):
+    copy2(catalog_path('data.json'), catalog_dest)
+    catalog = node.sync()
+    os.remove(catalog_dest)
+    copy2(catalog_path('data.json'), catalog_dest)
+    os.utime(catalog_dest, (0, 0))
+    with pytest.raises(CatalogUnchangedError):
+        node.sync()
+
+    catalog.refresh_from_db()
+    assert catalog.source_signature.startswith('0:')
+
+
+def test_sync_catalog_with_same_mtime_is_compared_by_content(node, catalog_dest):
+    copy2(catalog_path('data.json'), catalog_dest)
+    first = node.sync()
+    mtime_ns = os.stat(catalog_dest).st_mtime_ns
+    # Reescrito en el lugar conservando el mtime (p. ej. rsync -t)
+    with open(catalog_path('valid_data.json'), 'rb') as source, open(catalog_dest, 'wb') as f:
+        f.write(source.read())
+    os.utime(catalog_dest, ns=(mtime_ns, mtime_ns))
+
+    second = node.sync()
+
+    assert second.content_hash != first.content_hash
+
+
+def test_sync_changed_catalog_is_ingested(node, catalog_dest):
+    copy2(catalog_path('data.json'), catalog_dest)
+    first = node.sync()
+    os.remove(catalog_dest)
+    copy2(catalog_path('valid_data.json'), catalog_dest)
+    second = node.sync()
+
+    assert second.content_hash != first.content_hash
+
+
+def _node_with_catalog(identifier):
+    node = Node.objects.create(identifier=identifier)
+    path = latest_json_catalog_path(identifier)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    copy2(catalog_path('data.json'), path)
+    return node
+
+
+def test_sync_nodes_command_syncs_all_nodes(capsys):
+    nodes = [_node_with_catalog('sync_a'), _node_with_catalog('sync_b')]
+    call_command('sync_nodes', '--concurrency', '1')
+
+    for node in nodes:
+        assert node.catalogupload_set.count() == 1
+    assert '2 nodos sincronizados' in capsys.readouterr().out
+
+
+def test_sync_nodes_command_reports_unchanged_nodes(capsys):
+    _node_with_catalog('sync_a')
+    call_command('sync_nodes', '--concurrency', '1')
+    call_command('sync_nodes', '--concurrency', '1')
+
+    assert '1 sin cambios' in capsys.readouterr().out
+
+
+def test_sync_nodes_command_filters_nodes():
+    synced = _node_with_catalog('sync_a')
+    excluded = _node_with_catalog('sync_b')
+    call_command('sync_nodes', 'sync_a', 'sync_b', '--exclude', 'sync_b', '--concurrency', '1')
+
+    assert synced.catalogupload_set.count() == 1
+    assert not excluded.catalogupload_set.exists()
+
+
+def test_sync_nodes_command_reports_failures(capsys):
+    node = _node_with_catalog('sync_a')
+    Node.objects.create(identifier='sync_missing')
+    with pytest.raises(CommandError):
+        call_command('sync_nodes', '--concurrency', '1')
+
+    output = capsys.readouterr().out
+    assert node.catalogupload_set.count() == 1
+    assert 'No se encontró un catálogo en el file system' in output
+    assert '1 con errores' in output
+
+
+def test_sync_nodes_command_unknown_node():
+    with pytest.raises(CommandError):
+        call_command('sync_nodes', 'not_a_node')
+
+
+@pytest.mark.skipif(connection.vendor == 'sqlite',
+                    reason='SQLite no admite escrituras concurrentes desde varios procesos')
+@pytest.mark.django_db(transaction=True)
+def test_sync_nodes_command_in_process_pool():
+    nodes = [_node_with_catalog(f'pool_{index}') for index in range(3)]
+    call_command('sync_nodes', '--concurrency', '2')
+
+    for node in nodes:
+        assert node.catalogupload_set.count() == 1
@@ -0,0 +1,80 @@
+import copy
+from unittest import mock
+
+import pytest
+from pydatajson import DataJson
+from pydatajson.validation import Validator
+
+from infra.apps.catalog.models import DatasetValidation
+from infra.apps.catalog.tests.helpers.open_catalog import catalog_path
+from infra.apps.catalog.tests.helpers.synthetic_catalog import synthetic_catalog
+from infra.apps.catalog.validator.incremental_validation import validate_catalog
+
+pytestmark = pytest.mark.django_db
+
+
+def _full_validation(data_json):
+    error_report = data_json.validate_catalog()
+    errors = list(error_report['error']['catalog']['errors'])
+    for dataset in error_report['error']['dataset'] or []:
+        errors += dataset['errors']
+    return [error['message'] for error in errors]
+
+
+def _invalid_catalog():
+    catalog = synthetic_catalog(4)
+    del catalog['publisher']
+    del catalog['dataset'][1]['title']
+    catalog['dataset'][2]['distribution'][0]['downloadURL'] = 'no es una url'
+    return catalog
+
+
+def _validated_datasets():
+    validated = []
+    validate = Validator.validate_catalog
+
+    def counting_validate(validator, catalog, only_errors=False):
+        validated.append(len(catalog['dataset']))
+        return validate(validator, catalog, only_errors)
+
+    patcher = mock.patch.object(Validator, 'validate_catalog', counting_validate)
+    return patcher, validated
+
+
+def test_incremental_validation_matches_full_validation():
+    data_json = DataJson(_invalid_catalog())
+
+    assert validate_catalog(data_json) == _full_validation(data_json)
+    # Con los resultados ya guardados
+    assert validate_catalog(data_json) == _full_validation(data_json)
+
+
+def test_invalid_sample_catalog_matches_full_validation():
+    data_json = DataJson(catalog_path('data.json'))
+
+    assert validate_catalog(data_json) == _full_validation(data_json)
+
+
+def test_unchanged_datasets_are_not_validated_again():
+    catalog = _invalid_catalog()
+    validate_catalog(DataJson(catalog))
+
+    changed = copy.deepcopy(catalog)
+    changed['dataset'][0]['title'] = 'Otro título'
+    patcher, validated = _validated_datasets()
+    with patcher:
+        validate_catalog(DataJson(changed))
+
+    assert validated == [1]
+    assert DatasetValidation.objects.count() == 5
+
+
+def test_duplicated_datasets_are_validated_together():
+    catalog = synthetic_catalog(2)
+    catalog['dataset'].append(copy.deepcopy(catalog['dataset'][0]))
+    data_json = DataJson(catalog)
+
+    errors = validate_catalog(data_json)
+
+    assert errors == _full_validation(data_json)
+    assert any('non-unique' in error for error in errors)
@@ -1,6 +1,6 @@
 import pytest
 from django.core.files import File
-from django.urls import reverse
+from django.urls import resolve, reverse
 from freezegun import freeze_time
 
 from infra.apps.catalog.tests.helpers.open_catalog import open_catalog
@@ -32,3 +32,10 @@ def test_older_versions_listed(logged_client, distribution_upload):
 def test_catalog_identifier_in_page(logged_client, distribution):
     response = _call(logged_client, distribution)
     assert distribution.catalog.identifier in response.content.decode('utf-8')
+
+
+@pytest.mark.parametrize('identifier', ['bulk', 'mirror'])
+def test_identifiers_are_not_shadowed_by_node_actions(node, identifier):
+    url = reverse('catalog:distribution_uploads',
+                  kwargs={'node_id': node.id, 'identifier': identifier})
+    assert resolve(url).url_name == 'distribution_uploads'
@@ -0,0 +1,163 @@
+import gzip
+
+import pytest
+from django.urls import reverse
+
+pytestmark = pytest.mark.django_db
+
+
+def _catalog_url(catalog):
+    return reverse('catalog:catalog_download', kwargs={'node_id': catalog.node.id,
+                                                       'file_format': 'json'})
+
+
+def _content(response):
+    return b''.join(response.streaming_content)
+
+
+def _read(file_field):
+    with open(file_field.path, 'rb') as file:
+        return file.read()
+
+
+def test_download_latest_catalog(client, catalog):
+    response = client.get(_catalog_url(catalog))
+
+    assert response.status_code == 200
+    assert _content(response) == _read(catalog.json_file)
+    assert response['ETag'] == f'"{catalog.content_hash}"'
+    assert response['Content-Type'] == 'application/json'
+    assert 'data.json' in response['Content-Disposition']
+
+
+def test_download_dated_catalog(client, catalog):
+    url = reverse('catalog:catalog_upload_download', kwargs={'node_id': catalog.node.id,
+                                                             'pk': catalog.pk,
+                                                             'file_format': 'xlsx'})
+    response = client.get(url)
+
+    assert response.status_code == 200
+    assert _content(response) == _read(catalog.xlsx_file)
+
+
+def test_download_unknown_format_is_not_found(client, catalog):
+    url = reverse('catalog:catalog_download', kwargs={'node_id': catalog.node.id,
+                                                      'file_format': 'csv'})
+
+    assert client.get(url).status_code == 404
+
+
+def test_download_matching_etag_is_not_modified(client, catalog):
+    response = client.get(_catalog_url(catalog), HTTP_IF_NONE_MATCH=f'"{catalog.content_hash}"')
+
+    assert response.status_code == 304
+    assert not response.content
+
+
+def test_download_range(client, catalog):
+    response = client.get(_catalog_url(catalog), HTTP_RANGE='bytes=10-19')
+
+    content = _read(catalog.json_file)
+    assert response.status_code == 206
+    assert _content(response) == content[10:20]
+    assert response['Content-Range'] == f'bytes 10-19/{len(content)}'
+    assert response['Content-Length'] == '10'
+
+
+def test_download_suffix_range(client, catalog):
+    response = client.get(_catalog_url(catalog), HTTP_RANGE='bytes=-5')
+
+    assert response.status_code == 206
+    assert _content(response) == _read(catalog.json_file)[-5:]
+
+
+def test_download_range_with_stale_if_range_returns_whole_file(client, catalog):
+    response = client.get(_catalog_url(catalog), HTTP_RANGE='bytes=0-9', HTTP_IF_RANGE='"old"')
+
+    assert response.status_code == 200
+    assert _content(response) == _read(catalog.json_file)
+
+
+def test_download_unsatisfiable_range(client, catalog):
+    size = len(_read(catalog.json_file))
+    response = client.get(_catalog_url(catalog), HTTP_RANGE=f'bytes={size}-')
+
+    assert response.status_code == 416
+    assert response['Content-Range'] == f'bytes */{size}'
+
+
+def test_download_with_nginx_delegates_transfer(client, catalog, settings):
+    settings.MEDIA_SENDFILE_BACKEND = 'nginx'
+    settings.MEDIA_ACCEL_REDIRECT_LOCATION = '/protected/'
+    response = client.get(_catalog_url(catalog))
+
+    assert response['X-Accel-Redirect'] == f'/protected/catalog/{catalog.node.identifier}/data.json'
+    assert not response.content
+
+
+def test_download_with_apache_delegates_transfer(client, catalog, settings):
+    settings.MEDIA_SENDFILE_BACKEND = 'apache'
+    response = client.get(_catalog_url(catalog))
+
+    assert response['X-Sendfile'].endswith(f'catalog/{catalog.node.identifier}/data.json')
+    assert not response.content
+
+
+def test_download_latest_distribution(client, distribution_upload):
+    distribution = distribution_upload.distribution
+    url = reverse('catalog:distribution_download', kwargs={'node_id': distribution.catalog_id,
+                                                           'identifier': distribution.identifier})
+    response = client.get(url)
+
+    assert _content(response) == _read(distribution_upload.file)
+    assert response['ETag'] == f'"{distribution_upload.file_hash}"'
+    assert response['Content-Type'] == 'text/csv'
+    assert distribution.file_name in response['Content-Disposition']
+
+
+def test_download_dated_distribution(client, distribution_upload):
+    url = reverse('catalog:distribution_upload_download',
+                  kwargs={'node_id': distribution_upload.distribution.catalog_id,
+                          'pk': distribution_upload.pk})
+    response = client.get(url)
+
+    assert _content(response) == _read(distribution_upload.file)
+    assert distribution_upload.file_name_with_date() in response['Content-Disposition']
+
+
+def test_download_distribution_from_other_node_is_not_found(client, distribution_upload):
+    url = reverse('catalog:distribution_upload_download',
+                  kwargs={'node_id': distribution_upload.distribution.catalog_id + 1,
+                          'pk': distribution_upload.pk})
+
+    assert client.get(url).status_code == 404
+
+
+def test_download_serves_gzip_variant_when_accepted(client, catalog):
+    response = client.get(_catalog_url(catalog), HTTP_ACCEPT_ENCODING='br, gzip')
+
+    assert response['Content-Encoding'] == 'gzip'
+    assert response['Vary'] == 'Accept-Encoding'
+    assert response['Content-Type'] == 'application/json'
+    assert gzip.decompress(_content(response)) == _read(catalog.json_file)
+
+
+def test_download_without_accept_encoding_is_identity(client, catalog):
+    response = client.get(_catalog_url(catalog), HTTP_ACCEPT_ENCODING='identity')
+
+    assert not response.has_header('Content-Encoding')
+    assert _content(response) == _read(catalog.json_file)
+
+
+def test_download_gzip_variant_has_its_own_etag(client, catalog):
+    response = client.get(_catalog_url(catalog), HTTP_ACCEPT_ENCODING='gzip')
+
+    assert response['ETag'] != f'"{catalog.content_hash}"'
+
+
+def test_download_with_nginx_leaves_compression_to_gzip_static(client, catalog, settings):
+    settings.MEDIA_SENDFILE_BACKEND = 'nginx'
+    response = client.get(_catalog_url(catalog), HTTP_ACCEPT_ENCODING='gzip')
+
+    assert response['X-Accel-Redirect'].endswith('/data.json')
+    assert not response.has_header('Content-Encoding')
@@ -35,3 +35,16 @@ def test_catalog_history_has_object_list_ordered_by_date_descendent(admin_client
     catalogs = response.context['object_list']
     for i in range(len(catalogs) - 1):
         assert catalogs[i].uploaded_at > catalogs[i+1].uploaded_at
+
+
+def test_catalog_history_shows_pending_conversion(admin_client, node, settings):
+    settings.CATALOG_CONVERSIONS_ASYNC = True
+    with open_catalog('data.json') as catalog_fd:
+        CatalogUpload(format=CatalogUpload.FORMAT_JSON,
+                      json_file=File(catalog_fd),
+                      node=node).save()
+
+    response = admin_client.get(reverse('catalog:catalog_history',
+                                        kwargs={'node_id': node.id}))
+
+    assert 'Conversión pendiente' in response.content.decode('utf-8')
@@ -1,3 +1,7 @@
+import os
+from unittest import mock
+
+from django.conf import settings
 from django.urls import reverse
 
 
@@ -11,3 +15,15 @@ def test_catalog_has_xlsx(admin_client, xlsx_catalog):
     response = admin_client.get(reverse('catalog:node', kwargs={'node_id': xlsx_catalog.node.id}))
 
     assert response.context['has_xlsx']
+
+
+def test_catalog_uploads_does_not_stat_files(admin_client, catalog):
+    url = reverse('catalog:node', kwargs={'node_id': catalog.node.id})
+    stat = os.stat
+    with mock.patch('os.stat', side_effect=stat) as mocked_stat:
+        response = admin_client.get(url)
+
+    media_root = os.path.abspath(settings.MEDIA_ROOT)
+    stat_paths = [os.path.abspath(call[0][0]) for call in mocked_stat.call_args_list]
+    assert not any(path.startswith(media_root) for path in stat_paths)
+    assert response.context['json_file'].size == catalog.stored_files()[catalog.json_file.name].size
@@ -1,5 +1,12 @@
 import pytest
+from django.core.files.base import ContentFile
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from freezegun import freeze_time
+
+from infra.apps.catalog.models import Distribution
+from infra.apps.catalog.tests.helpers.parse_counter import count_catalog_parses
 
 pytestmark = pytest.mark.django_db
 
@@ -23,8 +30,89 @@ def test_dataset_identifiers_in_context(logged_client, distribution_upload):
     assert distribution_upload.distribution.dataset_identifier in dataset_identifiers
 
 
-def url_dataset_is_selected_dataset(logged_client, distribution_upload):
+def test_url_dataset_is_selected_dataset(logged_client, distribution_upload):
     distribution_dataset_id = distribution_upload.distribution.dataset_identifier
     response = _call(logged_client, distribution_upload,
                      selected_dataset=distribution_upload.distribution.dataset_identifier)
     assert distribution_dataset_id == response.context['selected_dataset']
+
+
+def test_dataset_list_does_not_parse_catalog(logged_client, distribution_upload):
+    with count_catalog_parses() as parses:
+        response = _call(logged_client, distribution_upload)
+    assert parses.count == 0
+    assert response.context['dataset_list'][0][1].endswith(' - 125')
+
+
+def _create_distributions(node, count, versions=1, dataset_identifier='125'):
+    for index in range(count):
+        distribution = Distribution.objects.create(catalog=node,
+                                                   identifier=f'{dataset_identifier}.{index + 2}',
+                                                   dataset_identifier=dataset_identifier,
+                                                   file_name=f'data-{index}.csv')
+        for day in range(versions):
+            with freeze_time(f'2019-01-{day + 1:02}'):
+                distribution.distributionupload_set.create(
+                    file=ContentFile(f'{index},{day}'.encode(), name='data.csv'))
+
+
+def test_distributions_are_paginated(logged_client, distribution_upload):
+    _create_distributions(distribution_upload.distribution.catalog, 10)
+    first_page = _call(logged_client, distribution_upload)
+    second_page = logged_client.get(reverse('catalog:node_distributions', kwargs={
+        'node_id': distribution_upload.distribution.catalog.id}) + '?page=2')
+
+    assert len(first_page.context['object_list']) == 10
+    assert len(second_page.context['object_list']) == 1
+    assert '11 resultados' in first_page.content.decode('utf-8')
+
+
+def test_latest_versions_per_distribution(logged_client, distribution_upload):
+    _create_distributions(distribution_upload.distribution.catalog, 1, versions=5)
+    response = _call(logged_client, distribution_upload)
+
+    distribution = [distribution for distribution in response.context['object_list']
+                    if distribution.identifier == '125.2'][0]
+    assert [str(upload.uploaded_at) for upload in distribution.latest_uploads] == \
+        ['2019-01-05', '2019-01-04', '2019-01-03']
+
+
+def _count_queries(client, distribution_upload):
+    with CaptureQueriesContext(connection) as queries:
+        _call(client, distribution_upload)
+    return len(queries)
+
+
+def test_query_count_does_not_grow_with_distributions(logged_client, distribution_upload):
+    node = distribution_upload.distribution.catalog
+    _create_distributions(node, 2, versions=2)
+    few = _count_queries(logged_client, distribution_upload)
+    Distribution.objects.filter(catalog=node).exclude(identifier='125.1').delete()
+    _create_distributions(node, 20, versions=4)
+    many = _count_queries(logged_client, distribution_upload)
+
+    assert few == many
+
+
+def test_dataset_filter_is_applied_before_pagination(logged_client, distribution_upload):
+    _create_distributions(distribution_upload.distribution.catalog, 12, dataset_identifier='999')
+    response = _call(logged_client, distribution_upload, selected_dataset='125')
+
+    assert [distribution.identifier for distribution in response.context['object_list']] == \
+        ['125.1']
+    assert response.context['paginator'].count == 1
+
+
+def test_dataset_filter_is_kept_in_pagination_links(logged_client, distribution_upload):
+    _create_distributions(distribution_upload.distribution.catalog, 12, dataset_identifier='999')
+    response = _call(logged_client, distribution_upload, selected_dataset='999')
+
+    assert response.context['paginator'].count == 12
+    assert '?page=2&dataset_identifier=999' in response.content.decode('utf-8')
+
+
+def test_dataset_list_includes_datasets_from_every_page(logged_client, distribution_upload):
+    _create_distributions(distribution_upload.distribution.catalog, 12, dataset_identifier='999')
+    response = _call(logged_client, distribution_upload, selected_dataset='999')
+
+    assert [dataset[0] for dataset in response.context['dataset_list']] == ['125']
@@ -0,0 +1,31 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from infra.apps.catalog.models import Node
+
+pytestmark = pytest.mark.django_db
+
+
+def _call(client):
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(reverse('catalog:nodes'))
+    return response, len(queries)
+
+
+def test_node_list_shows_upload_freshness(admin_client, catalog):
+    response, _ = _call(admin_client)
+
+    content = response.content.decode('utf-8')
+    assert catalog.uploaded_at.strftime('%d/%m/%Y') in content
+    assert '1 versiones' in content
+
+
+@pytest.mark.usefixtures('catalog')
+def test_node_list_freshness_does_not_query_per_node(admin_client):
+    _, few = _call(admin_client)
+    Node.objects.bulk_create([Node(identifier=f'node_{index}') for index in range(10)])
+    _, many = _call(admin_client)
+
+    assert few == many
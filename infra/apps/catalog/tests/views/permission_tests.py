@@ -1,6 +1,8 @@
 import pytest
 from django.contrib.auth import get_user_model
+from django.db import connection
 from django.test import Client
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from infra.apps.catalog.mixins import UserIsNodeAdminMixin
 
@@ -68,3 +70,26 @@ def test_non_admin_user_gets_forbidden_http_response(node):
     for view in CATALOG_VIEWS:
         response = new_client.get(reverse(view, kwargs={'node_id': node.id}))
         assert response.status_code == 403
+
+
+def test_permission_check_is_a_single_query(user, node, django_assert_num_queries):
+    node.admins.add(user)
+    with django_assert_num_queries(1):
+        assert UserIsNodeAdminMixin().check_user_is_node_admin(user, node.id)
+
+
+def test_non_admin_permission_check_is_a_single_query(user, node, django_assert_num_queries):
+    with django_assert_num_queries(1):
+        assert not UserIsNodeAdminMixin().check_user_is_node_admin(user, node.id)
+
+
+def test_node_is_resolved_once_per_request(user, logged_client, catalog):
+    catalog.node.admins.add(user)
+    for view in CATALOG_VIEWS + ['catalog:catalog_history']:
+        with CaptureQueriesContext(connection) as queries:
+            response = logged_client.get(reverse(view, kwargs={'node_id': catalog.node.id}))
+
+        node_queries = [query for query in queries.captured_queries
+                        if 'FROM "catalog_node"' in query['sql']]
+        assert response.status_code == 200
+        assert len(node_queries) == 1, view
@@ -34,3 +34,12 @@ def test_sync_valid_catalog(admin_client, node, catalog_dest):
     copy2(catalog_path('data.json'), catalog_dest)
     admin_client.post(reverse('catalog:sync_catalog', kwargs={'node_id': node.id}))
     assert node.catalogupload_set.count() == 1
+
+
+def test_sync_unchanged_catalog(admin_client, node, catalog_dest):
+    copy2(catalog_path('data.json'), catalog_dest)
+    admin_client.post(reverse('catalog:sync_catalog', kwargs={'node_id': node.id}))
+    response = admin_client.post(reverse('catalog:sync_catalog', kwargs={'node_id': node.id}))
+
+    assert response.status_code == 200
+    assert 'no tiene cambios' in response.content.decode('utf-8')
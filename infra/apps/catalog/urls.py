@@ -17,6 +17,9 @@ urlpatterns = [
     path('<int:node_id>/catalogs/history/',
          catalog_views.CatalogHistory.as_view(),
          name='catalog_history'),
+    path('<int:node_id>/catalogs/<int:pk>/diff/',
+         catalog_views.CatalogUploadDiff.as_view(),
+         name='catalog_upload_diff'),
     path('<int:node_id>/catalogs/<int:pk>/delete/',
          catalog_views.DeleteCatalogUpload.as_view(),
          name='delete_catalog_upload'),
@@ -29,6 +32,15 @@ urlpatterns = [
     path('<int:node_id>/distributions/add/',
          catalog_views.AddDistributionView.as_view(),
          name='add_distribution'),
+    path('<int:node_id>/distributions/-/bulk/',
+         catalog_views.BulkDistributionUploadView.as_view(),
+         name='bulk_distribution_upload'),
+    path('<int:node_id>/distributions/-/mirror/',
+         catalog_views.MirrorCatalogDistributions.as_view(),
+         name='mirror_distributions'),
+    path('<int:node_id>/distributions/-/mirror/<int:mirror_id>/',
+         catalog_views.MirrorRequestStatus.as_view(),
+         name='mirror_request_status'),
     path('<int:node_id>/distributions/<str:identifier>/',
          catalog_views.DistributionUploads.as_view(),
          name='distribution_uploads'),
@@ -44,4 +56,16 @@ urlpatterns = [
     path('<int:node_id>/distribution_uploads/<int:pk>/delete/',
          catalog_views.DeleteDistributionUpload.as_view(),
          name='delete_distribution_upload'),
+    path('<int:node_id>/catalogs/latest/<str:file_format>/',
+         catalog_views.CatalogDownload.as_view(),
+         name='catalog_download'),
+    path('<int:node_id>/catalogs/<int:pk>/<str:file_format>/',
+         catalog_views.CatalogDownload.as_view(),
+         name='catalog_upload_download'),
+    path('<int:node_id>/distributions/<str:identifier>/download/',
+         catalog_views.DistributionDownload.as_view(),
+         name='distribution_download'),
+    path('<int:node_id>/distribution_uploads/<int:pk>/download/',
+         catalog_views.DistributionDownload.as_view(),
+         name='distribution_upload_download'),
 ]
@@ -13,24 +13,32 @@ from infra.apps.catalog.validator.url_or_file import URLOrFileValidator
 
 class CatalogDataValidator:
     def get_and_validate_data(self, raw_data):
+        return self.validate_data(raw_data, self.get_file(raw_data))
+
+    def get_file(self, raw_data):
         file_handler = raw_data.get('file')
-        file_format = raw_data.get('format')
         url = raw_data.get('url')
 
         URLOrFileValidator(file_handler, url).validate()
-        self.validate_format(url, file_handler, file_format)
 
         if url:
-            file_handler = self.download_file_from_url(url)
+            return self.download_file_from_url(url)
+        return file_handler
 
+    def validate_data(self, raw_data, file_handler):
+        file_format = raw_data.get('format')
+        datajson = self.validate_format(file_handler, file_format)
         file_field = 'json_file' if file_format == 'json' else 'xlsx_file'
 
-        return {'node': raw_data['node'], 'format': file_format, file_field: File(file_handler)}
+        return {'node': raw_data['node'],
+                'format': file_format,
+                file_field: File(file_handler),
+                'datajson': datajson}
 
-    def validate_format(self, url, file, _format):
-        path = file.temporary_file_path() if file else url
+    def validate_format(self, file, _format):
+        path = file.temporary_file_path() if hasattr(file, 'temporary_file_path') else file.name
         try:
-            DataJson(path, catalog_format=_format)
+            return DataJson(path, catalog_format=_format)
         except NonParseableCatalog:
             raise ValidationError("El catálogo ingresado no es válido")
         except Exception as e:
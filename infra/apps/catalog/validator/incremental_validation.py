@@ -0,0 +1,51 @@
+import pkg_resources
+
+from infra.apps.catalog.helpers.metadata_hash import metadata_hash
+from infra.apps.catalog.models.dataset_validation import DatasetValidation
+
+# Un cambio de versión de pydatajson puede cambiar las reglas: invalida la cache
+VALIDATOR_VERSION = f"pydatajson-{pkg_resources.get_distribution('pydatajson').version}"
+
+
+def error_messages(errors):
+    return [error['message'] for error in errors]
+
+
+def validate(data_json, catalog):
+    """Devuelve los mensajes de error del catálogo y la lista de mensajes de cada dataset."""
+    error_report = data_json.validator.validate_catalog(catalog)
+    catalog_errors = error_messages(error_report['error']['catalog']['errors'])
+    dataset_errors = [error_messages(dataset['errors'])
+                      for dataset in error_report['error']['dataset'] or []]
+    return catalog_errors, dataset_errors
+
+
+def dataset_hashes(datasets):
+    if not isinstance(datasets, list) or not all(isinstance(d, dict) for d in datasets):
+        return None
+    hashes = [metadata_hash(dataset) for dataset in datasets]
+    # Con datasets repetidos 'uniqueItems' solo se detecta validando el catálogo completo
+    return hashes if len(set(hashes)) == len(hashes) else None
+
+
+def validate_catalog(data_json):
+    """Valida el catálogo reutilizando los resultados guardados de los datasets cuya
+    metadata no cambió: solo se validan los datasets nuevos o modificados.
+    """
+    hashes = dataset_hashes(data_json.get('dataset'))
+    if hashes is None:
+        catalog_errors, dataset_errors = validate(data_json, data_json)
+        return catalog_errors + [error for errors in dataset_errors for error in errors]
+
+    datasets = data_json['dataset']
+    cached = DatasetValidation.objects.cached_errors(VALIDATOR_VERSION, hashes)
+    pending = [index for index, dataset_hash in enumerate(hashes) if dataset_hash not in cached]
+    # La metadata del catálogo se valida siempre, aunque no haya datasets pendientes
+    catalog = {key: value for key, value in data_json.items() if key != 'dataset'}
+    catalog['dataset'] = [datasets[index] for index in pending]
+    catalog_errors, pending_errors = validate(data_json, catalog)
+
+    validated = {hashes[index]: errors for index, errors in zip(pending, pending_errors)}
+    DatasetValidation.objects.store(VALIDATOR_VERSION, validated)
+    cached.update(validated)
+    return catalog_errors + [error for dataset_hash in hashes for error in cached[dataset_hash]]
@@ -5,7 +5,8 @@ from django.conf import settings
 from django.contrib import messages
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.core.exceptions import ValidationError
-from django.http import Http404, HttpResponseRedirect, HttpResponse
+from django.db.models import Exists, OuterRef, Prefetch, Subquery
+from django.http import Http404, HttpResponseRedirect, HttpResponse, JsonResponse
 from django.shortcuts import render, redirect, get_object_or_404
 from django.urls import reverse, reverse_lazy
 from django.views import View
@@ -13,13 +14,22 @@ from django.views.generic import ListView, TemplateView
 from django.views.generic.edit import FormView, DeleteView
 from requests import RequestException
 
+from infra.apps.catalog.bulk_upload import BulkDistributionUpload, archive_entries, \
+    manifest_entries
 from infra.apps.catalog.exceptions.catalog_not_uploaded_error import \
     CatalogNotUploadedError
 from infra.apps.catalog.exceptions.catalog_sync_error import CatalogSyncError
+from infra.apps.catalog.exceptions.catalog_unchanged_error import CatalogUnchangedError
 from infra.apps.catalog.forms import CatalogForm, DistributionForm
+from infra.apps.catalog.helpers.file_name_for_format import file_name_for_format
+from infra.apps.catalog.helpers.file_response import serve_media_file
+from infra.apps.catalog.ingestion import CatalogIngestion
 from infra.apps.catalog.mixins import UserIsNodeAdminMixin
-from infra.apps.catalog.models import CatalogUpload, Node, DistributionUpload
+from infra.apps.catalog.models import CatalogUpload, Dataset, Node, DistributionUpload, \
+    MirrorRequest, StoredFile
 from infra.apps.catalog.models.distribution import Distribution
+from infra.apps.catalog.storage.distribution_storage import distribution_directory
+from infra.apps.catalog.storage.paths import catalog_path
 from infra.apps.catalog.sync import sync_catalog
 from infra.apps.catalog.validator.url_or_file import URLOrFileValidator
 
@@ -38,8 +48,9 @@ class AddCatalogView(LoginRequiredMixin, UserIsNodeAdminMixin, FormView):
 
         try:
             raw_data = form.cleaned_data
-            raw_data['node'] = Node.objects.get(pk=node_id)
-            catalog = CatalogUpload.create_from_url_or_file(raw_data)
+            raw_data['node'] = self.node
+            ingestion = CatalogIngestion(raw_data)
+            ingestion.run()
         except ValidationError as e:
             messages.error(request, e)
             return self.form_invalid(form)
@@ -47,16 +58,14 @@ class AddCatalogView(LoginRequiredMixin, UserIsNodeAdminMixin, FormView):
             messages.error(request, e)
             return self.form_invalid(form)
 
-        validation_error_messages = catalog.validate()
-        for error_message in validation_error_messages:
+        for error_message in ingestion.error_messages:
             messages.info(request, error_message)
         return self.form_valid(form)
 
     def get_context_data(self, **kwargs):
         context = super(AddCatalogView, self).get_context_data(**kwargs)
-        node_id = self.kwargs.get('node_id')
-        context['node_id'] = node_id
-        context['node_identifier'] = Node.objects.get(id=node_id).identifier
+        context['node_id'] = self.node.id
+        context['node_identifier'] = self.node.identifier
         return context
 
     def form_invalid(self, form):
@@ -153,7 +162,8 @@ class AddDistributionVersionView(DistributionUpserter):
             context['form'] = DistributionForm(
                 node=node,
                 instance=distribution,
-                initial={'distribution_identifier': distribution.identifier}
+                initial={'distribution_identifier': distribution.identifier,
+                         'url': distribution.source_url}
             )
         except CatalogNotUploadedError:
             status = 400
@@ -187,73 +197,64 @@ class AddDistributionVersionView(DistributionUpserter):
 
 
 class ListDistributions(LoginRequiredMixin, UserIsNodeAdminMixin, ListView):
-    model = DistributionUpload
+    model = Distribution
     paginate_by = 10
+    versions_per_distribution = 3
     template_name = "distributions/node_distributions.html"
 
-    # pylint: disable=W0201
-    def get(self, request, *args, **kwargs):
-        self.object_list = self.get_queryset()
-        context = self.get_context_data(**kwargs)
-        selected_dataset = request.GET.get('dataset_identifier', None)
-
-        if not selected_dataset:
-            return self.render_to_response(context)
-
-        distributions = {id: dist for id, dist in context.get('object_list').items()
-                         if dist[0].distribution.dataset_identifier == selected_dataset}
-
-        context.update({
-            'object_list': distributions,
-            'selected_dataset': selected_dataset,
-        })
-
-        return self.render_to_response(context)
-
     def get_queryset(self):
-        node = self.kwargs['node_id']
-        return self.model.objects.filter(distribution__catalog=node)
+        # Las últimas N versiones de cada distribución de la página se resuelven en una sola
+        # consulta, con una subconsulta correlacionada por distribución
+        latest_ids = DistributionUpload.objects \
+            .filter(distribution=OuterRef('distribution')) \
+            .order_by('-uploaded_at', '-id') \
+            .values('id')[:self.versions_per_distribution]
+        latest_uploads = DistributionUpload.objects \
+            .filter(id__in=Subquery(latest_ids)) \
+            .order_by('-uploaded_at', '-id')
+
+        distributions = Distribution.objects.filter(catalog=self.kwargs['node_id'])
+        if self.selected_dataset():
+            distributions = distributions.filter(dataset_identifier=self.selected_dataset())
+
+        return distributions \
+            .annotate(has_uploads=Exists(
+                DistributionUpload.objects.filter(distribution=OuterRef('pk')))) \
+            .filter(has_uploads=True) \
+            .select_related('catalog') \
+            .prefetch_related(Prefetch('distributionupload_set',
+                                       queryset=latest_uploads,
+                                       to_attr='latest_uploads')) \
+            .order_by('identifier')
+
+    def selected_dataset(self):
+        return self.request.GET.get('dataset_identifier') or None
 
     def get_context_data(self, *, object_list=None, **kwargs):
         context = super(ListDistributions, self).get_context_data(object_list=object_list, **kwargs)
-        context['node'] = Node.objects.get(id=self.kwargs['node_id'])
-        context['object_list'] = \
-            self.last_three_versions_of_each_distribution(context['object_list'])
-
-        datasets = []
-        for _, dist in context.get('object_list').items():
-            datasets.append(self._get_dataset_id_title_pair(dist))
-        datasets = list(set(datasets))
-        context['dataset_list'] = datasets
+        context['node'] = self.node
+        context['selected_dataset'] = self.selected_dataset()
+        context['dataset_list'] = self._get_dataset_id_title_pairs(context['node'])
         return context
 
-    def last_three_versions_of_each_distribution(self, queryset):
-        qs = {}
-        for upload in queryset:
-            qs.setdefault(upload.distribution.identifier, []).append(upload)
-
-        for distributions in qs.values():
-            distributions.sort(key=lambda x: (x.uploaded_at, x.id), reverse=True)
-        return qs
-
-    def _get_dataset_id_title_pair(self, distributions):
-        distribution = distributions[0].distribution
-        latest_catalog_upload = distribution.catalog.get_latest_catalog_upload()
-        pair = None
-        for dataset in latest_catalog_upload.get_datasets():
-            if dataset['identifier'] == distribution.dataset_identifier:
-                pair = (dataset['identifier'], dataset['title'] + " - " + dataset['identifier'])
-
-        return pair
+    def _get_dataset_id_title_pairs(self, node):
+        # Datasets del último catálogo del nodo que tienen distribuciones, en una sola consulta
+        dataset_identifiers = Distribution.objects.filter(catalog=node) \
+            .values('dataset_identifier')
+        datasets = Dataset.objects \
+            .filter(catalog_upload=node.latest_catalog_upload_id,
+                    identifier__in=dataset_identifiers) \
+            .only('identifier', 'title') \
+            .order_by('identifier')
+        return [(dataset.identifier, dataset.choice_label()) for dataset in datasets]
 
 
 class CatalogUploadSuccess(LoginRequiredMixin, UserIsNodeAdminMixin, TemplateView):
     template_name = "catalogs/catalog_success.html"
 
     def get(self, request, *args, **kwargs):
-        node_id = self.kwargs.get('node_id')
-        params_dict = {'node_id': node_id,
-                       'node_identifier': Node.objects.get(pk=node_id).identifier}
+        params_dict = {'node_id': self.node.id,
+                       'node_identifier': self.node.identifier}
         return render(request, self.template_name, params_dict)
 
 
@@ -273,18 +274,23 @@ class NodeUploadsView(LoginRequiredMixin, UserIsNodeAdminMixin, ListView):
     template_name = "nodes/uploads.html"
 
     def get(self, request, *args, **kwargs):
-        node_id = self.kwargs['node_id']
-        node_name = Node.objects.get(pk=node_id).identifier
+        node_id = self.node.id
+        node_name = self.node.identifier
         node_uploads = self.model.objects.filter(node=node_id).order_by('-uploaded_at')
-        base_path = os.path.join(settings.MEDIA_ROOT, settings.CATALOG_MEDIA_DIR)
-        has_json = os.path.isfile(os.path.join(base_path, node_name, 'data.json'))
-        has_xlsx = os.path.isfile(os.path.join(base_path, node_name, 'catalog.xlsx'))
+        # La presencia y el tamaño de los archivos salen de la base, sin acceder al disco
+        json_path = catalog_path(node_name, 'data.json')
+        xlsx_path = catalog_path(node_name, 'catalog.xlsx')
+        stored_files = StoredFile.objects.for_paths([json_path, xlsx_path])
+        json_file = stored_files.get(json_path)
+        xlsx_file = stored_files.get(xlsx_path)
         params_dict = {
             'node_id': node_id,
             'base_url': f'{settings.MEDIA_URL}catalog/',
             'node_name': node_name,
-            'has_json': has_json,
-            'has_xlsx': has_xlsx,
+            'has_json': json_file is not None,
+            'has_xlsx': xlsx_file is not None,
+            'json_file': json_file,
+            'xlsx_file': xlsx_file,
             'object_list': node_uploads
         }
         return render(request, self.template_name, params_dict)
@@ -312,7 +318,7 @@ class DistributionUploads(LoginRequiredMixin, UserIsNodeAdminMixin, ListView):
                                                                     **kwargs)
         context['identifier'] = self.identifier()
         context['node_id'] = self.node_id()
-        context['node_identifier'] = Node.objects.get(id=self.node_id()).identifier
+        context['node_identifier'] = self.node.identifier
         return context
 
 
@@ -330,6 +336,9 @@ class SyncCatalog(LoginRequiredMixin, TemplateView):
             for error in errors:
                 messages.info(request, error)
             status = 200
+        except CatalogUnchangedError as unchanged:
+            messages.info(request, unchanged)
+            status = 200
         except CatalogSyncError as error:
             messages.error(request, error)
             status = 400
@@ -361,10 +370,20 @@ class CatalogHistory(LoginRequiredMixin, UserIsNodeAdminMixin, ListView):
 
     def get_context_data(self, *, object_list=None, **kwargs):
         context = super(CatalogHistory, self).get_context_data(object_list=object_list, **kwargs)
-        context['node'] = Node.objects.get(id=self.kwargs['node_id'])
+        context['node'] = self.node
         return context
 
 
+class CatalogUploadDiff(LoginRequiredMixin, UserIsNodeAdminMixin, View):
+    http_method_names = ['get']
+
+    def get(self, request, node_id, pk):  # pylint: disable=C0103
+        catalog = get_object_or_404(CatalogUpload, pk=pk, node=node_id)
+        return JsonResponse({'id': catalog.id,
+                             'uploaded_at': catalog.uploaded_at.isoformat(),
+                             'diff': catalog.get_diff()})
+
+
 class DeleteCatalogUpload(LoginRequiredMixin, UserIsNodeAdminMixin, DeleteView):
     model = CatalogUpload
     http_method_names = ['post']
@@ -375,7 +394,7 @@ class DeleteCatalogUpload(LoginRequiredMixin, UserIsNodeAdminMixin, DeleteView):
 
     def delete(self, request, *args, **kwargs):
         catalog = self.get_object()
-        if catalog.node.id != self.kwargs["node_id"]:
+        if catalog.node_id != self.kwargs["node_id"]:
             return HttpResponse('Unauthorized', status=401)
         success_url = self.get_success_url()
         catalog.delete()
@@ -412,7 +431,7 @@ class DeleteDistributionUpload(LoginRequiredMixin, UserIsNodeAdminMixin, DeleteV
 
     def delete(self, request, *args, **kwargs):
         self.distribution_upload = self.get_object()
-        if self.distribution_upload.distribution.catalog.id != self.kwargs["node_id"]:
+        if self.distribution_upload.distribution.catalog_id != self.kwargs["node_id"]:
             return HttpResponse('Unauthorized', status=401)
         success_url = self.get_success_url()
         dist = self.distribution_upload.distribution
@@ -420,3 +439,93 @@ class DeleteDistributionUpload(LoginRequiredMixin, UserIsNodeAdminMixin, DeleteV
         if not dist.distributionupload_set.count():
             dist.delete()
         return HttpResponseRedirect(success_url)
+
+
+class CatalogDownload(View):
+    http_method_names = ['get', 'head']
+
+    def get(self, request, node_id, file_format, pk=None):  # pylint: disable=C0103
+        if file_format not in (CatalogUpload.FORMAT_JSON, CatalogUpload.FORMAT_XLSX):
+            raise Http404
+        if pk is None:
+            node = get_object_or_404(Node, pk=node_id)
+            name = catalog_path(node.identifier,
+                                f'{file_name_for_format(file_format)}.{file_format}')
+        else:
+            catalog = get_object_or_404(CatalogUpload, pk=pk, node=node_id)
+            file = getattr(catalog, f'{file_format}_file')
+            if not file:
+                raise Http404
+            name = file.name
+        return serve_media_file(request, name)
+
+
+class DistributionDownload(View):
+    http_method_names = ['get', 'head']
+
+    def get(self, request, node_id, identifier=None, pk=None):  # pylint: disable=C0103
+        if pk is None:
+            distribution = get_object_or_404(Distribution, catalog=node_id, identifier=identifier)
+            name = os.path.join(distribution_directory(distribution), distribution.file_name)
+            return serve_media_file(request, name, distribution.file_name)
+
+        upload = get_object_or_404(DistributionUpload.objects.select_related('distribution'),
+                                   pk=pk, distribution__catalog=node_id)
+        return serve_media_file(request, upload.file.name, upload.file_name_with_date())
+
+
+class BulkDistributionUploadView(LoginRequiredMixin, UserIsNodeAdminMixin, View):
+    http_method_names = ['post']
+
+    def post(self, request, node_id):
+        archive = request.FILES.get('archive')
+        manifest = request.FILES.get('manifest')
+        if bool(archive) == bool(manifest):
+            return JsonResponse({'error': "Se debe enviar un archivo 'archive' o 'manifest'"},
+                                status=400)
+        try:
+            bulk_upload = BulkDistributionUpload(self.node)
+            entries = archive_entries(archive) if archive else manifest_entries(manifest)
+            results = bulk_upload.run(entries)
+        except CatalogNotUploadedError:
+            return JsonResponse({'error': 'No se encontraron catálogos subidos para el nodo: '
+                                          f'{self.node.identifier}'}, status=400)
+        except ValidationError as e:
+            return JsonResponse({'error': e.messages[0]}, status=400)
+
+        return JsonResponse({'results': [result._asdict() for result in results]})
+
+
+def mirror_request_data(mirror_request):
+    return {
+        'id': mirror_request.id,
+        'status': mirror_request.status,
+        'error': mirror_request.error,
+        'results': mirror_request.get_results(),
+        'url': reverse('catalog:mirror_request_status',
+                       kwargs={'node_id': mirror_request.node_id,
+                               'mirror_id': mirror_request.id}),
+    }
+
+
+class MirrorCatalogDistributions(LoginRequiredMixin, UserIsNodeAdminMixin, View):
+    http_method_names = ['post']
+
+    def post(self, request, node_id):
+        if not self.node.has_catalog_upload():
+            return JsonResponse({'error': 'No se encontraron catálogos subidos para el nodo: '
+                                          f'{self.node.identifier}'}, status=400)
+
+        # Las descargas las hace el worker de process_mirrors, fuera del request
+        data = mirror_request_data(MirrorRequest.objects.enqueue(self.node))
+        response = JsonResponse(data, status=202)
+        response['Location'] = data['url']
+        return response
+
+
+class MirrorRequestStatus(LoginRequiredMixin, UserIsNodeAdminMixin, View):
+    http_method_names = ['get']
+
+    def get(self, request, node_id, mirror_id):
+        mirror_request = get_object_or_404(MirrorRequest, pk=mirror_id, node=self.node)
+        return JsonResponse(mirror_request_data(mirror_request))
@@ -0,0 +1,118 @@
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+
+def seconds_after(moment, seconds):
+    return moment + timedelta(seconds=seconds)
+
+
+def retry_time(attempts, base_delay):
+    # Backoff exponencial: base_delay, 2 * base_delay, 4 * base_delay... según los intentos
+    return seconds_after(timezone.now(), base_delay * 2 ** (attempts - 1))
+
+
+class WorkQueue:
+    """Cola de trabajos persistida en una tabla. Cada trabajo se toma reservándolo por
+    '<prefijo>_TIMEOUT' segundos (si el worker se cae, otro lo vuelve a tomar al vencer la
+    reserva) y, si falla, se reintenta con backoff exponencial hasta '<prefijo>_MAX_ATTEMPTS'.
+
+    Las subclases definen el modelo, sus campos de reserva y de intentos, el trabajo (run) y
+    los valores que guardan en cada transición.
+    """
+    model = None
+    settings_prefix = None
+    available_field = 'available_at'
+    attempts_field = 'attempts'
+    # Errores que no se resuelven reintentando
+    permanent_errors = ()
+
+    def claimable(self):
+        return self.model.objects.all()
+
+    def run(self, job):
+        raise NotImplementedError
+
+    def claim_values(self, job):  # pylint: disable=W0613
+        return {}
+
+    def done_values(self, job, result):  # pylint: disable=W0613
+        return {}
+
+    def retry_values(self, job, error):  # pylint: disable=W0613
+        return {}
+
+    def failed_values(self, job, error):  # pylint: disable=W0613
+        return {}
+
+    def claim_next(self):
+        now = timezone.now()
+        with transaction.atomic():
+            job = self.claimable() \
+                .select_for_update(skip_locked=True) \
+                .filter(**{f'{self.available_field}__lte': now}) \
+                .order_by(self.available_field, 'id') \
+                .first()
+            if job is None:
+                return None
+
+            self.save(job, **{
+                self.attempts_field: getattr(job, self.attempts_field) + 1,
+                self.available_field: seconds_after(now, self.setting('TIMEOUT')),
+                **self.claim_values(job),
+            })
+
+        return job
+
+    def process(self, job):
+        try:
+            result = self.run(job)
+        except self.permanent_errors as e:
+            self.fail(job, e)
+            return False
+        except Exception as e:
+            logging.getLogger(type(self).__module__).exception('Error procesando %s', job)
+            attempts = getattr(job, self.attempts_field)
+            if attempts >= self.setting('MAX_ATTEMPTS'):
+                self.fail(job, e)
+            else:
+                self.save(job, **{
+                    self.available_field: retry_time(attempts, self.setting('RETRY_DELAY')),
+                    **self.retry_values(job, e),
+                })
+            return False
+
+        self.complete(job, {self.available_field: None, **self.done_values(job, result)})
+        return True
+
+    def process_pending(self, limit=None):
+        processed = 0
+        while limit is None or processed < limit:
+            job = self.claim_next()
+            if job is None:
+                break
+            self.process(job)
+            processed += 1
+        return processed
+
+    def fail(self, job, error):
+        self.complete(job, {self.available_field: None, **self.failed_values(job, error)})
+
+    def complete(self, job, values):
+        self.save(job, **values)
+
+    def claimed(self, job):
+        return self.model.objects.filter(pk=job.pk)
+
+    def save(self, job, **values):
+        # update() evita los efectos secundarios de save() en los modelos
+        claimed = self.claimed(job)
+        for field, value in values.items():
+            setattr(job, field, value)
+        claimed.update(**values)
+
+    def setting(self, name):
+        return getattr(settings, f'{self.settings_prefix}_{name}')
@@ -0,0 +1,8 @@
+#!/usr/bin/env bash
+set -e
+DIR=$(dirname "$0")
+cd ${DIR}/..
+
+echo "Running benchmarks"
+env DJANGO_SETTINGS_MODULE=conf.settings.testing py.test -s -p no:cacheprovider \
+    infra/apps/catalog/tests/benchmarks/*_benchmark.py $@